@@ -0,0 +1,7 @@
+"""
+Benchmarks for Excel Stats Analyzer.
+Generates synthetic workbooks and times the read, stats and write stages
+headlessly; run with ``python -m benchmarks --help``. The equivalence
+check (``python -m benchmarks.equivalence``) compares every stats engine on
+an edge-case corpus.
+"""
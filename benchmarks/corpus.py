@@ -0,0 +1,273 @@
+"""
+Edge-case workbook corpus for the engine equivalence check.
+Sheets are written as raw sheet XML rather than through openpyxl, so each
+one can hold exactly the cell types and layouts that readers disagree on:
+NA strings, booleans next to 0/1, dates, errors, inline strings, row gaps,
+leading blank rows, trailing formatted empty rows, duplicate or blank
+headers and numbers too long for a float.
+"""
+
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from xml.sax.saxutils import escape
+
+
+# A cell is None (no <c> element) or (type, value): "s" shared string,
+# "inline" inline string, "rich" inline string split into runs, "str" formula
+# string result, "n" number, "date" number with a date format, "b" boolean
+# ("1"/"0"), "e" error or "styled" a formatted cell without a value
+Cell = Optional[Tuple[str, Union[str, Sequence[str]]]]
+
+# A sheet is a list of (row number, cells); missing row numbers are row gaps
+SheetRows = List[Tuple[int, List[Cell]]]
+
+
+def _rows(*rows: List[Cell], first: int = 1) -> SheetRows:
+    return [(first + offset, cells) for offset, cells in enumerate(rows)]
+
+
+def _s(value: str) -> Cell:
+    return ("s", value)
+
+
+def _n(value: Union[int, float, str]) -> Cell:
+    return ("n", str(value))
+
+
+CORPUS_SHEETS: Dict[str, SheetRows] = {
+    "na_strings": _rows(
+        [_s("label"), _s("code"), _s("note")],
+        [_s("NA"), _s("N/A"), _s("null")],
+        [_s("nan"), _s("NaN"), _s("#N/A")],
+        [_s("None"), _s("n/a"), _s("-NaN")],
+        [_s("<NA>"), _s("NULL"), _s("#NA")],
+        [_s("value"), _s("1.#QNAN"), _s("")],
+        [_s("NA"), _n(0), _s("kept")],
+    ),
+    "booleans": _rows(
+        [_s("flag"), _s("number"), _s("text")],
+        [("b", "1"), _n(1), _s("TRUE")],
+        [("b", "0"), _n(0), _s("FALSE")],
+        [("b", "1"), _n(1), _s("1")],
+        [_n(1), ("b", "1"), _s("True")],
+        [_n(0), ("b", "0"), _s("0")],
+        [None, _n("1.0"), _s("true")],
+    ),
+    "dates": _rows(
+        [_s("date"), _s("timestamp"), _s("serial")],
+        [("date", "45292"), ("date", "45292.5"), _n(45292)],
+        [("date", "45292"), ("date", "45292.000011574"), _n("45292.5")],
+        [("date", "45293"), ("date", "45293.75"), _s("2024-01-02")],
+        [("date", "60"), ("date", "1"), _n(1)],
+        [None, ("date", "45292.5"), None],
+    ),
+    "errors": _rows(
+        [_s("ratio"), _s("lookup"), _s("mixed")],
+        [("e", "#DIV/0!"), ("e", "#N/A"), ("e", "#VALUE!")],
+        [_n("0.5"), ("e", "#N/A"), _s("#VALUE!")],
+        [("e", "#DIV/0!"), ("e", "#REF!"), ("e", "#NAME?")],
+        [("e", "#NUM!"), ("e", "#NULL!"), _n(3)],
+    ),
+    "inline_strings": _rows(
+        [("inline", "name"), ("inline", "city"), _s("formula")],
+        [("inline", "Alice"), ("rich", ("New ", "York")), ("str", "Alice")],
+        [("inline", "  "), ("inline", "Paris"), ("str", "")],
+        [("inline", "Alice"), ("rich", ("New", " York")), ("str", " ")],
+        [("inline", "\t"), _s("Paris"), ("str", "x")],
+        [_s("Alice"), ("inline", ""), ("str", "Alice")],
+    ),
+    "row_gaps": [
+        (1, [_s("id"), _s("value"), _s("text")]),
+        (2, [_n(1), _n("1.5"), _s("a")]),
+        (5, [_n(2), None, _s("b")]),
+        (6, [None, None, None]),
+        (9, [_n(3), _n("2.25"), _s(" ")]),
+        (12, [None, _n(7), None]),
+    ],
+    "leading_blank_rows": _rows(
+        [_s("first"), _s("second")],
+        [_n(1), _s("x")],
+        [_n(2), _s("y")],
+        [_n(2), None],
+        first=4,
+    ),
+    "headers": _rows(
+        [_s("name"), _s("name"), None, _s(""), _s("name"), _n(1), _s("Unnamed: 2")],
+        [_s("a"), _s("b"), _s("c"), _s("d"), _s("e"), _s("f"), _s("g")],
+        [_s("a"), None, _s("c"), _s(" "), _s("e"), None, _s("g")],
+        [_n(1), _n(2), _n(3), _n(4), _n(5), _n(6), _n(7)],
+    ),
+    "numbers": _rows(
+        [_s("int"), _s("float"), _s("big"), _s("text")],
+        [_n(1), _n("0.1"), _n("123456789012345"), _s("1")],
+        [_n("1.0"), _n("0.30000000000000004"), _n("1E+20"), _s("01")],
+        [_n(-3), _n("2.5E-7"), _n("9007199254740993"), _s("1.0")],
+        [_n(1), _n("100"), _n("-0"), _s(" 1 ")],
+    ),
+    "long_numbers": _rows(
+        [_s("id"), _s("digits"), _s("overflow")],
+        [_s("9007199254740993"), _s("9" * 400), _s("1e400")],
+        [_s("12345678901234567890123"), _s("1" * 5000), _s("-1E+999")],
+        [_s("9007199254740993"), _s("7"), _s("1.5")],
+    ),
+    "whitespace": _rows(
+        [_s("padded"), _s("blank"), _s("mixed")],
+        [_s(" a"), _s(" "), _s("a")],
+        [_s("a "), _s("\t"), _s(" a")],
+        [_s("a"), _s("\n"), _s(" ")],
+        [_s(" a"), _s(""), _s("　")],
+    ),
+    # Formatted empty rows after the data, as left behind by deleting rows in Excel
+    "trailing_formatted_rows": _rows(
+        [_s("id"), _s("group")],
+        *([_n(number), _s("odd" if number % 2 else "even")] for number in range(1, 41)),
+        *([("styled", ""), ("styled", "")] for _ in range(400)),
+    ),
+    "empty": [],
+    "header_only": _rows([_s("alone"), _s("together")]),
+}
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    '{sheets}</Types>'
+)
+
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# Style 1 is a built-in date format (14, m/d/yyyy), style 2 a custom date-time format
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+    '<fonts count="1"><font/></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _text(value: str) -> str:
+    preserve = ' xml:space="preserve"' if value != value.strip() else ""
+    return f"<t{preserve}>{escape(value)}</t>"
+
+
+def _cell_xml(ref: str, cell: Tuple[str, Union[str, Sequence[str]]], shared: Dict[str, int]) -> str:
+    kind, value = cell
+    if kind == "s":
+        index = shared.setdefault(value, len(shared))
+        return f'<c r="{ref}" t="s"><v>{index}</v></c>'
+    if kind == "inline":
+        return f'<c r="{ref}" t="inlineStr"><is>{_text(value)}</is></c>'
+    if kind == "rich":
+        runs = "".join(f"<r>{_text(run)}</r>" for run in value)
+        return f'<c r="{ref}" t="inlineStr"><is>{runs}</is></c>'
+    if kind == "str":
+        return f'<c r="{ref}" t="str"><f>"{escape(value)}"</f><v>{escape(value)}</v></c>'
+    if kind == "date":
+        style = 1 if float(value).is_integer() else 2
+        return f'<c r="{ref}" s="{style}"><v>{value}</v></c>'
+    if kind == "styled":
+        return f'<c r="{ref}" s="1"/>'
+    if kind in ("b", "e"):
+        return f'<c r="{ref}" t="{kind}"><v>{escape(value)}</v></c>'
+    return f'<c r="{ref}"><v>{value}</v></c>'
+
+
+def _sheet_xml(rows: SheetRows, shared: Dict[str, int]) -> str:
+    parts = [f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{_MAIN_NS}"><sheetData>']
+    for number, cells in rows:
+        parts.append(f'<row r="{number}">')
+        for index, cell in enumerate(cells):
+            if cell is not None:
+                parts.append(_cell_xml(f"{_column_letter(index)}{number}", cell, shared))
+        parts.append("</row>")
+    parts.append("</sheetData></worksheet>")
+    return "".join(parts)
+
+
+def write_corpus(path: Union[str, Path], sheets: Optional[Dict[str, SheetRows]] = None) -> Path:
+    """Write the corpus (or the given sheets) as one .xlsx workbook and return its path."""
+    sheets = CORPUS_SHEETS if sheets is None else sheets
+    shared: Dict[str, int] = {}
+    sheet_parts = [_sheet_xml(rows, shared) for rows in sheets.values()]
+    strings = "".join(f"<si>{_text(value)}</si>" for value in shared)
+
+    workbook = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>'
+        + "".join(
+            f'<sheet name="{escape(name)}" sheetId="{index}" r:id="rId{index}"/>'
+            for index, name in enumerate(sheets, start=1)
+        )
+        + "</sheets></workbook>"
+    )
+    count = len(sheets)
+    workbook_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        + "".join(
+            f'<Relationship Id="rId{index}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{index}.xml"/>'
+            for index in range(1, count + 1)
+        )
+        + f'<Relationship Id="rId{count + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+        + f'<Relationship Id="rId{count + 2}" Type="{_REL_NS}/sharedStrings" Target="sharedStrings.xml"/>'
+        + "</Relationships>"
+    )
+
+    path = Path(path)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES.format(sheets="".join(
+            _SHEET_CONTENT_TYPE.format(index=index) for index in range(1, count + 1)
+        )))
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", workbook)
+        archive.writestr("xl/_rels/workbook.xml.rels", workbook_rels)
+        archive.writestr("xl/styles.xml", _STYLES)
+        archive.writestr(
+            "xl/sharedStrings.xml",
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<sst xmlns="{_MAIN_NS}" count="{len(shared)}" uniqueCount="{len(shared)}">{strings}</sst>'
+        )
+        for index, sheet in enumerate(sheet_parts, start=1):
+            archive.writestr(f"xl/worksheets/sheet{index}.xml", sheet)
+    return path
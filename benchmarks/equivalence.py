@@ -0,0 +1,188 @@
+"""
+Engine equivalence check for Excel Stats Analyzer.
+Runs every stats path on the edge-case corpus (or a given workbook) and
+compares each one with calculate_column_stats on the sheet as the default
+openpyxl reader loads it. Run with ``python -m benchmarks.equivalence``;
+the exit code is 1 if any path differs.
+"""
+
+import argparse
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.corpus import write_corpus
+from excel_stats.backends import backend_installed
+from excel_stats.core import (
+    UNIQUE_COLUMN,
+    WorkbookSession,
+    analyze_sheet,
+    calculate_column_stats,
+    preview_frame,
+)
+from excel_stats.sampling import EST_AVAILABILITY_COLUMN, EST_UNIQUE_COLUMN, SAMPLED_ROWS_COLUMN
+from excel_stats.summaries import SummaryStore
+
+
+# Stats variants every path is checked in, as calculate_column_stats options
+VARIANTS: Dict[str, Dict[str, object]] = {
+    "exact": {},
+    "approx": {"approx_precision": 12},
+    "profile": {"column_profile": True},
+}
+
+# Whole-sheet readers compared with openpyxl, when installed
+_OTHER_XLSX_BACKENDS = ("calamine",)
+
+# Preview columns holding the exact numbers once every row is sampled
+_PREVIEW_COLUMNS = {EST_AVAILABILITY_COLUMN: "% Availability", EST_UNIQUE_COLUMN: UNIQUE_COLUMN}
+
+# Running sums that engines accumulate in different orders (cell by cell, or
+# per distinct value with its count), so they agree only up to rounding
+_ROUNDED_COLUMNS = ("Mean", "Std. Dev.")
+_RELATIVE_TOLERANCE = 1e-9
+
+# Sample size for the preview path, large enough to sample every corpus row
+_FULL_SAMPLE = 1_000_000
+
+# Sample size smaller than the data rows of most corpus sheets; the preview
+# must still sample this many rows (or all of them), whatever follows the data
+_SMALL_SAMPLE = 5
+
+
+def _preview_as_exact(stats_df: pd.DataFrame) -> pd.DataFrame:
+    """A full-sample preview table under the exact table's column names."""
+    return stats_df.rename(columns=_PREVIEW_COLUMNS)
+
+
+def _differences(name: str, expected: pd.DataFrame, actual: pd.DataFrame,
+                 columns: Optional[List[str]] = None) -> List[str]:
+    """Describe how actual differs from expected; empty if they match."""
+    if columns is not None and not expected.empty:
+        expected = expected[["Header Name", "Total Number of Transactions", *columns]]
+        actual = actual.reindex(columns=expected.columns)
+    if expected.equals(actual):
+        return []
+    if list(expected.columns) != list(actual.columns) or len(expected) != len(actual):
+        return [f"{name}: columns {list(actual.columns)} x {len(actual)} rows, "
+                f"expected {list(expected.columns)} x {len(expected)} rows"]
+    return [
+        f"{name}: {column} {actual[column].tolist()}, expected {expected[column].tolist()}"
+        for column in expected.columns
+        if not _columns_match(column, expected[column], actual[column])
+    ]
+
+
+def _columns_match(column: str, expected: pd.Series, actual: pd.Series) -> bool:
+    if column in _ROUNDED_COLUMNS and expected.dtype.kind == "f" and actual.dtype.kind == "f":
+        return bool(np.allclose(actual, expected, rtol=_RELATIVE_TOLERANCE, atol=0, equal_nan=True))
+    return expected.equals(actual)
+
+
+def _paths(session: WorkbookSession, sheet_name: str, options: Dict[str, object],
+           summaries: SummaryStore, spill_dir: str) -> Dict[str, Callable[[], pd.DataFrame]]:
+    """The stats paths to compare for one sheet and variant, by name."""
+    paths = {
+        "streaming": lambda: analyze_sheet(session, sheet_name, streaming=True, **options),
+        "xml": lambda: analyze_sheet(session, sheet_name, engine="xml", **options),
+        # The second run resumes the state saved by the first
+        "incremental": lambda: analyze_sheet(session, sheet_name, summaries=summaries, **options),
+        "incremental rerun": lambda: analyze_sheet(session, sheet_name, summaries=summaries, **options),
+    }
+    if "approx_precision" not in options:
+        # A one-byte limit spills every distinct value
+        paths["spill"] = lambda: analyze_sheet(
+            session, sheet_name, distinct_memory_limit=1, spill_dir=spill_dir, **options
+        )
+    return paths
+
+
+def check_workbook(workbook_path: Path) -> List[str]:
+    """Compare every stats path with calculate_column_stats; returns the mismatches."""
+    mismatches = []
+    with tempfile.TemporaryDirectory(prefix="excel_stats_equivalence_") as work_dir, \
+            WorkbookSession(str(workbook_path), "openpyxl") as session:
+        backends = [
+            WorkbookSession(str(workbook_path), backend)
+            for backend in _OTHER_XLSX_BACKENDS if backend_installed(backend)
+        ]
+        try:
+            for sheet_name in session.sheet_names:
+                df = session.read_sheet(sheet_name)
+                for variant, options in VARIANTS.items():
+                    expected = calculate_column_stats(df, **options)
+
+                    def compare(path: str, actual: pd.DataFrame, columns: Optional[List[str]] = None):
+                        mismatches.extend(
+                            _differences(f"{sheet_name} [{variant}] {path}", expected, actual, columns)
+                        )
+
+                    compare("pandas (object columns)", calculate_column_stats(df.astype(object), **options))
+                    for other in backends:
+                        compare(f"pandas ({other.backend})",
+                                calculate_column_stats(other.read_sheet(sheet_name), **options))
+                    summaries = SummaryStore(Path(work_dir) / variant / sheet_name.encode().hex())
+                    for path, run in _paths(session, sheet_name, options, summaries, work_dir).items():
+                        compare(path, run())
+                    if not options:
+                        compare("preview (every row sampled)",
+                                _preview_as_exact(analyze_sheet(session, sheet_name, sample_rows=_FULL_SAMPLE)),
+                                ["% Availability", UNIQUE_COLUMN])
+                        sampled = analyze_sheet(session, sheet_name, sample_rows=_SMALL_SAMPLE)
+                        if not sampled.empty and (sampled[SAMPLED_ROWS_COLUMN] != min(_SMALL_SAMPLE, len(df))).any():
+                            mismatches.append(
+                                f"{sheet_name} preview of {_SMALL_SAMPLE} rows: sampled "
+                                f"{sampled[SAMPLED_ROWS_COLUMN].iloc[0]} of {len(df)} rows"
+                            )
+                        # Nullable string columns (older pandas with pyarrow) hold blanks as pd.NA
+                        compare("preview (nullable string columns)",
+                                _preview_as_exact(preview_frame(df.astype(pd.StringDtype()), _FULL_SAMPLE)),
+                                ["% Availability", UNIQUE_COLUMN])
+        finally:
+            for other in backends:
+                other.close()
+    return mismatches
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.equivalence",
+        description="Check that every stats engine gives the same numbers as the pandas path "
+                    "on an edge-case workbook corpus."
+    )
+    parser.add_argument(
+        "--workbook", metavar="PATH", action="append",
+        help="Check this .xlsx workbook instead of the corpus (repeatable)"
+    )
+    parser.add_argument("--save-corpus", metavar="PATH", help="Keep the generated corpus workbook at PATH")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the check; returns 0 if every path matches, 1 otherwise."""
+    args = _build_parser().parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="excel_stats_corpus_") as temp_dir:
+        if args.workbook:
+            workbooks = [Path(path) for path in args.workbook]
+        else:
+            workbooks = [write_corpus(args.save_corpus or Path(temp_dir) / "corpus.xlsx")]
+        mismatches = []
+        with warnings.catch_warnings():
+            # The corpus deliberately holds cells readers warn about
+            warnings.simplefilter("ignore")
+            for workbook_path in workbooks:
+                mismatches.extend(f"{workbook_path.name}: {m}" for m in check_workbook(workbook_path))
+
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}", file=sys.stderr)
+    print(f"{len(mismatches)} mismatch(es)" if mismatches else "All engines match")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Benchmark harness for Excel Stats Analyzer.
+Times each stage of the analysis on a synthetic (or given) workbook, records
+peak memory, and compares the numbers against a stored baseline so that
+regressions show up.
+"""
+
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from benchmarks.synthetic import WorkbookSpec, generate_workbook, spec_dict
+from excel_stats.backends import READER_BACKENDS
+from excel_stats.core import WorkbookSession, analyze_sheet, calculate_column_stats, generate_output
+from excel_stats.discovery import list_sheet_names
+
+
+# read and stats are the default engine's two halves; xml and streaming are
+# the alternative read+stats paths, timed end to end
+STAGES = ("read", "stats", "write", "xml", "streaming")
+
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+
+# Peaks below this are too small to compare meaningfully
+_MIN_COMPARED_PEAK_MB = 1.0
+
+# Slowdowns up to this much are timer and scheduler noise, whatever the ratio
+_TIMING_NOISE_SECONDS = 0.05
+
+_REPORTED_PACKAGES = ("pandas", "numpy", "openpyxl", "xlrd", "pyarrow", "xlsxwriter", "python-calamine")
+
+
+def _digest(results: Dict[str, pd.DataFrame]) -> str:
+    """Fingerprint of a set of stats tables, to catch changed numbers."""
+    digest = hashlib.sha256()
+    for sheet_name, stats_df in results.items():
+        digest.update(str(sheet_name).encode())
+        digest.update(stats_df.to_csv(index=False).encode())
+    return digest.hexdigest()
+
+
+class BenchmarkRun:
+    """State shared by the stages of one benchmark: loaded frames and stats tables.
+
+    Each stage method does its work once and returns the number of rows it
+    processed. Stages that need an earlier stage's output run it first via
+    prepare(), outside the timed section.
+    """
+
+    def __init__(self, workbook_path: Path, work_dir: Path, backend: str = "auto"):
+        self.workbook_path = workbook_path
+        self.work_dir = work_dir
+        self.backend = backend
+        self.sheet_names = list_sheet_names(str(workbook_path))
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.results: Dict[str, pd.DataFrame] = {}
+        self.path_results: Dict[str, Dict[str, pd.DataFrame]] = {}
+
+    def prepare(self, stage: str):
+        """Produce the inputs stage depends on, if they are missing."""
+        if stage in ("stats", "write") and not self.frames:
+            self.read()
+        if stage == "write" and not self.results:
+            self.stats()
+
+    def read(self) -> int:
+        with WorkbookSession(str(self.workbook_path), self.backend) as session:
+            self.frames = {name: session.read_sheet(name) for name in self.sheet_names}
+        return sum(len(df) for df in self.frames.values())
+
+    def stats(self) -> int:
+        self.results = {name: calculate_column_stats(df) for name, df in self.frames.items()}
+        self.path_results["pandas"] = self.results
+        return sum(len(df) for df in self.frames.values())
+
+    def write(self) -> int:
+        output_path = Path(generate_output(self.results, str(self.work_dir / "bench.xlsx")))
+        output_path.unlink()
+        return sum(len(df) for df in self.results.values())
+
+    def _analyze(self, path: str, **options) -> int:
+        with WorkbookSession(str(self.workbook_path), self.backend) as session:
+            results = {name: analyze_sheet(session, name, **options) for name in self.sheet_names}
+        self.path_results[path] = results
+        return sum(int(df["Total Number of Transactions"].max()) if len(df) else 0 for df in results.values())
+
+    def xml(self) -> int:
+        return self._analyze("xml", engine="xml")
+
+    def streaming(self) -> int:
+        return self._analyze("streaming", streaming=True)
+
+    def stage(self, name: str) -> Callable[[], int]:
+        return getattr(self, name)
+
+
+def time_stage(run: BenchmarkRun, stage: str, repeat: int) -> Dict[str, Any]:
+    """Best and median wall time of a stage over repeat runs."""
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        run.prepare(stage)
+        start = time.perf_counter()
+        rows = run.stage(stage)()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "seconds": round(best, 4),
+        "median_seconds": round(statistics.median(timings), 4),
+        "rows": rows,
+        "rows_per_second": round(rows / best) if best > 0 else None,
+    }
+
+
+def measure_peak_memory(run: BenchmarkRun, stage: str) -> float:
+    """Peak traced memory of one run of a stage, in MB.
+
+    Covers allocations made through Python's allocator, numpy included;
+    memory allocated directly by native libraries (such as Arrow buffers) is
+    not seen. Tracing slows execution, so this is kept apart from timing.
+    """
+    run.prepare(stage)
+    tracemalloc.start()
+    try:
+        run.stage(stage)()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 2)
+
+
+def _environment() -> Dict[str, Any]:
+    packages = {}
+    for package in _REPORTED_PACKAGES:
+        try:
+            packages[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            pass
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "packages": packages,
+    }
+
+
+def run_benchmarks(workbook_path: Path, stages: List[str], repeat: int = DEFAULT_REPEAT,
+                   memory: bool = True, backend: str = "auto",
+                   spec: Optional[WorkbookSpec] = None) -> Dict[str, Any]:
+    """Benchmark the given stages on a workbook and return the JSON-ready results."""
+    with tempfile.TemporaryDirectory(prefix="excel_stats_bench_") as work_dir:
+        run = BenchmarkRun(workbook_path, Path(work_dir), backend)
+        results = {}
+        for stage in stages:
+            results[stage] = time_stage(run, stage, repeat)
+            if memory:
+                results[stage]["peak_mb"] = measure_peak_memory(run, stage)
+
+    return {
+        "workbook": spec_dict(spec) if spec is not None else {"path": str(workbook_path)},
+        "backend": backend,
+        "repeat": repeat,
+        "environment": _environment(),
+        "stages": results,
+        "digests": {path: _digest(stats) for path, stats in run.path_results.items()},
+    }
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Describe every regression of current against baseline; empty if none.
+
+    A stage regresses when its best time or peak memory exceeds the
+    baseline's by more than tolerance (0.25 = 25%). A time must also exceed
+    it by more than _TIMING_NOISE_SECONDS, so stages of a few milliseconds
+    do not fail on jitter, and peaks are only compared once the baseline's
+    reaches _MIN_COMPARED_PEAK_MB. Any change in the stats produced by a
+    path is reported as well.
+    """
+    if current["workbook"] != baseline["workbook"]:
+        raise ValueError("Baseline was recorded for a different workbook; rerun with the same spec")
+
+    regressions = []
+    for stage, numbers in current["stages"].items():
+        before = baseline["stages"].get(stage)
+        if before is None:
+            continue
+        allowed = before["seconds"] * (1 + tolerance) + _TIMING_NOISE_SECONDS
+        if before["seconds"] > 0 and numbers["seconds"] > allowed:
+            regressions.append(
+                f"{stage}: {numbers['seconds']:.3f}s vs {before['seconds']:.3f}s baseline "
+                f"({numbers['seconds'] / before['seconds']:.2f}x)"
+            )
+        if "peak_mb" in numbers and before.get("peak_mb", 0) >= _MIN_COMPARED_PEAK_MB:
+            if numbers["peak_mb"] > before["peak_mb"] * (1 + tolerance):
+                regressions.append(
+                    f"{stage}: peak {numbers['peak_mb']:.1f} MB vs {before['peak_mb']:.1f} MB baseline"
+                )
+    for path, digest in current["digests"].items():
+        if path in baseline.get("digests", {}) and baseline["digests"][path] != digest:
+            regressions.append(f"{path}: stats differ from the baseline's")
+    return regressions
+
+
+def format_table(current: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Human-readable summary of a benchmark run."""
+    lines = [f"{'stage':<10} {'best s':>9} {'median s':>9} {'rows/s':>11} {'peak MB':>9} {'vs base':>8}"]
+    for stage, numbers in current["stages"].items():
+        peak = numbers.get("peak_mb")
+        ratio = ""
+        before = (baseline or {}).get("stages", {}).get(stage)
+        if before and before["seconds"] > 0:
+            ratio = f"{numbers['seconds'] / before['seconds']:.2f}x"
+        lines.append(
+            f"{stage:<10} {numbers['seconds']:>9.3f} {numbers['median_seconds']:>9.3f} "
+            f"{numbers['rows_per_second'] or 0:>11,} {'' if peak is None else f'{peak:.1f}':>9} {ratio:>8}"
+        )
+    distinct = set(current["digests"].values())
+    if len(distinct) > 1:
+        lines.append("warning: stats differ between paths: " + ", ".join(sorted(current["digests"])))
+    return "\n".join(lines)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    defaults = WorkbookSpec()
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time the read, stats and write stages of Excel Stats Analyzer on a "
+                    "synthetic workbook and compare the results against a baseline."
+    )
+    workbook = parser.add_argument_group("synthetic workbook")
+    workbook.add_argument("--rows", type=int, default=defaults.rows, help=f"Data rows per sheet (default: {defaults.rows})")
+    workbook.add_argument("--columns", type=int, default=defaults.columns, help=f"Columns per sheet (default: {defaults.columns})")
+    workbook.add_argument("--sheets", type=int, default=defaults.sheets, help=f"Number of sheets (default: {defaults.sheets})")
+    workbook.add_argument(
+        "--blank-ratio", type=float, default=defaults.blank_ratio,
+        help=f"Fraction of empty cells (default: {defaults.blank_ratio})"
+    )
+    workbook.add_argument(
+        "--whitespace-ratio", type=float, default=defaults.whitespace_ratio,
+        help=f"Fraction of whitespace-only cells (default: {defaults.whitespace_ratio})"
+    )
+    workbook.add_argument(
+        "--cardinality", type=int, default=defaults.cardinality,
+        help=f"Distinct values per column (default: {defaults.cardinality})"
+    )
+    workbook.add_argument("--seed", type=int, default=defaults.seed, help=f"Random seed (default: {defaults.seed})")
+    workbook.add_argument("--save-workbook", metavar="PATH", help="Keep the generated workbook at PATH")
+    workbook.add_argument(
+        "--workbook", metavar="PATH",
+        help="Benchmark an existing workbook instead of generating one"
+    )
+
+    parser.add_argument(
+        "--stages", nargs="+", choices=STAGES, default=list(STAGES),
+        help="Stages to run (default: all)"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_REPEAT,
+        help=f"Timed runs per stage; the best is reported (default: {DEFAULT_REPEAT})"
+    )
+    parser.add_argument("--backend", choices=READER_BACKENDS, default="auto", help="Reader backend (default: auto)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak-memory pass")
+    parser.add_argument("--output", metavar="JSON", help="Write the results to this file")
+    parser.add_argument("--baseline", metavar="JSON", help="Compare against results saved earlier")
+    parser.add_argument("--save-baseline", metavar="JSON", help="Save these results as the new baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=DEFAULT_TOLERANCE,
+        help=f"Allowed slowdown or memory growth against the baseline, as a fraction "
+             f"(default: {DEFAULT_TOLERANCE})"
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks; returns 0 on success, 1 on regressions, 2 on usage errors."""
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    spec = WorkbookSpec(
+        rows=args.rows, columns=args.columns, sheets=args.sheets,
+        blank_ratio=args.blank_ratio, whitespace_ratio=args.whitespace_ratio,
+        cardinality=args.cardinality, seed=args.seed
+    )
+    try:
+        spec.validate()
+    except ValueError as e:
+        parser.error(str(e))
+
+    stages = [stage for stage in STAGES if stage in args.stages]
+    with tempfile.TemporaryDirectory(prefix="excel_stats_bench_") as temp_dir:
+        if args.workbook:
+            workbook_path = Path(args.workbook)
+            spec = None
+        else:
+            workbook_path = Path(args.save_workbook or Path(temp_dir) / "synthetic.xlsx")
+            print(f"Generating {workbook_path} ({spec.sheets} x {spec.rows} rows x {spec.columns} columns)...")
+            generate_workbook(workbook_path, spec)
+        current = run_benchmarks(workbook_path, stages, args.repeat, not args.no_memory, args.backend, spec)
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+    print(format_table(current, baseline))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2))
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(current, indent=2))
+
+    if baseline is None:
+        return 0
+    try:
+        regressions = compare_to_baseline(current, baseline, args.tolerance)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
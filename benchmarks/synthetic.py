@@ -0,0 +1,89 @@
+"""
+Synthetic workbook generator for the benchmarks.
+Workbooks are reproducible from their spec: the same spec and seed always
+produce the same cell values.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+import numpy as np
+from openpyxl import Workbook
+
+
+# Cycled across columns so every workbook mixes text and numeric data
+COLUMN_KINDS = ("text", "int", "float")
+
+WHITESPACE_VALUES = (" ", "  ", "\t")
+
+
+class WorkbookSpec(NamedTuple):
+    """Shape and content of a synthetic workbook.
+
+    blank_ratio and whitespace_ratio are the expected fractions of empty and
+    whitespace-only cells (both count as blank). cardinality is the number of
+    distinct values each column draws from.
+    """
+    rows: int = 10_000
+    columns: int = 20
+    sheets: int = 1
+    blank_ratio: float = 0.1
+    whitespace_ratio: float = 0.02
+    cardinality: int = 1_000
+    seed: int = 0
+
+    def validate(self):
+        """Raise ValueError if the spec cannot be generated."""
+        if self.rows < 0 or self.columns < 1 or self.sheets < 1 or self.cardinality < 1:
+            raise ValueError("rows must be >= 0; columns, sheets and cardinality must be >= 1")
+        if self.blank_ratio < 0 or self.whitespace_ratio < 0 or self.blank_ratio + self.whitespace_ratio > 1:
+            raise ValueError("blank_ratio and whitespace_ratio must be >= 0 and add up to at most 1")
+
+
+def _value_pool(kind: str, column: int, cardinality: int, rng: np.random.Generator) -> List[Any]:
+    """The distinct values a column draws from."""
+    if kind == "text":
+        return [f"c{column}_value_{i}" for i in range(cardinality)]
+    if kind == "int":
+        return (np.arange(cardinality, dtype=np.int64) * 7 + column).tolist()
+    return rng.uniform(-1e6, 1e6, cardinality).round(4).tolist()
+
+
+def _column_cells(kind: str, column: int, spec: WorkbookSpec, rng: np.random.Generator) -> List[Any]:
+    """One column's cells: pool values with blanks and whitespace mixed in."""
+    pool = _value_pool(kind, column, spec.cardinality, rng)
+    cells = [pool[i] for i in rng.integers(0, len(pool), spec.rows)]
+    draws = rng.random(spec.rows)
+    for row in np.flatnonzero(draws < spec.blank_ratio):
+        cells[row] = None
+    whitespace = (draws >= spec.blank_ratio) & (draws < spec.blank_ratio + spec.whitespace_ratio)
+    for row in np.flatnonzero(whitespace):
+        cells[row] = WHITESPACE_VALUES[row % len(WHITESPACE_VALUES)]
+    return cells
+
+
+def generate_workbook(path: Path, spec: WorkbookSpec) -> Path:
+    """Write a synthetic .xlsx workbook for spec to path and return the path.
+
+    Sheets are named Sheet1, Sheet2, ... and have a header row of
+    col_0, col_1, ... above spec.rows data rows.
+    """
+    spec.validate()
+    rng = np.random.default_rng(spec.seed)
+    workbook = Workbook(write_only=True)
+    for sheet in range(1, spec.sheets + 1):
+        worksheet = workbook.create_sheet(f"Sheet{sheet}")
+        columns = [
+            _column_cells(COLUMN_KINDS[column % len(COLUMN_KINDS)], column, spec, rng)
+            for column in range(spec.columns)
+        ]
+        worksheet.append([f"col_{column}" for column in range(spec.columns)])
+        for row in zip(*columns):
+            worksheet.append(row)
+    workbook.save(path)
+    return Path(path)
+
+
+def spec_dict(spec: WorkbookSpec) -> Dict[str, Any]:
+    """The spec as a JSON-serializable dict."""
+    return dict(spec._asdict())
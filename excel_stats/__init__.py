@@ -0,0 +1,61 @@
+"""
+Excel Stats Analyzer core package.
+GUI-independent analysis of Excel workbooks, usable from the desktop app or headless.
+"""
+
+from excel_stats.backends import READER_BACKENDS, available_backends, resolve_backend
+from excel_stats.cache import StatsCache
+from excel_stats.catalog import StatsCatalog
+from excel_stats.core import (
+    OUTPUT_MODES,
+    STATS_ENGINES,
+    SheetAccumulator,
+    WorkbookSession,
+    analyze_sheet,
+    analyze_sheet_incremental,
+    analyze_sheets,
+    analyze_workbook,
+    calculate_column_stats,
+    generate_output,
+    preview_frame,
+    preview_sheet,
+    report_metadata,
+    sheet_reader,
+    stream_column_stats,
+)
+from excel_stats.discovery import SheetInfo, discover_sheets, list_sheet_names
+from excel_stats.metrics import RunMetrics
+from excel_stats.report import REPORT_FORMATS
+from excel_stats.sheetxml import SheetCounts, SheetXmlReader
+from excel_stats.summaries import SummaryStore
+
+__all__ = [
+    "OUTPUT_MODES",
+    "READER_BACKENDS",
+    "REPORT_FORMATS",
+    "STATS_ENGINES",
+    "RunMetrics",
+    "SheetAccumulator",
+    "SheetCounts",
+    "SheetInfo",
+    "SheetXmlReader",
+    "StatsCache",
+    "StatsCatalog",
+    "SummaryStore",
+    "WorkbookSession",
+    "analyze_sheet",
+    "analyze_sheet_incremental",
+    "analyze_sheets",
+    "analyze_workbook",
+    "available_backends",
+    "calculate_column_stats",
+    "discover_sheets",
+    "generate_output",
+    "list_sheet_names",
+    "preview_frame",
+    "preview_sheet",
+    "report_metadata",
+    "resolve_backend",
+    "sheet_reader",
+    "stream_column_stats",
+]
@@ -0,0 +1,8 @@
+"""Allow running the command-line interface with ``python -m excel_stats``."""
+
+import sys
+
+from excel_stats.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
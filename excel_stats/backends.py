@@ -0,0 +1,94 @@
+"""
+Reader backends for Excel Stats Analyzer.
+Maps each input file to the pandas reader engine used to load its sheets.
+"auto" keeps to the reader pandas itself defaults to, so results do not
+depend on which optional readers are installed; faster readers such as
+calamine are opt-in.
+"""
+
+import importlib.util
+from pathlib import Path
+from typing import List, Optional
+
+from pandas.io.excel._base import ExcelFile, inspect_excel_format
+from pandas.io.excel._util import get_default_engine
+
+
+READER_BACKENDS = ("auto", "openpyxl", "xlrd", "calamine", "csv")
+
+CSV_SUFFIXES = (".csv",)
+
+# Reader "auto" falls back to when pandas' default reader for a format is not
+# installed. calamine is faster but turns some dates and floats into different
+# text than the default readers do, which changes unique counts, so it is
+# never picked over them
+_FALLBACK_BACKEND = "calamine"
+
+# Module each backend needs; the CSV backend only uses pandas. Readers not
+# listed (pandas' defaults for other formats) are named after their module
+_BACKEND_MODULES = {
+    "openpyxl": "openpyxl",
+    "xlrd": "xlrd",
+    "calamine": "python_calamine",
+    "csv": None,
+}
+
+
+def backend_installed(backend: str) -> bool:
+    """Whether a reader backend's package can be imported and pandas supports it."""
+    module = _BACKEND_MODULES.get(backend, backend)
+    if module is not None and importlib.util.find_spec(module) is None:
+        return False
+    # pandas gained the calamine engine in 2.2
+    return backend == "csv" or backend in ExcelFile._engines
+
+
+def available_backends() -> List[str]:
+    """Reader backends usable here, "auto" first."""
+    return ["auto"] + [backend for backend in READER_BACKENDS[1:] if backend_installed(backend)]
+
+
+def file_format(file_path: str) -> Optional[str]:
+    """"csv" for CSV files, else the spreadsheet format pandas detects from the content.
+
+    Returns None if the format cannot be determined.
+    """
+    if Path(file_path).suffix.lower() in CSV_SUFFIXES:
+        return "csv"
+    try:
+        return inspect_excel_format(file_path)
+    except (OSError, ValueError):
+        return None
+
+
+def csv_sheet_name(file_path: str) -> str:
+    """Name under which a CSV file's single sheet is reported."""
+    return Path(file_path).stem
+
+
+def resolve_backend(file_path: str, backend: str = "auto") -> Optional[str]:
+    """Concrete reader backend for a file.
+
+    An explicit backend is returned as is (if installed). "auto" picks
+    pandas' default engine for the file's format, or calamine if that engine
+    is not installed; None means the format is unknown and pandas should
+    decide.
+    """
+    if backend not in READER_BACKENDS:
+        raise ValueError(f"Unknown reader backend: {backend}")
+    if backend != "auto":
+        if not backend_installed(backend):
+            if backend == "calamine" and importlib.util.find_spec("python_calamine") is not None:
+                raise ValueError("Reader backend 'calamine' requires pandas 2.2 or later")
+            raise ValueError(f"Reader backend '{backend}' is not installed")
+        return backend
+
+    fmt = file_format(file_path)
+    if fmt is None:
+        return None
+    if fmt == "csv":
+        return "csv"
+    default = get_default_engine(fmt)
+    if not backend_installed(default) and backend_installed(_FALLBACK_BACKEND):
+        return _FALLBACK_BACKEND
+    return default
@@ -0,0 +1,176 @@
+"""
+On-disk result cache for Excel Stats Analyzer.
+Stores per-sheet stats DataFrames keyed by workbook content and sheet name,
+so rerunning an analysis on an unchanged workbook skips reading the sheets.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+
+# Default upper bound on the total size of cached stats files
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+"""
+
+
+def default_cache_dir() -> Path:
+    """Per-user cache directory, overridable with EXCEL_STATS_CACHE_DIR."""
+    override = os.environ.get("EXCEL_STATS_CACHE_DIR")
+    if override:
+        return Path(override)
+    if os.name == "nt":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home()))
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "excel_stats"
+
+
+class StatsCache:
+    """Size-bounded, least-recently-used cache of per-sheet stats DataFrames.
+
+    Entries are keyed by a SHA-256 digest of the workbook contents, the sheet
+    name and a variant string describing the stats version and options. The
+    digest is remembered per path together with the file's size and mtime, so
+    unchanged files are not rehashed. The index lives in SQLite, which keeps
+    the cache safe to share between concurrent processes.
+
+    hits and misses count lookups made through this instance.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Short-lived connections keep the object picklable for worker processes
+        return sqlite3.connect(self.cache_dir / "index.db", timeout=30)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def file_key(self, file_path: str) -> str:
+        """Content digest of a workbook, reusing the stored one if size and mtime match."""
+        path = str(Path(file_path).resolve())
+        stat = os.stat(path)
+
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT digest FROM fingerprints WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+                    digest.update(chunk)
+
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+                )
+            return digest.hexdigest()
+
+    @staticmethod
+    def _entry_key(file_key: str, sheet_name: str, variant: str) -> str:
+        return hashlib.sha256(f"{file_key}\0{sheet_name}\0{variant}".encode("utf-8")).hexdigest()
+
+    def get(self, file_key: str, sheet_name: str, variant: str) -> Optional[pd.DataFrame]:
+        """Return the cached stats for a sheet, or None on a miss."""
+        key = self._entry_key(file_key, sheet_name, variant)
+        entry_path = self._entry_path(key)
+
+        with closing(self._connect()) as conn:
+            known = conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+            stats_df = None
+            if known is not None:
+                try:
+                    stats_df = pd.read_pickle(entry_path)
+                except Exception:
+                    # Missing or unreadable entry: drop it and recompute
+                    entry_path.unlink(missing_ok=True)
+
+            with conn:
+                if stats_df is None:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                else:
+                    conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+
+        if stats_df is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return stats_df
+
+    def put(self, file_key: str, sheet_name: str, variant: str, stats_df: pd.DataFrame):
+        """Store a sheet's stats, then evict least recently used entries over the size limit."""
+        key = self._entry_key(file_key, sheet_name, variant)
+        entry_path = self._entry_path(key)
+
+        # Write under a temporary name so readers never see a partial file
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        stats_df.to_pickle(tmp_path)
+        os.replace(tmp_path, entry_path)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, size, last_access) VALUES (?, ?, ?)",
+                (key, entry_path.stat().st_size, time.time())
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._entry_path(key).unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        """Remove every cached entry and remembered fingerprint."""
+        with closing(self._connect()) as conn, conn:
+            for (key,) in conn.execute("SELECT key FROM entries").fetchall():
+                self._entry_path(key).unlink(missing_ok=True)
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM fingerprints")
+
+    def summary(self) -> str:
+        """Short hit/miss description for status lines."""
+        return f"cache: {self.hits} hit(s), {self.misses} miss(es)"
@@ -0,0 +1,286 @@
+"""
+Stats catalog for Excel Stats Analyzer.
+Every recorded run's per-sheet, per-column stats go into one indexed SQLite
+database, so trends over many exports and comparisons between files are
+answered from the index without reopening any workbook or report. Query it
+with StatsCatalog's methods or ``python -m excel_stats.query --help``.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+from excel_stats.sampling import (
+    AVAILABILITY_HIGH_COLUMN,
+    AVAILABILITY_LOW_COLUMN,
+    EST_AVAILABILITY_COLUMN,
+    EST_UNIQUE_COLUMN,
+    SAMPLED_ROWS_COLUMN,
+)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    run_time REAL NOT NULL,
+    file_path TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_mtime REAL,
+    report_path TEXT,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_file ON runs (file_path, run_time);
+CREATE TABLE IF NOT EXISTS column_stats (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    run_time REAL NOT NULL,
+    file_path TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    sheet_name TEXT NOT NULL,
+    column_position INTEGER NOT NULL,
+    column_name TEXT NOT NULL,
+    total_rows INTEGER NOT NULL,
+    available INTEGER,
+    availability_pct REAL NOT NULL,
+    availability_ci_low REAL,
+    availability_ci_high REAL,
+    unique_values INTEGER,
+    estimated INTEGER NOT NULL,
+    sampled_rows INTEGER,
+    inferred_type TEXT,
+    min_value REAL,
+    max_value REAL,
+    mean REAL,
+    std_dev REAL,
+    PRIMARY KEY (run_id, sheet_name, column_position)
+);
+CREATE INDEX IF NOT EXISTS column_stats_key ON column_stats (column_name, file_path, sheet_name, run_time);
+CREATE INDEX IF NOT EXISTS column_stats_file ON column_stats (file_path, sheet_name, run_time);
+"""
+
+# column_stats fields filled from the stats table column of the same meaning,
+# whichever of the exact, approximate or sampled variants it has
+_STATS_FIELDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("total_rows", ("Total Number of Transactions",)),
+    ("available", ("Count of Availability",)),
+    ("availability_pct", ("% Availability", EST_AVAILABILITY_COLUMN)),
+    ("availability_ci_low", (AVAILABILITY_LOW_COLUMN,)),
+    ("availability_ci_high", (AVAILABILITY_HIGH_COLUMN,)),
+    ("unique_values", ("No of Unique Values", "No of Unique Values (approx.)", EST_UNIQUE_COLUMN)),
+    ("sampled_rows", (SAMPLED_ROWS_COLUMN,)),
+    ("inferred_type", ("Inferred Type",)),
+    ("min_value", ("Min",)),
+    ("max_value", ("Max",)),
+    ("mean", ("Mean",)),
+    ("std_dev", ("Std. Dev.",)),
+)
+
+# Columns returned by the column queries, in order
+_RESULT_FIELDS = (
+    "run_time", "file_path", "sheet_name", "column_name", "total_rows", "available",
+    "availability_pct", "availability_ci_low", "availability_ci_high", "unique_values",
+    "estimated", "sampled_rows", "inferred_type", "min_value", "max_value", "mean", "std_dev",
+)
+
+
+def default_catalog_path() -> Path:
+    """Per-user catalog database, overridable with EXCEL_STATS_CATALOG."""
+    override = os.environ.get("EXCEL_STATS_CATALOG")
+    if override:
+        return Path(override)
+    if os.name == "nt":
+        base = Path(os.environ.get("APPDATA", Path.home()))
+    else:
+        base = Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share"))
+    return base / "excel_stats" / "catalog.db"
+
+
+def timestamp(value: Union[str, float, datetime, None]) -> Optional[float]:
+    """Seconds since the epoch for an ISO date/time string, datetime or number.
+
+    Dates and times without a UTC offset are taken as UTC, the time zone
+    run_time is shown in by the queries.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _plain(value: Any) -> Any:
+    """A stats cell as a value SQLite can store; NaN becomes NULL."""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    value = value.item() if hasattr(value, "item") else value
+    if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+        # Beyond SQLite's integers; the REAL columns they go into round them anyway
+        return float(value)
+    return value
+
+
+class StatsCatalog:
+    """Indexed history of per-column stats across files and runs.
+
+    Each recorded run stores one row per analyzed column, keyed by file,
+    sheet, column and run time. Paths are stored resolved; file patterns in
+    queries are SQLite GLOB patterns matched against the full path or the
+    file name ("exports/*.xlsx", "Sales_2024-*"). Query results show run_time
+    in UTC, and since/before times without a UTC offset are read as UTC too.
+    Like StatsCache, it opens a short-lived connection per call, so it can be
+    shared with worker processes and concurrent runs.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path is not None else default_catalog_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def record_run(self, file_path: str, results: Dict[str, pd.DataFrame],
+                   report_path: Optional[str] = None,
+                   metadata: Optional[Dict[str, str]] = None,
+                   run_time: Optional[float] = None) -> int:
+        """Store one run's per-sheet stats tables and return its run id."""
+        path = Path(file_path).resolve()
+        run_time = time.time() if run_time is None else run_time
+        try:
+            file_mtime = path.stat().st_mtime
+        except OSError:
+            file_mtime = None
+
+        rows = []
+        for sheet_name, stats_df in results.items():
+            if stats_df.empty:
+                continue
+            fields = {
+                field: next((stats_df[name] for name in names if name in stats_df.columns), None)
+                for field, names in _STATS_FIELDS
+            }
+            estimated = "No of Unique Values" not in stats_df.columns
+            for position, column_name in enumerate(stats_df["Header Name"]):
+                rows.append((
+                    run_time, str(path), path.name, sheet_name, position, str(column_name),
+                    *(_plain(column.iloc[position]) if column is not None else None
+                      for column in fields.values()),
+                    int(estimated),
+                ))
+
+        with closing(self._connect()) as conn, conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (run_time, file_path, file_name, file_mtime, report_path, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_time, str(path), path.name, file_mtime,
+                 str(Path(report_path).resolve()) if report_path else None, json.dumps(metadata or {}))
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO column_stats (run_id, run_time, file_path, file_name, sheet_name, column_position, "
+                f"column_name, {', '.join(field for field, _ in _STATS_FIELDS)}, estimated) "
+                f"VALUES ({', '.join('?' * (len(_STATS_FIELDS) + 8))})",
+                [(run_id, *row) for row in rows]
+            )
+        return run_id
+
+    @staticmethod
+    def _filters(file_pattern: Optional[str], sheet: Optional[str],
+                 since: Union[str, float, datetime, None], prefix: str = "") -> Tuple[str, list]:
+        clauses, params = [], []
+        if file_pattern is not None:
+            # Patterns with a directory part also match relative to the working directory
+            resolved = str(Path(file_pattern).resolve()) if Path(file_pattern).name != file_pattern else file_pattern
+            clauses.append(f"({prefix}file_path GLOB ? OR {prefix}file_path GLOB ? OR {prefix}file_name GLOB ?)")
+            params += [file_pattern, resolved, file_pattern]
+        if sheet is not None:
+            clauses.append(f"{prefix}sheet_name = ?")
+            params.append(sheet)
+        if since is not None:
+            clauses.append(f"{prefix}run_time >= ?")
+            params.append(timestamp(since))
+        return " AND ".join(clauses) or "1", params
+
+    def _frame(self, sql: str, params: list) -> pd.DataFrame:
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        if "run_time" in df.columns:
+            df["run_time"] = pd.to_datetime(df["run_time"], unit="s", utc=True).dt.tz_convert(None)
+        if "estimated" in df.columns:
+            df["estimated"] = df["estimated"].astype(bool)
+        return df
+
+    def column_history(self, column: str, file_pattern: Optional[str] = None,
+                       sheet: Optional[str] = None, last: Optional[int] = None,
+                       since: Union[str, float, datetime, None] = None) -> pd.DataFrame:
+        """A column's stats in every matching run, oldest first.
+
+        last keeps only the most recent last runs that have the column, e.g.
+        the last 90 exports of a daily file; since drops older runs.
+        """
+        where, params = self._filters(file_pattern, sheet, since)
+        where = f"column_name = ? AND {where}"
+        params = [column, *params]
+        if last is not None:
+            where += (
+                " AND run_id IN (SELECT DISTINCT run_id FROM column_stats WHERE "
+                f"{where} ORDER BY run_time DESC LIMIT ?)"
+            )
+            params = [*params, *params, last]
+        return self._frame(
+            f"SELECT {', '.join(_RESULT_FIELDS)} FROM column_stats WHERE {where} "
+            "ORDER BY run_time, file_path, sheet_name",
+            params
+        )
+
+    def compare_files(self, column: str, file_pattern: Optional[str] = None,
+                      sheet: Optional[str] = None) -> pd.DataFrame:
+        """A column's stats from the latest run of each matching file and sheet."""
+        where, params = self._filters(file_pattern, sheet, None, prefix="s.")
+        return self._frame(
+            f"SELECT {', '.join('s.' + field for field in _RESULT_FIELDS)} FROM column_stats s "
+            f"WHERE s.column_name = ? AND {where} AND s.run_time = ("
+            "SELECT MAX(run_time) FROM column_stats l WHERE l.column_name = s.column_name "
+            "AND l.file_path = s.file_path AND l.sheet_name = s.sheet_name) "
+            "ORDER BY s.file_path, s.sheet_name",
+            [column, *params]
+        )
+
+    def columns(self, file_pattern: Optional[str] = None, sheet: Optional[str] = None) -> pd.DataFrame:
+        """Columns in the catalog with the number of runs and files that have them."""
+        where, params = self._filters(file_pattern, sheet, None)
+        return self._frame(
+            "SELECT column_name, COUNT(DISTINCT file_path) AS files, COUNT(DISTINCT run_id) AS runs, "
+            f"MAX(run_time) AS run_time FROM column_stats WHERE {where} "
+            "GROUP BY column_name ORDER BY column_name",
+            params
+        ).rename(columns={"run_time": "last_run"})
+
+    def runs(self, file_pattern: Optional[str] = None, last: Optional[int] = None,
+             since: Union[str, float, datetime, None] = None) -> pd.DataFrame:
+        """Recorded runs, newest first."""
+        where, params = self._filters(file_pattern, None, since)
+        sql = (
+            "SELECT run_id, run_time, file_path, report_path, metadata, "
+            "(SELECT COUNT(*) FROM column_stats s WHERE s.run_id = runs.run_id) AS columns "
+            f"FROM runs WHERE {where} ORDER BY run_time DESC"
+        )
+        if last is not None:
+            sql += " LIMIT ?"
+            params.append(last)
+        return self._frame(sql, params)
+
+    def delete_runs(self, before: Union[str, float, datetime]) -> int:
+        """Remove runs recorded before a point in time; returns how many were removed."""
+        with closing(self._connect()) as conn, conn:
+            return conn.execute("DELETE FROM runs WHERE run_time < ?", (timestamp(before),)).rowcount
@@ -0,0 +1,265 @@
+"""
+Command-line interface for Excel Stats Analyzer.
+Analyzes many workbooks headlessly, several files at a time.
+"""
+
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from excel_stats.backends import READER_BACKENDS
+from excel_stats.cache import StatsCache
+from excel_stats.catalog import StatsCatalog
+from excel_stats.core import OUTPUT_MODES, STATS_ENGINES, analyze_workbook
+from excel_stats.report import REPORT_FORMATS
+from excel_stats.sampling import CONFIDENCE_LEVEL, SAMPLE_SIZE
+from excel_stats.sketch import DEFAULT_PRECISION, MAX_PRECISION, MIN_PRECISION
+from excel_stats.summaries import SummaryStore
+
+
+EXCEL_EXTENSIONS = {".xlsx", ".xls", ".xlsm"}
+
+# Reports written by earlier runs: <name>_stats.xlsx, <name>_stats_1.xlsx, ...
+_REPORT_NAME = re.compile(r"_stats(_\d+)?\.xlsx$", re.IGNORECASE)
+
+
+def _is_candidate(path: Path) -> bool:
+    """Whether a file found by directory or glob expansion should be analyzed."""
+    return (
+        path.suffix.lower() in EXCEL_EXTENSIONS
+        and not path.name.startswith("~$")  # Excel lock files
+        and not _REPORT_NAME.search(path.name)
+    )
+
+
+def expand_inputs(inputs: List[str], recursive: bool = False) -> List[str]:
+    """Resolve files, directories and glob patterns into a sorted list of workbooks.
+    
+    Files named explicitly are always kept. Directory and glob matches skip
+    Excel lock files and stats reports produced by earlier runs.
+    """
+    found = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_file():
+            found.add(str(path))
+        elif path.is_dir():
+            pattern = "**/*" if recursive else "*"
+            found.update(str(p) for p in path.glob(pattern) if p.is_file() and _is_candidate(p))
+        else:
+            found.update(
+                match for match in glob.glob(item, recursive=recursive)
+                if Path(match).is_file() and _is_candidate(Path(match))
+            )
+    return sorted(found)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m excel_stats",
+        description="Calculate per-column statistics for Excel workbooks without the GUI."
+    )
+    parser.add_argument(
+        "inputs", nargs="+",
+        help="Excel files, directories or glob patterns (quote globs to avoid shell expansion)"
+    )
+    parser.add_argument(
+        "-m", "--mode", choices=OUTPUT_MODES, default="separate",
+        help="separate: one tab per sheet; consolidated: all stats in a single tab (default: separate)"
+    )
+    parser.add_argument(
+        "-f", "--format", dest="report_format", choices=REPORT_FORMATS, default="xlsx",
+        help="Report file type; csv and parquet write one flat table with a Sheet Name "
+             "column, for downstream jobs (parquet needs pyarrow) (default: xlsx)"
+    )
+    parser.add_argument(
+        "-s", "--sheet", dest="sheets", action="append", metavar="NAME",
+        help="Sheet to analyze; repeat for several (default: all sheets)"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1,
+        help="Number of files analyzed concurrently (default: CPU count)"
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true",
+        help="Search directories and ** globs recursively"
+    )
+    parser.add_argument(
+        "--streaming", action="store_true",
+        help="Low-memory mode: read .xlsx/.xlsm rows incrementally"
+    )
+    parser.add_argument(
+        "--engine", choices=STATS_ENGINES, default="pandas",
+        help="xml: count .xlsx/.xlsm sheets straight from their sheet XML, which is faster "
+             "and uses little memory; other formats use pandas (default: pandas)"
+    )
+    parser.add_argument(
+        "--backend", choices=READER_BACKENDS, default="auto",
+        help="Reader for whole-sheet loads; auto uses pandas' default reader for each file type "
+             "(openpyxl for .xlsx, xlrd for .xls) and calamine only if that one is missing. "
+             "calamine is faster but can read dates and floats as different text. The streaming, "
+             "xml, incremental, spill and preview paths read .xlsx/.xlsm sheets from their sheet "
+             "XML instead (default: auto)"
+    )
+    parser.add_argument(
+        "--cache", action="store_true",
+        help="Reuse per-sheet results cached from earlier runs on unchanged files"
+    )
+    parser.add_argument(
+        "--cache-dir", metavar="DIR",
+        help="Cache location (implies --cache; default: per-user cache directory)"
+    )
+    parser.add_argument(
+        "--catalog", metavar="PATH",
+        help="Stats catalog every run is recorded in, for trend and cross-file queries with "
+             "python -m excel_stats.query (default: per-user data directory)"
+    )
+    parser.add_argument(
+        "--no-catalog", action="store_true",
+        help="Do not record this run in the stats catalog"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only read rows appended since the previous run (append-only .xlsx/.xlsm sheets)"
+    )
+    parser.add_argument(
+        "--approximate", action="store_true",
+        help="Estimate unique counts with a fixed-memory HyperLogLog sketch"
+    )
+    parser.add_argument(
+        "--precision", type=int, default=DEFAULT_PRECISION, metavar="P",
+        help=f"Sketch precision for --approximate, {MIN_PRECISION}-{MAX_PRECISION}; "
+             f"error is about 1.04/sqrt(2**P) (default: {DEFAULT_PRECISION})"
+    )
+    parser.add_argument(
+        "--column-profile", action="store_true",
+        help="Also report each column's inferred type, numeric min/max/mean/std. dev., "
+             "text length range and most frequent values, computed in the same pass"
+    )
+    parser.add_argument(
+        "--preview", type=int, nargs="?", const=SAMPLE_SIZE, metavar="ROWS",
+        help=f"Quick preview: estimate availability (with {CONFIDENCE_LEVEL}%% confidence intervals) "
+             f"and unique counts from a random sample of ROWS rows per sheet "
+             f"(default: {SAMPLE_SIZE:,})"
+    )
+    parser.add_argument(
+        "--distinct-memory-limit", type=int, metavar="MB",
+        help="Exact unique counts with at most about MB megabytes of distinct values in memory "
+             "per sheet, spilling the rest to disk (.xlsx/.xlsm; not with --incremental)"
+    )
+    parser.add_argument(
+        "--spill-dir", metavar="DIR",
+        help="Directory for temporary spill files (default: system temp directory)"
+    )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="Record time, rows/s and peak memory per sheet and stage in a Run Metrics tab "
+             "and a <report>.metrics.json file"
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="Also trace Python allocations per stage (implies --metrics; slows the run)"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Profile each run with cProfile and save <report>.prof next to the report"
+    )
+    return parser
+
+
+def _analyze_files(files: List[str], args: argparse.Namespace) -> Iterator[Tuple[str, Optional[str], Optional[Exception]]]:
+    """Analyze files, yielding (file_path, output_path, error) as each finishes."""
+    cache = StatsCache(args.cache_dir) if args.cache or args.cache_dir else None
+    catalog = None
+    if not args.no_catalog:
+        try:
+            catalog = StatsCatalog(args.catalog)
+        except (sqlite3.Error, OSError) as e:
+            # Reports do not depend on the catalog, so analyze without recording
+            print(f"warning: stats catalog unavailable, runs are not recorded: {e}", file=sys.stderr)
+    summaries = None
+    if args.incremental:
+        summaries = SummaryStore(Path(args.cache_dir) / "summaries" if args.cache_dir else None)
+    options = dict(
+        sheet_names=args.sheets,
+        output_mode=args.mode,
+        streaming=args.streaming,
+        cache=cache,
+        summaries=summaries,
+        approx_precision=args.precision if args.approximate else None,
+        distinct_memory_limit=args.distinct_memory_limit * 1024 * 1024 if args.distinct_memory_limit else None,
+        spill_dir=args.spill_dir,
+        engine=args.engine,
+        backend=args.backend,
+        report_format=args.report_format,
+        metrics=args.metrics,
+        trace_memory=args.trace_memory,
+        profile=args.profile,
+        column_profile=args.column_profile,
+        sample_rows=args.preview,
+        catalog=catalog
+    )
+    
+    if args.jobs == 1 or len(files) == 1:
+        for file_path in files:
+            try:
+                yield file_path, analyze_workbook(file_path, **options), None
+            except Exception as e:
+                yield file_path, None, e
+        return
+        
+    with ProcessPoolExecutor(max_workers=min(args.jobs, len(files))) as executor:
+        futures = {
+            executor.submit(analyze_workbook, file_path, **options): file_path
+            for file_path in files
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+                
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the CLI; returns 0 on success, 1 if any file failed, 2 on usage errors."""
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if not MIN_PRECISION <= args.precision <= MAX_PRECISION:
+        parser.error(f"--precision must be between {MIN_PRECISION} and {MAX_PRECISION}")
+    if args.distinct_memory_limit is not None and args.distinct_memory_limit < 1:
+        parser.error("--distinct-memory-limit must be at least 1 MB")
+    if args.distinct_memory_limit is not None and args.incremental:
+        parser.error("--distinct-memory-limit cannot be combined with --incremental")
+    if args.preview is not None and args.preview < 1:
+        parser.error("--preview must sample at least 1 row")
+    if args.catalog and args.no_catalog:
+        parser.error("--catalog and --no-catalog are mutually exclusive")
+        
+    files = expand_inputs(args.inputs, args.recursive)
+    if not files:
+        print("error: no Excel files found", file=sys.stderr)
+        return 2
+        
+    failures = 0
+    for file_path, output_path, error in _analyze_files(files, args):
+        if error is not None:
+            failures += 1
+            print(f"FAILED {file_path}: {error}", file=sys.stderr)
+        else:
+            print(f"{file_path} -> {output_path}")
+            
+    print(f"Processed {len(files)} file(s), {failures} failed", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1261 @@
+"""
+Analysis core for Excel Stats Analyzer.
+Reads workbooks, calculates per-column statistics and writes the report,
+independently of the GUI so it can also run headless.
+"""
+
+import cProfile
+import math
+import multiprocessing
+import numpy as np
+import os
+import pandas as pd
+import queue
+import sqlite3
+import time
+import warnings
+from pandas._libs.parsers import STR_NA_VALUES
+from pandas.io.parsers import TextParser
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from excel_stats.backends import csv_sheet_name, file_format, resolve_backend
+from excel_stats.cache import StatsCache
+from excel_stats.catalog import StatsCatalog
+from excel_stats.discovery import discover_sheets, list_sheet_names
+from excel_stats.metrics import METRICS_SHEET_NAME, RunMetrics, measure, metrics_path, profile_path
+from excel_stats.profiling import ColumnProfile, profile_columns
+from excel_stats.progress import (
+    PROGRESS_INTERVAL, PROGRESS_ROWS, AnalysisCancelled, ProgressCallback, ProgressTracker,
+    RowCallback, check_cancelled
+)
+from excel_stats.report import REPORT_FORMATS, sheet_titles, write_table, write_xlsx
+from excel_stats.sampling import CONFIDENCE_LEVEL, SAMPLE_SIZE, sample_positions, sampled_stats
+from excel_stats.sheetxml import SheetCounts, SheetXmlReader, _cell_text
+from excel_stats.sketch import HyperLogLog, hash_strings, hash_values
+from excel_stats.spill import DistinctSpillPool
+from excel_stats.summaries import SummaryStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Optional: without it, sheets are held as Python string objects
+    pa = pc = None
+
+
+OUTPUT_MODES = ("separate", "consolidated")
+
+# "pandas" reads sheets through pd.read_excel (or converted rows when
+# streaming); "xml" counts straight from .xlsx/.xlsm sheet XML
+STATS_ENGINES = ("pandas", "xml")
+
+# Bump whenever a change alters the numbers produced for the same input, so
+# results cached by older versions are not reused (2: new sketch value hash)
+STATS_VERSION = 2
+
+UNIQUE_COLUMN = 'No of Unique Values'
+APPROX_UNIQUE_COLUMN = 'No of Unique Values (approx.)'
+UNIQUE_ERROR_COLUMN = 'Unique Values Std. Error (±%)'
+
+# Cells hashed into a column's sketch at a time in approximate mode
+SKETCH_CHUNK_CELLS = 1 << 16
+
+# Reader reported for .xlsx/.xlsm sheets read straight from their sheet XML
+XML_READER = "sheet XML"
+
+
+def _cache_variant(approx_precision: Optional[int], backend: Optional[str] = None,
+                   column_profile: bool = False, sample_rows: Optional[int] = None) -> str:
+    """Cache/summary variant for the stats options that change the numbers."""
+    variant = f"stats-v{STATS_VERSION}"
+    if sample_rows is not None:
+        variant += f"-sample{sample_rows}"
+    if approx_precision is not None:
+        variant += f"-hll{approx_precision}"
+    if column_profile:
+        variant += "-profile"
+    if backend == "calamine":
+        # calamine converts some cell values (dates, floats) differently from openpyxl/xlrd
+        variant += "-calamine"
+    return variant
+
+
+def _is_arrow_string(dtype) -> bool:
+    """Whether a column dtype stores its strings in Arrow memory."""
+    if pa is None:
+        return False
+    if isinstance(dtype, pd.StringDtype):
+        return dtype.storage == "pyarrow"
+    if isinstance(dtype, pd.ArrowDtype):
+        return pa.types.is_string(dtype.pyarrow_dtype) or pa.types.is_large_string(dtype.pyarrow_dtype)
+    return False
+
+
+def _to_arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Move object string columns into Arrow storage, one column at a time.
+    
+    pandas 3 already reads dtype=str as Arrow-backed strings when pyarrow is
+    installed; this covers older pandas, where dtype=str gives object columns.
+    """
+    if pa is None:
+        return df
+    for idx, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            df.isetitem(idx, df.iloc[:, idx].astype(pd.StringDtype("pyarrow")))
+    return df
+
+
+def _arrow_non_blank(array) -> Any:
+    """Boolean Arrow mask of cells that are neither null nor whitespace-only.
+    
+    Arrow's whitespace is the same set of characters as str.strip()'s.
+    """
+    return pc.fill_null(pc.not_equal(pc.utf8_trim_whitespace(array), ""), False)
+
+
+def _as_arrow_strings(values: np.ndarray) -> Any:
+    """An object array as an Arrow string array (NaN/None as nulls), or None
+    without pyarrow or if it holds anything but strings and missing values."""
+    if pa is None:
+        return None
+    try:
+        return pa.array(values, type=pa.large_string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+
+def _sketch_arrow_strings(array, sketch: HyperLogLog) -> int:
+    """Hash an Arrow string array's non-blank cells into sketch; returns their count."""
+    count = 0
+    for start in range(0, len(array), SKETCH_CHUNK_CELLS):
+        chunk = array.slice(start, SKETCH_CHUNK_CELLS)
+        non_blank = chunk.filter(_arrow_non_blank(chunk))
+        count += len(non_blank)
+        sketch.add_hashes(hash_strings(non_blank))
+    return count
+
+
+def _arrow_column_stats(column: pd.Series, approx_precision: Optional[int] = None,
+                        profile: Optional[ColumnProfile] = None) -> Tuple[int, int]:
+    """(non-blank count, unique count) of an Arrow-backed string column.
+    
+    Everything runs inside Arrow: the column's distinct values are found in
+    one hash pass and the blank test is applied to them, so no Python object
+    is made per cell or per distinct value. profile, if given, is fed each
+    non-blank distinct value with its occurrence count. With approx_precision
+    and no profile, non-blank cells are hashed into the sketch directly
+    instead.
+    """
+    array = pa.array(column.array)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if approx_precision is not None and profile is None:
+        # Hash the non-blank cells straight from Arrow memory; no distinct table is built
+        sketch = HyperLogLog(approx_precision)
+        count = _sketch_arrow_strings(array, sketch)
+        return count, sketch.estimate()
+        
+    if profile is not None:
+        # value_counts finds the distinct values and their counts in the same pass
+        value_counts = pc.value_counts(array)
+        distinct = value_counts.field("values")
+        non_blank_lookup = _arrow_non_blank(distinct)
+        non_blank_values = distinct.filter(non_blank_lookup)
+        occurrences = value_counts.field("counts").filter(non_blank_lookup).to_numpy()
+        count = int(occurrences.sum())
+        profile.add_counts(non_blank_values.to_pylist(), occurrences)
+    else:
+        distinct = pc.unique(array)
+        non_blank_lookup = _arrow_non_blank(distinct)
+        non_blank_values = distinct.filter(non_blank_lookup)
+        # Blank cells are the nulls plus the cells holding one of the (few)
+        # distinct whitespace-only values
+        blank_values = distinct.filter(pc.invert(non_blank_lookup)).drop_null()
+        count = len(array) - array.null_count
+        if len(blank_values):
+            count -= pc.sum(pc.is_in(array, value_set=blank_values), min_count=0).as_py()
+            
+    if approx_precision is not None:
+        sketch = HyperLogLog(approx_precision)
+        sketch.add_hashes(hash_strings(non_blank_values))
+        return count, sketch.estimate()
+    return count, len(non_blank_values)
+
+
+def _object_column_stats(values: np.ndarray, approx_precision: Optional[int] = None,
+                         profile: Optional[ColumnProfile] = None) -> Tuple[int, int]:
+    """(non-blank count, unique count) of a column of Python objects.
+    
+    The column is factorized on its own, so the blank test runs once per
+    distinct value and counts come from the integer codes. profile, if
+    given, is fed each non-blank distinct value with its occurrence count.
+    With approx_precision and no profile, non-blank cells are hashed into
+    the sketch directly instead.
+    """
+    if approx_precision is not None and profile is None:
+        # Hash the non-blank cells directly; no distinct table is built
+        sketch = HyperLogLog(approx_precision)
+        count = 0
+        for start in range(0, len(values), SKETCH_CHUNK_CELLS):
+            chunk = values[start:start + SKETCH_CHUNK_CELLS]
+            strings = _as_arrow_strings(chunk)
+            if strings is not None:
+                count += _sketch_arrow_strings(strings, sketch)
+            else:
+                texts = [text for text in map(str, chunk[pd.notna(chunk)]) if text.strip()]
+                count += len(texts)
+                sketch.add_hashes(hash_values(texts))
+        return count, sketch.estimate()
+        
+    # NaN/None -> code -1
+    codes, uniques = pd.factorize(values)
+    non_blank_lookup = np.fromiter(
+        (str(value).strip() != '' for value in uniques),
+        dtype=bool,
+        count=len(uniques)
+    )
+    codes = codes[codes >= 0]
+    non_blank_codes = codes[non_blank_lookup[codes]]
+    count = len(non_blank_codes)
+    if profile is not None:
+        occurrences = np.bincount(non_blank_codes, minlength=len(uniques))
+        profile.add_counts(uniques[non_blank_lookup], occurrences[non_blank_lookup])
+        
+    if approx_precision is not None:
+        sketch = HyperLogLog(approx_precision)
+        sketch.add_hashes(hash_values(uniques[non_blank_lookup]))
+        return count, sketch.estimate()
+    return count, int(non_blank_lookup.sum())
+
+
+def calculate_column_stats(df: pd.DataFrame, approx_precision: Optional[int] = None,
+                           column_profile: bool = False) -> pd.DataFrame:
+    """Calculate availability and unique-value statistics for every column.
+    
+    NaN, None, empty and whitespace-only values count as blank. Arrow-backed
+    string columns (pandas' str dtype when pyarrow is installed) are counted
+    in Arrow without boxing a Python object per cell. Other columns are
+    factorized one at a time: the blank test is applied to the distinct
+    values only and counts are taken from the integer codes. (Factorizing
+    several columns together only pays off on low-cardinality data and is
+    much slower on ID-like columns, so it is not done.)
+    
+    Unique counts are exact by default. With approx_precision they are
+    HyperLogLog estimates at that precision, which avoids building a table
+    of distinct values per column.
+    
+    With column_profile, each column is also profiled (see ColumnProfile)
+    from its distinct values and their counts, in the same pass.
+    """
+    n_rows, n_cols = df.shape
+    if n_cols == 0:
+        return pd.DataFrame()
+        
+    counts = np.zeros(n_cols, dtype=np.int64)
+    unique_counts = np.zeros(n_cols, dtype=np.int64)
+    profiles = [ColumnProfile() for _ in range(n_cols)] if column_profile else None
+    
+    for idx, dtype in enumerate(df.dtypes):
+        profile = profiles[idx] if profiles is not None else None
+        if _is_arrow_string(dtype):
+            counts[idx], unique_counts[idx] = _arrow_column_stats(df.iloc[:, idx], approx_precision, profile)
+        else:
+            counts[idx], unique_counts[idx] = _object_column_stats(
+                df.iloc[:, idx].to_numpy(dtype=object), approx_precision, profile
+            )
+            
+    return _stats_frame(list(df.columns), n_rows, counts, unique_counts, approx_precision, profiles)
+
+
+def _stats_frame(headers: List[Any], n_rows: int, counts: np.ndarray,
+                 unique_counts: np.ndarray, approx_precision: Optional[int] = None,
+                 profiles: Optional[List[ColumnProfile]] = None) -> pd.DataFrame:
+    """Assemble the per-column statistics table from raw counters.
+    
+    Approximate unique counts get a marked column name and an error column.
+    Column profiles, if given, add the PROFILE_COLUMNS after them.
+    """
+    n_cols = len(headers)
+    if n_rows > 0:
+        pct_availability = np.round(counts / n_rows * 100, 2)
+    else:
+        pct_availability = np.zeros(n_cols, dtype=np.float64)
+        
+    stats = {
+        'Header Name': headers,
+        'Total Number of Transactions': np.full(n_cols, n_rows, dtype=np.int64),
+        'Count of Availability': np.asarray(counts, dtype=np.int64),
+        '% Availability': pct_availability,
+    }
+    if approx_precision is None:
+        stats[UNIQUE_COLUMN] = np.asarray(unique_counts, dtype=np.int64)
+    else:
+        stats[APPROX_UNIQUE_COLUMN] = np.asarray(unique_counts, dtype=np.int64)
+        error_pct = round(HyperLogLog(approx_precision).relative_error * 100, 2)
+        stats[UNIQUE_ERROR_COLUMN] = np.full(n_cols, error_pct, dtype=np.float64)
+    if profiles is not None:
+        stats.update(profile_columns(profiles))
+    return pd.DataFrame(stats)
+
+
+def _convert_cell(cell) -> Any:
+    """Convert an openpyxl cell the same way pandas' openpyxl reader does."""
+    value = cell.value
+    if value is None:
+        return ""
+    if cell.data_type == 'e':
+        return np.nan
+    if cell.data_type == 'n':
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+def _header_names(header: List[Any], width: int) -> List[Any]:
+    """Column names for a header row padded to width.
+    
+    pandas names blank and duplicate headers exactly as read_excel does.
+    """
+    padded_header = header + [""] * (width - len(header))
+    return list(TextParser(
+        [padded_header], header=0, dtype=str, skip_blank_lines=False
+    ).read().columns)
+
+
+def _counts_to_stats(counts: SheetCounts, approx_precision: Optional[int] = None) -> pd.DataFrame:
+    """Build the statistics table from the sheet XML engine's counters."""
+    width = len(counts.non_blank)
+    if width == 0:
+        return pd.DataFrame()
+    return _stats_frame(
+        _header_names(counts.header, width),
+        counts.n_rows,
+        np.array(counts.non_blank, dtype=np.int64),
+        np.array(counts.unique_counts, dtype=np.int64),
+        approx_precision,
+        counts.profiles
+    )
+
+
+class SheetAccumulator:
+    """Running per-column counters fed one row at a time.
+    
+    Rows are the converted cell values yielded by
+    WorkbookSession.iter_sheet_rows. The first row is the header, trailing
+    empty rows are ignored and short rows are padded, matching what
+    pd.read_excel(header=0, dtype=str) would load, so memory grows with the
+    number of columns and distinct values rather than with the row count.
+    
+    With approx_precision, each column's distinct values are tracked in a
+    HyperLogLog sketch instead of a set, so memory no longer depends on
+    cardinality either. With distinct_pool, exact distinct values are kept
+    under the pool's memory limit and spilled to disk beyond it. With
+    column_profile, each column's values also feed a ColumnProfile.
+    """
+    
+    # Accumulators saved before column profiles existed have no such attribute
+    profiles: Optional[List[ColumnProfile]] = None
+    
+    def __init__(self, approx_precision: Optional[int] = None,
+                 distinct_pool: Optional[DistinctSpillPool] = None,
+                 column_profile: bool = False):
+        self.approx_precision = approx_precision
+        self.distinct_pool = distinct_pool
+        if column_profile:
+            self.profiles = []
+        self.header: Optional[List[Any]] = None
+        self.n_rows = 0
+        self.non_blank: List[int] = []
+        self.distinct: List[Any] = []  # set, HyperLogLog or SpillingDistinctCounter per column
+        self.aliases: List[Dict[Any, str]] = []
+        self._pending_empty_rows = 0
+        
+    def _ensure_width(self, width: int):
+        while len(self.non_blank) < width:
+            self.non_blank.append(0)
+            if self.approx_precision is not None:
+                self.distinct.append(HyperLogLog(self.approx_precision))
+            elif self.distinct_pool is not None:
+                self.distinct.append(self.distinct_pool.new_counter())
+            else:
+                self.distinct.append(set())
+            self.aliases.append({})
+            if self.profiles is not None:
+                self.profiles.append(ColumnProfile())
+            
+    def add_row(self, row: Sequence[Any]):
+        """Fold one converted row into the counters."""
+        width = len(row)
+        while width and row[width - 1] == "":
+            width -= 1
+            
+        if self.header is None:
+            self.header = list(row[:width])
+            self._ensure_width(width)
+            return
+            
+        if not width:
+            # Only counted if a later row has data (trailing empty rows are dropped)
+            self._pending_empty_rows += 1
+            return
+            
+        self.n_rows += self._pending_empty_rows + 1
+        self._pending_empty_rows = 0
+        self._ensure_width(width)
+        
+        non_blank = self.non_blank
+        distinct = self.distinct
+        profiles = self.profiles
+        for idx in range(width):
+            value = row[idx]
+            if isinstance(value, str):
+                if value in STR_NA_VALUES or value.strip() == '':
+                    continue
+                text = value
+            elif isinstance(value, float) and math.isnan(value):
+                continue
+            elif value == 0 or value == 1:
+                # pandas gives equal values (True and 1, False and 0) the text of the first one seen
+                aliases = self.aliases[idx]
+                text = aliases.get(value)
+                if text is None:
+                    text = aliases[value] = str(value)
+            else:
+                text = str(value)
+            non_blank[idx] += 1
+            distinct[idx].add(text)
+            if profiles is not None:
+                profiles[idx].add(text)
+                
+    def to_stats(self) -> pd.DataFrame:
+        """Build the same statistics table calculate_column_stats returns."""
+        width = len(self.non_blank)
+        if self.header is None or width == 0:
+            return pd.DataFrame()
+            
+        headers = _header_names(self.header, width)
+        if self.approx_precision is not None:
+            unique_counts = [sketch.estimate() for sketch in self.distinct]
+        elif self.distinct_pool is not None:
+            unique_counts = [counter.count() for counter in self.distinct]
+        else:
+            unique_counts = [len(values) for values in self.distinct]
+            
+        return _stats_frame(
+            headers,
+            self.n_rows,
+            np.array(self.non_blank, dtype=np.int64),
+            np.array(unique_counts, dtype=np.int64),
+            self.approx_precision,
+            self.profiles
+        )
+
+
+def stream_column_stats(rows: Iterable[Sequence[Any]], approx_precision: Optional[int] = None,
+                        distinct_pool: Optional[DistinctSpillPool] = None,
+                        on_rows: Optional[RowCallback] = None,
+                        column_profile: bool = False) -> pd.DataFrame:
+    """Calculate column statistics from an iterator of rows without a DataFrame.
+    
+    on_rows is called with the number of rows read so far every PROGRESS_ROWS rows.
+    """
+    accumulator = SheetAccumulator(approx_precision, distinct_pool, column_profile)
+    for count, row in enumerate(rows, 1):
+        accumulator.add_row(row)
+        if on_rows is not None and count % PROGRESS_ROWS == 0:
+            on_rows(count)
+    return accumulator.to_stats()
+
+
+class WorkbookSession:
+    """An open workbook that serves every sheet from a single file handle.
+    
+    The zip directory, workbook manifest, shared-strings table and styles are
+    parsed once per session, instead of once per sheet read. The pandas
+    workbook and the sheet XML reader are each opened on first use, so a
+    session only pays for the readers its sheets actually need.
+    
+    backend is one of READER_BACKENDS and selects the reader for whole-sheet
+    reads; the resolved choice is available as self.backend. A CSV file is a
+    workbook with a single sheet named after the file.
+    """
+    
+    def __init__(self, file_path: str, backend: str = "auto"):
+        self.file_path = file_path
+        self.backend = resolve_backend(file_path, backend)
+        self._format = file_format(file_path)
+        self._closed = False
+        self._excel_file: Optional[pd.ExcelFile] = None
+        self._row_file: Optional[pd.ExcelFile] = None
+        self._xml_reader: Optional[SheetXmlReader] = None
+        self._xml_supported: Optional[bool] = None
+        
+    def _get_excel_file(self) -> pd.ExcelFile:
+        if self._closed:
+            raise ValueError("Workbook session is closed")
+        if self._excel_file is None:
+            self._excel_file = pd.ExcelFile(self.file_path, engine=self.backend)
+        return self._excel_file
+        
+    def _get_row_file(self) -> pd.ExcelFile:
+        """openpyxl-backed workbook for row streaming, whatever the backend."""
+        if self.backend == "openpyxl":
+            return self._get_excel_file()
+        if self._closed:
+            raise ValueError("Workbook session is closed")
+        if self._row_file is None:
+            self._row_file = pd.ExcelFile(self.file_path, engine="openpyxl")
+        return self._row_file
+        
+    @property
+    def sheet_names(self) -> List[str]:
+        """Names of all sheets in the workbook."""
+        if self.backend == "csv":
+            return [csv_sheet_name(self.file_path)]
+        return list(self._get_excel_file().sheet_names)
+        
+    @property
+    def closed(self) -> bool:
+        """Whether the session has been closed."""
+        return self._closed
+        
+    @property
+    def xml_reader(self) -> Optional[SheetXmlReader]:
+        """Sheet XML reader for .xlsx/.xlsm workbooks; None for other formats."""
+        if self._closed:
+            raise ValueError("Workbook session is closed")
+        if self._xml_supported is None:
+            try:
+                self._xml_reader = SheetXmlReader(self.file_path)
+                self._xml_supported = True
+            except ValueError:
+                self._xml_supported = False
+        return self._xml_reader
+        
+    def read_sheet(self, sheet_name: str) -> pd.DataFrame:
+        """Read a sheet with the first row as header and all values as strings.
+        
+        With pyarrow installed the columns hold Arrow strings rather than one
+        Python object per cell.
+        """
+        if self.backend == "csv":
+            if self._closed:
+                raise ValueError("Workbook session is closed")
+            if sheet_name != csv_sheet_name(self.file_path):
+                raise ValueError(f"Worksheet named '{sheet_name}' not found")
+            df = pd.read_csv(self.file_path, header=0, dtype=str)
+        else:
+            df = self._get_excel_file().parse(
+                sheet_name=sheet_name,
+                header=0,  # First row is header
+                dtype=str  # Read all as strings to preserve data
+            )
+        return _to_arrow_strings(df)
+        
+    @property
+    def supports_streaming(self) -> bool:
+        """Whether sheets can be iterated row by row (.xlsx/.xlsm workbooks)."""
+        return not self._closed and self._format == "xlsx"
+        
+    def iter_sheet_rows(self, sheet_name: str, min_row: int = 1) -> Iterator[List[Any]]:
+        """Yield a sheet's rows one at a time as pandas-compatible cell values.
+        
+        min_row is the 1-based sheet row to start from; rows before it are
+        skipped without being converted. Rows come from the sheet XML reader,
+        or from openpyxl if the workbook cannot be read that way.
+        """
+        if not self.supports_streaming:
+            raise ValueError("Row streaming requires an .xlsx/.xlsm workbook")
+        if self.xml_reader is not None:
+            # openpyxl parses and converts every row before min_row only to drop it (and
+            # scans the whole sheet on open when it has no dimension record); the XML
+            # reader skips them as raw bytes and converts cells the same way
+            yield from self.xml_reader.iter_rows(sheet_name, min_row)
+            return
+        sheet = self._get_row_file().book[sheet_name]
+        sheet.reset_dimensions()
+        for row in sheet.iter_rows(min_row=min_row):
+            yield [_convert_cell(cell) for cell in row]
+            
+    def close(self):
+        """Release the workbook handles."""
+        self._closed = True
+        if self._excel_file is not None:
+            self._excel_file.close()
+            self._excel_file = None
+        if self._row_file is not None:
+            self._row_file.close()
+            self._row_file = None
+        if self._xml_reader is not None:
+            self._xml_reader.close()
+            self._xml_reader = None
+            
+    def __enter__(self) -> "WorkbookSession":
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _row_key(row: Optional[Sequence[Any]]) -> Optional[tuple]:
+    """Comparable form of a converted row: trailing empties trimmed, NaN made equal."""
+    if row is None:
+        return None
+    width = len(row)
+    while width and row[width - 1] == "":
+        width -= 1
+    return tuple(
+        None if isinstance(value, float) and math.isnan(value) else value
+        for value in row[:width]
+    )
+
+
+def analyze_sheet_incremental(session: WorkbookSession, sheet_name: str,
+                              summaries: SummaryStore,
+                              approx_precision: Optional[int] = None,
+                              on_rows: Optional[RowCallback] = None,
+                              column_profile: bool = False) -> pd.DataFrame:
+    """Calculate a sheet's stats, reading only rows appended since the last run.
+    
+    The sheet's accumulator is saved after every run together with the number
+    of sheet rows consumed. The next run resumes it and folds in the rows past
+    that point, which gives the same numbers as a full recompute for
+    append-only sheets. If the header row or the last consumed row no longer
+    match, or the sheet got shorter, the sheet is recomputed from scratch.
+    on_rows is called with the sheet row reached every PROGRESS_ROWS rows.
+    """
+    if not session.supports_streaming:
+        return calculate_column_stats(session.read_sheet(sheet_name), approx_precision, column_profile)
+        
+    variant = _cache_variant(approx_precision, column_profile=column_profile)
+    state = summaries.load(session.file_path, sheet_name)
+    rows = None
+    if state is not None and state.get("variant") == variant and state["rows_seen"] > 0:
+        accumulator: SheetAccumulator = state["accumulator"]
+        header_rows = session.iter_sheet_rows(sheet_name)
+        header_matches = _row_key(next(header_rows, None)) == _row_key(accumulator.header)
+        header_rows.close()
+        
+        if header_matches:
+            # Re-read the last consumed row to check the sheet was only appended to
+            rows = session.iter_sheet_rows(sheet_name, min_row=state["rows_seen"])
+            if _row_key(next(rows, None)) == state["last_row"]:
+                rows_seen = state["rows_seen"]
+                last_row_key = state["last_row"]
+            else:
+                rows.close()
+                rows = None
+                
+    if rows is None:
+        accumulator = SheetAccumulator(approx_precision, column_profile=column_profile)
+        rows = session.iter_sheet_rows(sheet_name)
+        rows_seen = 0
+        last_row_key = None
+        
+    last_row = None
+    for row in rows:
+        accumulator.add_row(row)
+        rows_seen += 1
+        last_row = row
+        if on_rows is not None and rows_seen % PROGRESS_ROWS == 0:
+            on_rows(rows_seen)
+    if last_row is not None:
+        last_row_key = _row_key(last_row)
+        
+    summaries.save(session.file_path, sheet_name, {
+        "variant": variant,
+        "rows_seen": rows_seen,
+        "last_row": last_row_key,
+        "accumulator": accumulator
+    })
+    return accumulator.to_stats()
+
+
+def preview_sheet(session: WorkbookSession, sheet_name: str, sample_rows: int = SAMPLE_SIZE,
+                  seed: int = 0, on_rows: Optional[RowCallback] = None) -> pd.DataFrame:
+    """Estimate a sheet's statistics from a uniform sample of its rows.
+    
+    .xlsx/.xlsm sheets are scanned once from their sheet XML, converting only
+    the sampled rows; other formats are loaded and then sampled. The result
+    has the exact row count and estimated availability (with a confidence
+    interval) and unique counts; see sampled_stats. The same seed always
+    draws the same rows.
+    """
+    if session.xml_reader is None:
+        if on_rows is not None:
+            on_rows(0)
+        df = session.read_sheet(sheet_name)
+        if on_rows is not None:
+            on_rows(len(df) + 1)
+        return preview_frame(df, sample_rows, seed)
+        
+    sample = session.xml_reader.sample_rows(sheet_name, sample_rows, seed, on_rows)
+    if sample.width == 0:
+        return pd.DataFrame()
+    rows = [[row.get(idx) for idx in range(sample.width)] for row in sample.rows]
+    return _sample_stats(_header_names(sample.header, sample.width), sample.n_rows, rows)
+
+
+def preview_frame(df: pd.DataFrame, sample_rows: int = SAMPLE_SIZE, seed: int = 0) -> pd.DataFrame:
+    """Estimate a loaded sheet's statistics from a uniform sample of its rows.
+    
+    The pandas side of preview_sheet: blank cells may be None, NaN or pd.NA,
+    whichever the column's dtype holds.
+    """
+    if df.shape[1] == 0:
+        return pd.DataFrame()
+    rows = df.iloc[sample_positions(len(df), sample_rows, seed)].to_numpy(dtype=object).tolist()
+    return _sample_stats(list(df.columns), len(df), rows)
+
+
+def _sample_stats(headers: List[Any], n_rows: int, rows: List[List[Any]]) -> pd.DataFrame:
+    """sampled_stats of sampled rows of cell values, read as pandas reads them."""
+    columns = []
+    for idx in range(len(headers)):
+        aliases: Dict[Any, str] = {}
+        columns.append([
+            None if pd.isna(row[idx]) else _cell_text(row[idx], aliases)
+            for row in rows
+        ])
+    return sampled_stats(headers, n_rows, columns)
+
+
+def analyze_sheet(session: WorkbookSession, sheet_name: str, streaming: bool = False,
+                  summaries: Optional[SummaryStore] = None,
+                  approx_precision: Optional[int] = None,
+                  distinct_memory_limit: Optional[int] = None,
+                  spill_dir: Optional[str] = None,
+                  engine: str = "pandas",
+                  metrics: Optional[RunMetrics] = None,
+                  on_rows: Optional[RowCallback] = None,
+                  column_profile: bool = False,
+                  sample_rows: Optional[int] = None) -> pd.DataFrame:
+    """Calculate one sheet's column statistics from an open workbook session.
+    
+    With sample_rows, the sheet is only previewed: statistics are estimated
+    from that many sampled rows (see preview_sheet) and the other options
+    do not apply.
+    
+    With summaries, only rows appended since the previous run are read. With
+    approx_precision, unique counts are HyperLogLog estimates. With
+    column_profile, every path also profiles each column in the same pass. With
+    distinct_memory_limit (bytes), exact unique counts of .xlsx/.xlsm sheets
+    are streamed and spill to files under spill_dir past that limit. Otherwise
+    engine "xml" counts .xlsx/.xlsm sheets straight from their sheet XML;
+    other formats fall back to the pandas engine.
+    
+    With metrics, the pandas engine's read and stats stages are recorded
+    separately; the other paths read and count in one pass and are recorded
+    as a single stage named after the path.
+    
+    on_rows is called with the number of rows read so far as the sheet is
+    read (raising from it, e.g. AnalysisCancelled, stops the read). The
+    pandas engine loads a sheet in one call, so it only reports before and
+    after the load.
+    """
+    if sample_rows is not None:
+        with measure(metrics, "sample", sheet_name) as record:
+            stats_df = preview_sheet(session, sheet_name, sample_rows, on_rows=on_rows)
+            record.rows = _stats_rows(stats_df)
+        return stats_df
+    if summaries is not None:
+        with measure(metrics, "incremental", sheet_name) as record:
+            stats_df = analyze_sheet_incremental(
+                session, sheet_name, summaries, approx_precision, on_rows, column_profile
+            )
+            record.rows = _stats_rows(stats_df)
+        return stats_df
+    if distinct_memory_limit is not None and approx_precision is None and session.supports_streaming:
+        with measure(metrics, "spill", sheet_name) as record:
+            with DistinctSpillPool(distinct_memory_limit, spill_dir) as pool:
+                stats_df = stream_column_stats(
+                    session.iter_sheet_rows(sheet_name), distinct_pool=pool, on_rows=on_rows,
+                    column_profile=column_profile
+                )
+            record.rows = _stats_rows(stats_df)
+        return stats_df
+    if engine == "xml" and session.xml_reader is not None:
+        with measure(metrics, "xml", sheet_name) as record:
+            counts = session.xml_reader.sheet_counts(sheet_name, approx_precision, on_rows, column_profile)
+            record.rows = counts.n_rows
+        return _counts_to_stats(counts, approx_precision)
+    if streaming and session.supports_streaming:
+        # Fold rows into per-column counters without building a DataFrame
+        with measure(metrics, "streaming", sheet_name) as record:
+            stats_df = stream_column_stats(
+                session.iter_sheet_rows(sheet_name), approx_precision, on_rows=on_rows,
+                column_profile=column_profile
+            )
+            record.rows = _stats_rows(stats_df)
+        return stats_df
+    if on_rows is not None:
+        on_rows(0)
+    with measure(metrics, "read", sheet_name) as record:
+        df = session.read_sheet(sheet_name)
+        record.rows = len(df)
+    if on_rows is not None:
+        on_rows(len(df) + 1)  # Data rows plus the header, like the other paths
+    with measure(metrics, "stats", sheet_name) as record:
+        stats_df = calculate_column_stats(df, approx_precision, column_profile)
+        record.rows = len(df)
+    return stats_df
+
+
+def sheet_reader(file_path: str, backend: Optional[str], streaming: bool = False,
+                 engine: str = "pandas", incremental: bool = False,
+                 distinct_memory_limit: Optional[int] = None,
+                 approx_precision: Optional[int] = None,
+                 sample_rows: Optional[int] = None) -> Optional[str]:
+    """Reader analyze_sheet loads a file's sheets with, given its options.
+    
+    backend is the resolved reader backend (see resolve_backend). It only
+    applies to whole-sheet reads: every other path reads .xlsx/.xlsm sheets
+    from their sheet XML, reported as XML_READER.
+    """
+    if file_format(file_path) == "xlsx" and (
+        sample_rows is not None or incremental or engine == "xml" or streaming
+        or (distinct_memory_limit is not None and approx_precision is None)
+    ):
+        return XML_READER
+    return backend
+
+
+def _stats_rows(stats_df: pd.DataFrame) -> int:
+    """Data rows a stats table was computed from."""
+    return int(stats_df["Total Number of Transactions"].iloc[0]) if len(stats_df) else 0
+
+
+# Workbook opened once per pool worker process by _init_sheet_worker, the
+# run's shared cancel event, if it can be cancelled, and the queue that
+# relays (sheet name, rows read) back to the parent, if it tracks progress
+_worker_session: Optional[WorkbookSession] = None
+_worker_cancel = None
+_worker_rows = None
+
+
+def _init_sheet_worker(file_path: str, backend: str, cancel_event=None, row_queue=None):
+    """Open the workbook once in a pool worker so its sheets share the parse."""
+    global _worker_session, _worker_cancel, _worker_rows
+    _worker_session = WorkbookSession(file_path, backend)
+    _worker_cancel = cancel_event
+    _worker_rows = row_queue
+    if row_queue is not None:
+        # Progress still queued when the worker exits can be dropped
+        row_queue.cancel_join_thread()
+    
+    
+def _worker_row_callback(sheet_name: str) -> RowCallback:
+    """Row callback in a pool worker: checks for cancellation and sends the
+    rows read to the parent, at most once per PROGRESS_INTERVAL."""
+    last_sent = 0.0
+    
+    def on_rows(rows: int):
+        nonlocal last_sent
+        check_cancelled(_worker_cancel)
+        now = time.monotonic()
+        if _worker_rows is not None and now - last_sent >= PROGRESS_INTERVAL:
+            last_sent = now
+            _worker_rows.put((sheet_name, rows))
+            
+    return on_rows
+    
+    
+def _analyze_sheet_in_worker(sheet_name: str, options: Dict[str, Any],
+                             trace_memory: Optional[bool] = None) -> Tuple[pd.DataFrame, list]:
+    """Pool task: compute one sheet's stats in the worker's open workbook.
+    
+    Returns the stats and the worker's stage records, which are only
+    collected when trace_memory is not None.
+    """
+    metrics = RunMetrics(trace_memory) if trace_memory is not None else None
+    on_rows = None
+    if _worker_cancel is not None or _worker_rows is not None:
+        check_cancelled(_worker_cancel)
+        on_rows = _worker_row_callback(sheet_name)
+    stats_df = analyze_sheet(_worker_session, sheet_name, metrics=metrics, on_rows=on_rows, **options)
+    return stats_df, metrics.records if metrics is not None else []
+
+
+def analyze_sheets_parallel(file_path: str, sheet_names: List[str], max_workers: int,
+                            backend: str = "auto", metrics: Optional[RunMetrics] = None,
+                            cancel_event=None,
+                            on_rows: Optional[Callable[[str, int], None]] = None,
+                            **options) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Analyze sheets across a process pool, yielding (sheet_name, stats_df) as each completes.
+    
+    Each worker opens the workbook with the given reader backend; options are
+    passed on to analyze_sheet. Only the small stats DataFrame (and, with
+    metrics, the sheet's stage records) is sent back from each worker;
+    callers that need the original sheet order should reorder the yielded
+    results.
+    
+    Setting cancel_event stops the workers at their next progress check and
+    raises AnalysisCancelled. on_rows is called in this process with
+    (sheet_name, rows read so far) as the workers read their sheets; it may
+    raise AnalysisCancelled too.
+    """
+    trace_memory = metrics.trace_memory if metrics is not None else None
+    mp_context = multiprocessing.get_context()
+    # Workers cannot see a threading.Event, so cancellation is relayed through a process-shared one
+    worker_cancel = mp_context.Event() if cancel_event is not None else None
+    row_queue = mp_context.Queue() if on_rows is not None else None
+    executor = ProcessPoolExecutor(
+        max_workers=max(1, min(max_workers, len(sheet_names))),
+        mp_context=mp_context,
+        initializer=_init_sheet_worker,
+        initargs=(file_path, backend, worker_cancel, row_queue)
+    )
+    cancelled = False
+    finished = set()
+    try:
+        futures = {
+            executor.submit(_analyze_sheet_in_worker, sheet_name, options, trace_memory): sheet_name
+            for sheet_name in sheet_names
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            finished.update(futures[future] for future in done)
+            try:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise AnalysisCancelled()
+                while row_queue is not None:
+                    try:
+                        sheet_name, rows = row_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    # Counts can arrive after their sheet's result
+                    if sheet_name not in finished:
+                        on_rows(sheet_name, rows)
+            except AnalysisCancelled:
+                cancelled = True
+                if worker_cancel is not None:
+                    worker_cancel.set()
+                raise
+            for future in done:
+                stats_df, records = future.result()
+                if metrics is not None:
+                    metrics.extend(records)
+                yield futures[future], stats_df
+    finally:
+        # After a cancel, do not wait for a worker inside a sheet load that cannot be
+        # interrupted; it stops at its next check and the pool then exits on its own
+        executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
+        if row_queue is not None:
+            row_queue.close()
+
+
+def analyze_sheets(file_path: str, sheet_names: List[str], streaming: bool = False,
+                   workers: int = 1, session: Optional[WorkbookSession] = None,
+                   progress: Optional[ProgressCallback] = None,
+                   cache: Optional[StatsCache] = None,
+                   summaries: Optional[SummaryStore] = None,
+                   approx_precision: Optional[int] = None,
+                   distinct_memory_limit: Optional[int] = None,
+                   spill_dir: Optional[str] = None,
+                   engine: str = "pandas",
+                   backend: str = "auto",
+                   metrics: Optional[RunMetrics] = None,
+                   cancel_event=None,
+                   sheet_rows: Optional[Dict[str, Optional[int]]] = None,
+                   column_profile: bool = False,
+                   sample_rows: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """Calculate stats for the given sheets, returned in the given sheet order.
+    
+    Sheets found in cache are returned without being read; the rest are
+    computed and stored back. With more than one worker the remaining sheets
+    are spread over a process pool; otherwise they are read from session (or
+    a session opened for the call with the given reader backend). With
+    summaries, only rows appended since the previous run are read from each
+    sheet. The remaining options are passed on to analyze_sheet. Stage
+    timings, including the cache lookup, are recorded into metrics if given.
+    
+    progress is reported as rows are read, weighted by sheet size: sheet_rows
+    gives each sheet's expected row count (e.g. from discover_sheets) and is
+    looked up from .xlsx/.xlsm sheet dimensions when not given. Setting
+    cancel_event (a threading.Event) stops the run with AnalysisCancelled.
+    """
+    if engine not in STATS_ENGINES:
+        raise ValueError(f"Unknown stats engine: {engine}")
+        
+    if progress is not None and sheet_rows is None:
+        sheet_rows = _expected_rows(file_path, sheet_names)
+    tracker = ProgressTracker(
+        {sheet_name: (sheet_rows or {}).get(sheet_name) for sheet_name in sheet_names},
+        progress, cancel_event
+    )
+    results: Dict[str, pd.DataFrame] = {}
+    resolved_backend = session.backend if session is not None else resolve_backend(file_path, backend)
+    reader = sheet_reader(
+        file_path, resolved_backend, streaming, engine, summaries is not None,
+        distinct_memory_limit, approx_precision, sample_rows
+    )
+    variant = _cache_variant(approx_precision, reader, column_profile, sample_rows)
+    sheet_options = dict(
+        streaming=streaming,
+        summaries=summaries,
+        approx_precision=approx_precision,
+        distinct_memory_limit=distinct_memory_limit,
+        spill_dir=spill_dir,
+        engine=engine,
+        column_profile=column_profile,
+        sample_rows=sample_rows
+    )
+    
+    file_key = None
+    if cache is not None:
+        with measure(metrics, "cache lookup") as record:
+            file_key = cache.file_key(file_path)
+            for sheet_name in sheet_names:
+                cached = cache.get(file_key, sheet_name, variant)
+                if cached is not None:
+                    results[sheet_name] = cached
+            record.rows = sum(_stats_rows(stats_df) for stats_df in results.values())
+                
+    pending = [sheet_name for sheet_name in sheet_names if sheet_name not in results]
+    for sheet_name in results:
+        tracker.skip_sheet(sheet_name)
+    
+    def finish(sheet_name: str, stats_df: pd.DataFrame):
+        results[sheet_name] = stats_df
+        if cache is not None:
+            cache.put(file_key, sheet_name, variant, stats_df)
+            
+    if workers > 1 and len(pending) > 1:
+        # Fan sheets out to worker processes, which send back the rows they have read
+        tracker.check()
+        tracker.report(f"Processing {len(pending)} sheets with {workers} workers...")
+        for sheet_name, stats_df in analyze_sheets_parallel(
+            file_path, pending, workers, backend, metrics, cancel_event,
+            on_rows=(lambda sheet_name, rows: tracker.row_callback(sheet_name)(rows)) if progress else None,
+            **sheet_options
+        ):
+            finish(sheet_name, stats_df)
+            tracker.finish_sheet(sheet_name)
+    elif pending:
+        owns_session = session is None
+        if owns_session:
+            session = WorkbookSession(file_path, backend)
+        try:
+            for sheet_name in pending:
+                tracker.start_sheet(sheet_name)
+                finish(sheet_name, analyze_sheet(
+                    session, sheet_name, metrics=metrics, on_rows=tracker.row_callback(sheet_name),
+                    **sheet_options
+                ))
+                tracker.finish_sheet(sheet_name)
+        finally:
+            if owns_session:
+                session.close()
+                
+    # Merge back in the original sheet order
+    return {sheet_name: results[sheet_name] for sheet_name in sheet_names}
+
+
+def _expected_rows(file_path: str, sheet_names: List[str]) -> Dict[str, Optional[int]]:
+    """Row counts recorded in an .xlsx/.xlsm workbook's sheet dimensions, where present."""
+    rows: Dict[str, Optional[int]] = dict.fromkeys(sheet_names)
+    if file_format(file_path) != "xlsx":
+        return rows
+    try:
+        infos = discover_sheets(file_path)
+    except Exception:
+        return rows  # Only used to weight progress; the analysis reports real errors
+    for info in infos:
+        if info.name in rows:
+            rows[info.name] = info.rows
+    return rows
+
+
+def analyze_workbook(file_path: str, sheet_names: Optional[List[str]] = None,
+                     output_mode: str = "separate", streaming: bool = False, workers: int = 1,
+                     progress: Optional[ProgressCallback] = None,
+                     cache: Optional[StatsCache] = None,
+                     summaries: Optional[SummaryStore] = None,
+                     approx_precision: Optional[int] = None,
+                     distinct_memory_limit: Optional[int] = None,
+                     spill_dir: Optional[str] = None,
+                     engine: str = "pandas",
+                     backend: str = "auto",
+                     report_format: str = "xlsx",
+                     metrics: bool = False,
+                     trace_memory: bool = False,
+                     profile: bool = False,
+                     cancel_event=None,
+                     column_profile: bool = False,
+                     sample_rows: Optional[int] = None,
+                     catalog: Optional[StatsCatalog] = None) -> str:
+    """Analyze a workbook end to end and return the path of the written report.
+    
+    All sheets are analyzed when sheet_names is None. With metrics, per-stage
+    timings go into the report's Run Metrics tab and a JSON sidecar (see
+    generate_output); trace_memory adds traced peak memory to them. With
+    profile, the run is profiled with cProfile and the stats are saved next
+    to the report as <report file name>.prof; sheets analyzed in worker
+    processes are not covered. Setting cancel_event stops the run with
+    AnalysisCancelled and leaves no report behind. With column_profile, the
+    report adds each column's inferred type, numeric range, mean and
+    standard deviation, text length range and most frequent values. With
+    sample_rows, each sheet is previewed from that many sampled rows
+    instead, and the report says so in its document properties. With
+    catalog, the run's stats are also recorded there for later queries; if
+    that fails, a warning is issued and the run still succeeds.
+    """
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {output_mode}")
+        
+    run_metrics = RunMetrics(trace_memory) if metrics or trace_memory else None
+    profiler = cProfile.Profile() if profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        if sheet_names is None:
+            if resolve_backend(file_path, backend) == "csv":
+                sheet_names = [csv_sheet_name(file_path)]
+            else:
+                # Read the names from the workbook manifest; sheets are opened lazily,
+                # and not at all if every sheet is cached
+                sheet_names = list_sheet_names(file_path)
+        results = analyze_sheets(
+            file_path, sheet_names, streaming=streaming, workers=workers, progress=progress,
+            cache=cache, summaries=summaries, approx_precision=approx_precision,
+            distinct_memory_limit=distinct_memory_limit, spill_dir=spill_dir, engine=engine,
+            backend=backend, metrics=run_metrics, cancel_event=cancel_event,
+            column_profile=column_profile, sample_rows=sample_rows
+        )
+        
+        if progress:
+            progress(90, "Generating output file...")
+        metadata = report_metadata(
+            file_path, backend, engine, sample_rows, streaming=streaming,
+            incremental=summaries is not None, distinct_memory_limit=distinct_memory_limit,
+            approx_precision=approx_precision
+        )
+        output_path = generate_output(
+            results, file_path, output_mode, metadata, report_format, run_metrics, cancel_event
+        )
+        if catalog is not None:
+            try:
+                catalog.record_run(file_path, results, output_path, metadata)
+            except (sqlite3.Error, OSError) as e:
+                # The report is already written; a locked or unwritable catalog
+                # only loses this run's entry
+                warnings.warn(f"{file_path}: run not recorded in the stats catalog {catalog.path}: {e}")
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            
+    if profiler is not None:
+        profiler.dump_stats(profile_path(Path(output_path)))
+    return output_path
+
+
+def report_metadata(file_path: str, backend: str = "auto", engine: str = "pandas",
+                    sample_rows: Optional[int] = None, streaming: bool = False,
+                    incremental: bool = False, distinct_memory_limit: Optional[int] = None,
+                    approx_precision: Optional[int] = None) -> Dict[str, str]:
+    """Describe how a report's numbers were read, for its document properties.
+    
+    The reader recorded is the one the run's options actually read with (see
+    sheet_reader), which is not the selected backend on the row-by-row paths.
+    """
+    reader = sheet_reader(
+        file_path, resolve_backend(file_path, backend), streaming, engine, incremental,
+        distinct_memory_limit, approx_precision, sample_rows
+    )
+    metadata = {
+        "Source File": Path(file_path).name,
+        "Reader Backend": reader or "pandas default",
+        "Stats Engine": engine,
+    }
+    if sample_rows is not None:
+        metadata["Sampled Preview"] = (
+            f"Estimated from up to {sample_rows:,} sampled rows per sheet, "
+            f"with {CONFIDENCE_LEVEL}% confidence intervals"
+        )
+    return metadata
+
+
+def _reserve_output_path(input_path: Path, suffix: str = ".xlsx") -> Path:
+    """Claim <stem>_stats<suffix> next to the input, appending _1, _2, ... if taken.
+    
+    The file is created exclusively so concurrent runs never pick the same name.
+    """
+    base_filename = f"{input_path.stem}_stats"
+    output_path = input_path.parent / f"{base_filename}{suffix}"
+    
+    # Handle existing file - append number if file exists
+    counter = 1
+    while True:
+        try:
+            os.close(os.open(output_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return output_path
+        except FileExistsError:
+            output_path = input_path.parent / f"{base_filename}_{counter}{suffix}"
+            counter += 1
+            
+
+def generate_output(results: Dict[str, pd.DataFrame], input_file_path: str,
+                    output_mode: str = "separate",
+                    metadata: Optional[Dict[str, str]] = None,
+                    report_format: str = "xlsx",
+                    metrics: Optional[RunMetrics] = None,
+                    cancel_event=None) -> str:
+    """Write the stats report next to the input file and return its path.
+    
+    output_mode is 'separate' (one tab per sheet) or 'consolidated' (a single
+    tab with a Sheet Name column). metadata entries, such as the reader
+    backend from report_metadata, are stored as custom document properties.
+    CSV and Parquet reports are always a single consolidated table.
+    
+    With metrics, xlsx reports get a Run Metrics tab, and the metrics,
+    including the time spent writing the report, are saved as JSON next to
+    it (<report file name>.metrics.json).
+    
+    Setting cancel_event stops the write with AnalysisCancelled; the
+    partially written report is removed, as on any other failure.
+    """
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {report_format}")
+    output_path = _reserve_output_path(Path(input_file_path), f".{report_format}")
+    
+    try:
+        with measure(metrics, "write") as record:
+            record.rows = sum(len(stats_df) for stats_df in results.values())
+            if report_format != "xlsx":
+                write_table(output_path, _consolidate(results), report_format, metadata, cancel_event)
+            else:
+                if output_mode == "consolidated":
+                    tables = [("Consolidated Stats", _consolidate(results))]
+                else:
+                    tables = list(results.items())
+                if metrics is not None:
+                    # Everything up to this write; the JSON sidecar includes the write too
+                    tables.append((METRICS_SHEET_NAME, metrics.to_frame()))
+                titles = sheet_titles([name for name, _ in tables])
+                write_xlsx(
+                    output_path, [(title, df) for title, (_, df) in zip(titles, tables)], metadata,
+                    cancel_event
+                )
+        if metrics is not None:
+            metrics.write_json(metrics_path(output_path), metadata)
+    
+    except BaseException:
+        # Do not leave a reserved or half-written report behind
+        output_path.unlink(missing_ok=True)
+        if metrics is not None:
+            metrics_path(output_path).unlink(missing_ok=True)
+        raise
+    
+    return str(output_path)
+
+
+def _consolidate(results: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """All sheets' stats in one table, with a Sheet Name column at the front."""
+    consolidated_data = []
+    for sheet_name, stats_df in results.items():
+        stats_with_sheet = stats_df.copy()
+        stats_with_sheet.insert(0, 'Sheet Name', sheet_name)
+        consolidated_data.append(stats_with_sheet)
+    return pd.concat(consolidated_data, ignore_index=True)
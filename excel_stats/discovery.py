@@ -0,0 +1,188 @@
+"""
+Fast sheet discovery for Excel Stats Analyzer.
+Lists a workbook's sheets from its manifest without loading any sheet data,
+optionally with each sheet's used range taken from its <dimension> element.
+"""
+
+import posixpath
+import re
+import threading
+import zipfile
+from pathlib import Path
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from excel_stats.backends import CSV_SUFFIXES, csv_sheet_name
+
+
+_OFFICE_DOCUMENT_REL = "/officeDocument"
+_DIMENSION_REF = re.compile(r"^\$?([A-Z]+)\$?(\d+)(?::\$?([A-Z]+)\$?(\d+))?$")
+
+
+class DiscoveryCancelled(Exception):
+    """Raised when sheet discovery is cancelled through its cancel event."""
+
+
+class SheetInfo(NamedTuple):
+    """A sheet's name and, when the workbook records it, its used range."""
+    name: str
+    dimension: Optional[str] = None  # e.g. "A1:D100"
+    rows: Optional[int] = None
+    columns: Optional[int] = None
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _column_number(letters: str) -> int:
+    """1-based column number of column letters such as "AB"."""
+    number = 0
+    for letter in letters.upper():
+        number = number * 26 + ord(letter) - 64
+    return number
+
+
+def _parse_dimension(ref: str) -> SheetInfo:
+    """Row and column counts for a range reference such as "A1:D100"."""
+    match = _DIMENSION_REF.match(ref.upper())
+    if not match:
+        return SheetInfo("", ref)
+    first_col, first_row, last_col, last_row = match.groups()
+    last_col = last_col or first_col
+    last_row = last_row or first_row
+    return SheetInfo(
+        "",
+        ref,
+        int(last_row) - int(first_row) + 1,
+        _column_number(last_col) - _column_number(first_col) + 1
+    )
+
+
+def _read_relationships(archive: zipfile.ZipFile, rels_path: str) -> Dict[str, tuple]:
+    """Map relationship ids to (type, target) for a .rels part."""
+    try:
+        root = ET.fromstring(archive.read(rels_path))
+    except KeyError:
+        return {}
+    return {
+        rel.get("Id"): (rel.get("Type", ""), rel.get("Target", ""))
+        for rel in root
+        if _local_name(rel.tag) == "Relationship"
+    }
+
+
+def _resolve_target(base_part: str, target: str) -> str:
+    """Zip member name for a relationship target relative to base_part."""
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base_part), target))
+
+
+def _read_dimension(archive: zipfile.ZipFile, sheet_part: str) -> Optional[str]:
+    """The sheet's <dimension ref>, parsing only up to the start of the cell data."""
+    try:
+        stream = archive.open(sheet_part)
+    except KeyError:
+        return None
+    with stream:
+        for _event, element in ET.iterparse(stream, events=("start",)):
+            name = _local_name(element.tag)
+            if name == "dimension":
+                return element.get("ref")
+            if name == "sheetData":
+                return None
+    return None
+
+
+def _rels_part(part: str) -> str:
+    """Zip member name of a part's relationships."""
+    return posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+
+
+def _read_workbook(archive: zipfile.ZipFile) -> Tuple[str, ET.Element]:
+    """Locate the package's workbook part and parse it."""
+    workbook_part = "xl/workbook.xml"
+    for rel_type, target in _read_relationships(archive, "_rels/.rels").values():
+        if rel_type.endswith(_OFFICE_DOCUMENT_REL):
+            workbook_part = _resolve_target("", target)
+            break
+    return workbook_part, ET.fromstring(archive.read(workbook_part))
+
+
+def _sheet_elements(workbook: ET.Element) -> Iterator[ET.Element]:
+    """The <sheet> entries of a parsed workbook part, in workbook order."""
+    sheets_element = next((e for e in workbook if _local_name(e.tag) == "sheets"), [])
+    for element in sheets_element:
+        if _local_name(element.tag) == "sheet":
+            yield element
+
+
+def _sheet_rel_id(element: ET.Element) -> Optional[str]:
+    """The r:id attribute of a <sheet> entry."""
+    return next((value for key, value in element.attrib.items() if _local_name(key) == "id"), None)
+
+
+def _discover_zip(file_path: str, with_dimensions: bool,
+                  cancel_event: Optional[threading.Event]) -> List[SheetInfo]:
+    """Sheets of an .xlsx/.xlsm package, read from xl/workbook.xml."""
+    with zipfile.ZipFile(file_path) as archive:
+        workbook_part, workbook = _read_workbook(archive)
+        relationships = _read_relationships(archive, _rels_part(workbook_part)) if with_dimensions else {}
+
+        sheets = []
+        for element in _sheet_elements(workbook):
+            if cancel_event is not None and cancel_event.is_set():
+                raise DiscoveryCancelled()
+
+            name = element.get("name")
+            info = SheetInfo(name)
+            if with_dimensions:
+                rel_id = _sheet_rel_id(element)
+                if rel_id in relationships:
+                    ref = _read_dimension(archive, _resolve_target(workbook_part, relationships[rel_id][1]))
+                    if ref:
+                        info = _parse_dimension(ref)._replace(name=name)
+            sheets.append(info)
+        return sheets
+
+
+def discover_sheets(file_path: str, with_dimensions: bool = True,
+                    cancel_event: Optional[threading.Event] = None) -> List[SheetInfo]:
+    """List a workbook's sheets in workbook order without loading sheet data.
+
+    .xlsx/.xlsm files are read from the zip manifest; with_dimensions adds each
+    sheet's used range from the start of its XML. .xls files list their sheet
+    names through xlrd's on-demand mode, without dimensions, and a CSV file
+    has a single sheet named after the file. Setting cancel_event stops
+    discovery with DiscoveryCancelled.
+    """
+    if Path(file_path).suffix.lower() in CSV_SUFFIXES:
+        return [SheetInfo(csv_sheet_name(file_path))]
+
+    if zipfile.is_zipfile(file_path):
+        try:
+            return _discover_zip(file_path, with_dimensions, cancel_event)
+        except (KeyError, ET.ParseError):
+            pass  # Not a spreadsheet package we understand; let pandas decide below
+
+    try:
+        import xlrd
+        book = xlrd.open_workbook(file_path, on_demand=True)
+    except Exception:
+        book = None
+    if book is not None:
+        try:
+            return [SheetInfo(name) for name in book.sheet_names()]
+        finally:
+            book.release_resources()
+
+    with pd.ExcelFile(file_path) as excel_file:
+        return [SheetInfo(name) for name in excel_file.sheet_names]
+
+
+def list_sheet_names(file_path: str) -> List[str]:
+    """Sheet names in workbook order, as pd.ExcelFile(file_path).sheet_names would give."""
+    return [info.name for info in discover_sheets(file_path, with_dimensions=False)]
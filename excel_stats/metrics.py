@@ -0,0 +1,175 @@
+"""
+Run instrumentation for Excel Stats Analyzer.
+Records wall time, rows processed and memory for each stage of a run (per
+sheet where it applies), for the report's "Run Metrics" tab and a JSON
+sidecar written next to the report.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+
+METRICS_SHEET_NAME = "Run Metrics"
+
+# Label used for stages that cover the whole run rather than one sheet
+ALL_SHEETS = "(all sheets)"
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Highest resident memory of this process so far, in MB, if the OS reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StageRecord:
+    """Measurements of one stage, for one sheet or for the whole run.
+
+    peak_rss_mb is the process's memory high-water mark when the stage
+    ended, so a stage that raised it is the one that needed the memory.
+    peak_traced_mb is the peak of Python-level allocations during the stage
+    and is only measured when memory tracing is on.
+    """
+
+    __slots__ = ("stage", "sheet", "seconds", "rows", "peak_rss_mb", "peak_traced_mb", "process")
+
+    def __init__(self, stage: str, sheet: Optional[str] = None):
+        self.stage = stage
+        self.sheet = sheet
+        self.seconds = 0.0
+        self.rows: Optional[int] = None
+        self.peak_rss_mb: Optional[float] = None
+        self.peak_traced_mb: Optional[float] = None
+        self.process: Optional[int] = None
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        if self.rows is None or self.seconds <= 0:
+            return None
+        return round(self.rows / self.seconds, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "sheet": self.sheet,
+            "seconds": round(self.seconds, 4),
+            "rows": self.rows,
+            "rows_per_second": self.rows_per_second,
+            "peak_rss_mb": self.peak_rss_mb,
+            "peak_traced_mb": self.peak_traced_mb,
+            "process": self.process,
+        }
+
+
+class RunMetrics:
+    """Collects StageRecords over one run.
+
+    With trace_memory, Python allocations are traced with tracemalloc to get
+    a per-stage peak; this slows the run noticeably, so it is off by default.
+    Records from worker processes are merged in with extend().
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.records: List[StageRecord] = []
+        self.started = time.time()
+
+    @contextmanager
+    def stage(self, stage: str, sheet: Optional[str] = None) -> Iterator[StageRecord]:
+        """Time the enclosed block as stage; set rows on the yielded record."""
+        record = StageRecord(stage, sheet)
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if self.trace_memory:
+                record.peak_traced_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+                if tracing:
+                    tracemalloc.stop()
+            record.peak_rss_mb = peak_rss_mb()
+            record.process = os.getpid()
+            self.records.append(record)
+
+    def extend(self, records: Iterable[StageRecord]):
+        self.records.extend(records)
+
+    def totals(self) -> Dict[str, Dict[str, Any]]:
+        """Seconds and rows summed over all sheets, per stage."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for record in self.records:
+            total = totals.setdefault(record.stage, {"seconds": 0.0, "rows": 0})
+            total["seconds"] += record.seconds
+            total["rows"] += record.rows or 0
+        for total in totals.values():
+            total["seconds"] = round(total["seconds"], 4)
+        return totals
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per record, followed by per-stage totals, for the Run Metrics tab."""
+        rows = [
+            [record.sheet or ALL_SHEETS, record.stage, round(record.seconds, 4), record.rows,
+             record.rows_per_second, record.peak_rss_mb, record.peak_traced_mb]
+            for record in self.records
+        ]
+        for stage, total in self.totals().items():
+            rows.append([f"Total: {stage}", stage, total["seconds"], total["rows"], None, None, None])
+        return pd.DataFrame(rows, columns=[
+            "Sheet Name", "Stage", "Seconds", "Rows", "Rows per Second",
+            "Peak RSS (MB)", "Peak Traced Memory (MB)"
+        ])
+
+    def to_dict(self, metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return {
+            "metadata": dict(metadata or {}),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_seconds": round(time.time() - self.started, 4),
+            "trace_memory": self.trace_memory,
+            "totals": self.totals(),
+            "stages": [record.to_dict() for record in self.records],
+        }
+
+    def write_json(self, path: Path, metadata: Optional[Dict[str, str]] = None):
+        Path(path).write_text(json.dumps(self.to_dict(metadata), indent=2))
+
+
+@contextmanager
+def measure(metrics: Optional[RunMetrics], stage: str, sheet: Optional[str] = None) -> Iterator[StageRecord]:
+    """metrics.stage(), or an unrecorded placeholder when metrics is None."""
+    if metrics is None:
+        yield StageRecord(stage, sheet)
+    else:
+        with metrics.stage(stage, sheet) as record:
+            yield record
+
+
+def metrics_path(report_path: Path) -> Path:
+    """JSON sidecar next to a report: <report file name>.metrics.json."""
+    report_path = Path(report_path)
+    return report_path.with_name(report_path.name + ".metrics.json")
+
+
+def profile_path(report_path: Path) -> Path:
+    """cProfile output next to a report: <report file name>.prof (readable with pstats)."""
+    report_path = Path(report_path)
+    return report_path.with_name(report_path.name + ".prof")
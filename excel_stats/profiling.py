@@ -0,0 +1,193 @@
+"""
+Extended column profiles for Excel Stats Analyzer.
+A ColumnProfile is fed each non-blank cell text of a column once, alongside
+the availability and unique counters, and keeps only constant-size state:
+type tallies, a running mean and variance (Welford), min/max, text length
+range and a bounded heavy-hitters sketch for the most frequent values.
+"""
+
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Most frequent values listed per column
+TOP_K = 5
+
+# Distinct values tracked by the heavy-hitters sketch per column. Columns with
+# at most this many distinct values get exact top counts
+TOP_CAPACITY = 1000
+
+PROFILE_COLUMNS = (
+    "Inferred Type", "Min", "Max", "Mean", "Std. Dev.",
+    "Min Length", "Max Length", "Top Values",
+)
+
+_INTEGER = re.compile(r"[+-]?\d+")
+_DECIMAL = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?)?")
+_BOOLEANS = ("True", "False", "TRUE", "FALSE", "true", "false")
+
+# Kinds of cell text, in the order their tallies are kept
+KINDS = ("integer", "decimal", "boolean", "date", "text")
+
+# Longer digit strings do not fit in a float (for the running mean) and are
+# profiled as text, like numbers that overflow to infinity
+_MAX_INTEGER_DIGITS = 308
+
+# Integers beyond this magnitude are not all exactly representable as floats
+EXACT_FLOAT_INTEGER = 2 ** 53
+
+
+def classify(text: str):
+    """(kind index into KINDS, numeric value or None) of one cell's text."""
+    stripped = text.strip()
+    if _INTEGER.fullmatch(stripped):
+        if len(stripped.lstrip("+-")) > _MAX_INTEGER_DIGITS:
+            return 4, None
+        return 0, int(stripped)
+    if _DECIMAL.fullmatch(stripped):
+        number = float(stripped)
+        return (1, number) if math.isfinite(number) else (4, None)
+    if stripped in _BOOLEANS:
+        return 2, None
+    if _DATE.fullmatch(stripped):
+        return 3, None
+    return 4, None
+
+
+def _extreme(number: Any) -> Any:
+    """A min/max as a float, or as the exact int where a float would round it."""
+    if isinstance(number, int) and abs(number) > EXACT_FLOAT_INTEGER:
+        return number
+    return float(number)
+
+
+class ColumnProfile:
+    """One-pass profile of a column's non-blank cell texts.
+
+    add() folds in one cell; add_counts() folds in distinct texts with their
+    occurrence counts, as the DataFrame and XML engines see them. Top values
+    come from a Misra-Gries sketch of TOP_CAPACITY entries: their counts are
+    exact until a column exceeds that many distinct values, and lower bounds
+    (reported with a leading >=) after that.
+    """
+
+    __slots__ = (
+        "kinds", "n", "mean", "m2", "min", "max",
+        "min_length", "max_length", "top", "top_offset",
+    )
+
+    def __init__(self):
+        self.kinds = [0] * len(KINDS)
+        self.n = 0          # Numeric cells
+        self.mean = 0.0
+        self.m2 = 0.0       # Sum of squared deviations from the mean
+        self.min: Any = None
+        self.max: Any = None
+        self.min_length: Optional[int] = None
+        self.max_length: Optional[int] = None
+        self.top: Dict[str, int] = {}
+        self.top_offset = 0  # Total weight removed by sketch decrements
+
+    def add(self, text: str, weight: int = 1):
+        """Fold in weight occurrences of one non-blank cell text."""
+        kind, number = classify(text)
+        self.kinds[kind] += weight
+        if number is not None:
+            # Weighted Welford update
+            self.n += weight
+            delta = number - self.mean
+            self.mean += delta * weight / self.n
+            self.m2 += delta * (number - self.mean) * weight
+            if self.min is None or number < self.min:
+                self.min = number
+            if self.max is None or number > self.max:
+                self.max = number
+
+        length = len(text)
+        if self.min_length is None or length < self.min_length:
+            self.min_length = length
+        if self.max_length is None or length > self.max_length:
+            self.max_length = length
+
+        self._add_top(text, weight)
+
+    def add_counts(self, texts: Iterable[Any], counts: Iterable[int]):
+        """Fold in distinct texts, each occurring counts[i] times."""
+        for text, count in zip(texts, counts):
+            self.add(str(text), int(count))
+
+    def _add_top(self, text: str, weight: int):
+        top = self.top
+        if text in top:
+            top[text] += weight
+            return
+        if len(top) < TOP_CAPACITY:
+            top[text] = weight
+            return
+        # Full: decrement every counter (and the newcomer) by the smallest count
+        decrement = min(weight, min(top.values()))
+        self.top_offset += decrement
+        for key in [key for key, count in top.items() if count <= decrement]:
+            del top[key]
+        for key in top:
+            top[key] -= decrement
+        if weight > decrement:
+            top[text] = weight - decrement
+
+    @property
+    def inferred_type(self) -> str:
+        present = [kind for kind, count in zip(KINDS, self.kinds) if count]
+        if not present:
+            return "empty"
+        if present == ["integer", "decimal"]:
+            return "decimal"
+        return present[0] if len(present) == 1 else "mixed"
+
+    def top_values(self, k: int = TOP_K) -> str:
+        """The k most frequent texts as "value (count); ...".
+
+        Once the sketch has overflowed, values it only saw once are left out,
+        as they are indistinguishable from the rest of the long tail.
+        """
+        items = self.top.items()
+        if self.top_offset:
+            items = [(text, count) for text, count in items if count > 1]
+        ranked = sorted(items, key=lambda item: (-item[1], item[0]))[:k]
+        prefix = ">=" if self.top_offset else ""
+        return "; ".join(f"{text} ({prefix}{count:,})" for text, count in ranked)
+
+    def to_row(self) -> List[Any]:
+        """Values for PROFILE_COLUMNS."""
+        # Numbers near the float limit can overflow the running sums; their
+        # spread is then left blank rather than reported as infinite
+        finite = math.isfinite(self.mean) and math.isfinite(self.m2)
+        std = math.sqrt(max(self.m2, 0.0) / (self.n - 1)) if self.n > 1 and finite else np.nan
+        return [
+            self.inferred_type,
+            _extreme(self.min) if self.n else np.nan,
+            _extreme(self.max) if self.n else np.nan,
+            round(self.mean, 6) if self.n and finite else np.nan,
+            round(std, 6) if self.n > 1 and finite else np.nan,
+            self.min_length if self.min_length is not None else np.nan,
+            self.max_length if self.max_length is not None else np.nan,
+            self.top_values(),
+        ]
+
+
+def profile_columns(profiles: List[ColumnProfile]) -> Dict[str, Any]:
+    """Columns to add to a stats table, one row per profiled column.
+
+    Min and Max hold floats, except that integers too large to be exact as
+    floats (such as 19-digit IDs) are kept as ints in an object column.
+    """
+    rows = [profile.to_row() for profile in profiles]
+    columns: Dict[str, Any] = {
+        name: [row[position] for row in rows] for position, name in enumerate(PROFILE_COLUMNS)
+    }
+    for name in ("Min", "Max"):
+        if any(isinstance(value, int) for value in columns[name]):
+            columns[name] = np.array(columns[name], dtype=object)
+    return columns
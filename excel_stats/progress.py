@@ -0,0 +1,108 @@
+"""
+Progress reporting and cancellation for Excel Stats Analyzer.
+Sheets report the rows they have read as they go; ProgressTracker turns
+that into an overall percentage weighted by sheet size, throttled to a fixed
+rate, and stops the run when its cancel event is set.
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+# Progress callback: (percent complete, status message)
+ProgressCallback = Callable[[float, str], None]
+
+# Row callback: number of sheet rows read so far; may raise AnalysisCancelled
+RowCallback = Callable[[int], None]
+
+# Readers call their row callback once per this many rows
+PROGRESS_ROWS = 1000
+
+# Minimum seconds between two progress callbacks, apart from sheet boundaries
+PROGRESS_INTERVAL = 0.1
+
+
+class AnalysisCancelled(Exception):
+    """Raised when an analysis is cancelled through its cancel event."""
+
+
+def check_cancelled(cancel_event) -> None:
+    """Raise AnalysisCancelled if cancel_event (any object with is_set()) is set."""
+    if cancel_event is not None and cancel_event.is_set():
+        raise AnalysisCancelled()
+
+
+class ProgressTracker:
+    """Overall progress of a multi-sheet run, from per-sheet row counts.
+
+    sheet_rows maps each sheet to its expected row count, or None when
+    unknown; such sheets are weighted like an average sheet and only advance
+    the percentage when they finish. Several sheets may be in progress at
+    once (sheets read by worker processes). Percentages run from 0 to scale.
+    """
+
+    def __init__(self, sheet_rows: Dict[str, Optional[int]],
+                 progress: Optional[ProgressCallback] = None,
+                 cancel_event=None, scale: float = 90.0,
+                 interval: float = PROGRESS_INTERVAL):
+        known = [rows for rows in sheet_rows.values() if rows]
+        default_weight = sum(known) / len(known) if known else 1
+        self._expected = dict(sheet_rows)
+        self._weights = {name: rows or default_weight for name, rows in sheet_rows.items()}
+        self._total = sum(self._weights.values()) or 1
+        self._progress = progress
+        self.cancel_event = cancel_event
+        self._scale = scale
+        self._interval = interval
+        self._done = 0.0
+        self._partial: Dict[str, float] = {}  # Weight read so far of each sheet in progress
+        self._finished = 0
+        self._last_report = 0.0
+
+    @property
+    def percent(self) -> float:
+        return (self._done + sum(self._partial.values())) / self._total * self._scale
+
+    def _report(self, percent: float, status: str, force: bool = False):
+        if self._progress is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_report >= self._interval:
+            self._last_report = now
+            self._progress(percent, status)
+
+    def report(self, status: str):
+        """Report status at the current percentage, regardless of throttling."""
+        self._report(self.percent, status, force=True)
+
+    def check(self):
+        """Raise AnalysisCancelled if the run was cancelled."""
+        check_cancelled(self.cancel_event)
+
+    def start_sheet(self, sheet_name: str):
+        self.check()
+        self.report(f"Processing: {sheet_name}...")
+
+    def row_callback(self, sheet_name: str) -> RowCallback:
+        """Callback for a sheet's reader: checks for cancellation and reports progress."""
+        expected = self._expected.get(sheet_name)
+        weight = self._weights.get(sheet_name, 0)
+
+        def on_rows(rows: int):
+            self.check()
+            if expected:
+                self._partial[sheet_name] = min(rows / expected, 1.0) * weight
+                self._report(self.percent, f"Processing: {sheet_name} ({rows:,} of ~{expected:,} rows)")
+            else:
+                self._report(self.percent, f"Processing: {sheet_name} ({rows:,} rows)")
+
+        return on_rows
+
+    def skip_sheet(self, sheet_name: str):
+        """Count a sheet as done without reporting it, e.g. when it was cached."""
+        self._partial.pop(sheet_name, None)
+        self._done += self._weights.get(sheet_name, 0)
+        self._finished += 1
+
+    def finish_sheet(self, sheet_name: str):
+        self.skip_sheet(sheet_name)
+        self.report(f"Completed: {sheet_name} ({self._finished}/{len(self._weights)})")
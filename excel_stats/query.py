@@ -0,0 +1,84 @@
+"""
+Catalog query CLI for Excel Stats Analyzer.
+Answers trend and cross-file questions from the stats catalog that the
+analyzer records runs in, without reopening any workbook.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from excel_stats.catalog import StatsCatalog, timestamp
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m excel_stats.query",
+        description="Query the stats catalog of earlier runs without reopening any workbook."
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--catalog", metavar="PATH",
+        help="Catalog database (default: per-user data directory, or EXCEL_STATS_CATALOG)"
+    )
+    common.add_argument("--csv", action="store_true", help="Print results as CSV")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name: str, help: str, sheet: bool = True) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help, parents=[common])
+        command.add_argument(
+            "-f", "--file", dest="file_pattern", metavar="PATTERN",
+            help="Only files whose path or name matches this glob pattern"
+        )
+        if sheet:
+            command.add_argument("-s", "--sheet", help="Only this sheet")
+        return command
+
+    history = add_command("history", "A column's stats over time")
+    history.add_argument("column", help="Column (header) name")
+    history.add_argument("--last", type=int, metavar="N", help="Only the N most recent runs")
+    history.add_argument("--since", metavar="DATE", help="Only runs since this ISO date/time, in UTC unless it has an offset")
+
+    compare = add_command("compare", "A column's latest stats in each file")
+    compare.add_argument("column", help="Column (header) name")
+
+    add_command("columns", "Columns in the catalog")
+
+    runs = add_command("runs", "Recorded runs", sheet=False)
+    runs.add_argument("--last", type=int, metavar="N", help="Only the N most recent runs")
+    runs.add_argument("--since", metavar="DATE", help="Only runs since this ISO date/time, in UTC unless it has an offset")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the catalog query CLI; returns 0 on success, 2 on usage errors."""
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "last", None) is not None and args.last < 1:
+        parser.error("--last must be at least 1")
+    try:
+        since = timestamp(getattr(args, "since", None))
+    except ValueError:
+        parser.error("--since must be an ISO date or date/time, e.g. 2024-01-31")
+
+    catalog = StatsCatalog(args.catalog)
+    if args.command == "history":
+        result = catalog.column_history(args.column, args.file_pattern, args.sheet, args.last, since)
+    elif args.command == "compare":
+        result = catalog.compare_files(args.column, args.file_pattern, args.sheet)
+    elif args.command == "columns":
+        result = catalog.columns(args.file_pattern, args.sheet)
+    else:
+        result = catalog.runs(args.file_pattern, args.last, since)
+
+    if args.csv:
+        result.to_csv(sys.stdout, index=False)
+    elif result.empty:
+        print("No matching entries in the catalog", file=sys.stderr)
+    else:
+        print(result.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
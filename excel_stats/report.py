@@ -0,0 +1,206 @@
+"""
+Report writers for Excel Stats Analyzer.
+Stats tables are streamed to disk row by row: xlsx reports go through
+xlsxwriter in constant-memory mode when it is installed, else through
+openpyxl's write-only mode; CSV and Parquet reports skip Excel entirely.
+"""
+
+import re
+from contextlib import suppress
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.packaging.custom import StringProperty
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+
+from excel_stats.progress import PROGRESS_ROWS, check_cancelled
+
+try:
+    import xlsxwriter
+except ImportError:  # Optional: openpyxl's write-only mode is used instead
+    xlsxwriter = None
+
+
+REPORT_FORMATS = ("xlsx", "csv", "parquet")
+
+# Excel limits sheet names to 31 characters and forbids these
+MAX_SHEET_NAME = 31
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+MAX_COLUMN_WIDTH = 50
+
+# Excel stores numbers as doubles; integers beyond this are written as text
+# so that they stay exact (e.g. 19-digit IDs in a profile's Min and Max)
+_EXCEL_EXACT_INTEGER = 2 ** 53
+
+# Same look as the header row pandas writes in to_excel
+_HEADER_FONT = Font(bold=True)
+_HEADER_BORDER = Border(*(Side(style="thin"),) * 4)
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+_XLSXWRITER_HEADER = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+
+
+def sheet_titles(names: Sequence[str]) -> List[str]:
+    """Valid, unique worksheet titles for the given sheet names.
+
+    Apostrophes are dropped from both ends, which Excel does not allow; long
+    names are cut to 28 characters plus "..."; a name that collides with an
+    earlier one gets a " (2)", " (3)", ... suffix.
+    """
+    titles = []
+    taken = set()
+    for name in names:
+        title = _INVALID_SHEET_CHARS.sub("_", str(name)).strip("'") or "Sheet"
+        if len(title) > MAX_SHEET_NAME:
+            title = title[:MAX_SHEET_NAME - 3] + "..."
+        candidate = title
+        counter = 2
+        # Excel compares sheet names case-insensitively
+        while candidate.lower() in taken:
+            suffix = f" ({counter})"
+            candidate = title[:MAX_SHEET_NAME - len(suffix)] + suffix
+            counter += 1
+        taken.add(candidate.lower())
+        titles.append(candidate)
+    return titles
+
+
+def column_widths(df: pd.DataFrame) -> List[int]:
+    """Display width of each column: its longest value or header plus 2, capped at 50.
+
+    Lengths are measured one column at a time, so one long cell does not
+    widen the text of every other column in memory.
+    """
+    widths = []
+    for position, column in enumerate(df.columns):
+        longest = df.iloc[:, position].astype(str).str.len().max()
+        width = max(len(str(column)), 0 if pd.isna(longest) else int(longest))
+        widths.append(min(width + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _table_rows(df: pd.DataFrame, cancel_event=None) -> Iterator[tuple]:
+    """Rows of a table as tuples of plain Python values (no numpy scalars).
+
+    Raises AnalysisCancelled every PROGRESS_ROWS rows once cancel_event is set.
+    """
+    check_cancelled(cancel_event)
+    columns = [_cell_values(df.iloc[:, position]) for position in range(df.shape[1])]
+    if cancel_event is None:
+        return zip(*columns)
+    return _checked_rows(zip(*columns), cancel_event)
+
+
+def _cell_values(column: pd.Series) -> list:
+    """A column as plain Python values, with NaN as None (an empty cell)."""
+    values = column.tolist()
+    if column.dtype.kind == "f" and column.isna().any():
+        return [None if value != value else value for value in values]
+    if column.dtype == object:
+        return [
+            None if value != value
+            else str(value) if isinstance(value, int) and abs(value) > _EXCEL_EXACT_INTEGER
+            else value
+            for value in values
+        ]
+    return values
+
+
+def _checked_rows(rows: Iterator[tuple], cancel_event) -> Iterator[tuple]:
+    for count, row in enumerate(rows, 1):
+        if count % PROGRESS_ROWS == 0:
+            check_cancelled(cancel_event)
+        yield row
+
+
+def write_xlsx(output_path: Path, tables: Sequence[Tuple[str, pd.DataFrame]],
+               metadata: Optional[Dict[str, str]] = None, cancel_event=None):
+    """Write each (title, table) pair to its own worksheet, streaming rows.
+
+    metadata entries are stored as custom document properties, shown under
+    File > Info > Properties in Excel. Setting cancel_event stops the write
+    with AnalysisCancelled, leaving an incomplete file for the caller to remove.
+    """
+    if xlsxwriter is not None:
+        _write_xlsx_xlsxwriter(output_path, tables, metadata or {}, cancel_event)
+    else:
+        _write_xlsx_openpyxl(output_path, tables, metadata or {}, cancel_event)
+
+
+def _write_xlsx_xlsxwriter(output_path: Path, tables: Sequence[Tuple[str, pd.DataFrame]],
+                           metadata: Dict[str, str], cancel_event=None):
+    # constant_memory flushes each row as soon as the next one starts, so rows
+    # must be written strictly in order
+    workbook = xlsxwriter.Workbook(
+        str(output_path), {"constant_memory": True, "nan_inf_to_errors": True}
+    )
+    try:
+        header_format = workbook.add_format(_XLSXWRITER_HEADER)
+        for title, df in tables:
+            worksheet = workbook.add_worksheet(title)
+            for idx, width in enumerate(column_widths(df)):
+                worksheet.set_column(idx, idx, width)
+            worksheet.write_row(0, 0, [str(column) for column in df.columns], header_format)
+            for row_idx, row in enumerate(_table_rows(df, cancel_event), start=1):
+                worksheet.write_row(row_idx, 0, row)
+        for name, value in metadata.items():
+            workbook.set_custom_property(name, str(value))
+    finally:
+        workbook.close()
+
+
+def _write_xlsx_openpyxl(output_path: Path, tables: Sequence[Tuple[str, pd.DataFrame]],
+                         metadata: Dict[str, str], cancel_event=None):
+    workbook = Workbook(write_only=True)
+    try:
+        for title, df in tables:
+            worksheet = workbook.create_sheet(title)
+            # Column widths must be set before the first row is appended
+            for idx, width in enumerate(column_widths(df), start=1):
+                worksheet.column_dimensions[get_column_letter(idx)].width = width
+            worksheet.append([_header_cell(worksheet, column) for column in df.columns])
+            for row in _table_rows(df, cancel_event):
+                worksheet.append(row)
+    except BaseException:
+        # Close the sheets' temporary streams now, rather than at garbage collection
+        for worksheet in workbook.worksheets:
+            with suppress(Exception):
+                worksheet.close()
+        raise
+    for name, value in metadata.items():
+        workbook.custom_doc_props.append(StringProperty(name=name, value=str(value)))
+    workbook.save(output_path)
+
+
+def _header_cell(worksheet, column) -> WriteOnlyCell:
+    cell = WriteOnlyCell(worksheet, value=str(column))
+    cell.font = _HEADER_FONT
+    cell.border = _HEADER_BORDER
+    cell.alignment = _HEADER_ALIGNMENT
+    return cell
+
+
+def write_table(output_path: Path, df: pd.DataFrame, report_format: str,
+                metadata: Optional[Dict[str, str]] = None, cancel_event=None):
+    """Write a single flat table as CSV or Parquet.
+
+    Parquet needs pyarrow and keeps metadata in the file's key-value metadata;
+    CSV has nowhere to put it. Both are written in one call, so cancel_event
+    is only checked before writing.
+    """
+    check_cancelled(cancel_event)
+    if report_format == "csv":
+        df.to_csv(output_path, index=False)
+    elif report_format == "parquet":
+        df = df.copy()
+        # Arrow needs one type per column; header names can mix text and numbers
+        for column in df.columns[df.dtypes == object]:
+            df[column] = df[column].astype(str).where(df[column].notna(), None)
+        df.attrs = dict(metadata or {})
+        df.to_parquet(output_path, index=False)
+    else:
+        raise ValueError(f"Not a flat report format: {report_format}")
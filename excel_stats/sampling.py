@@ -0,0 +1,150 @@
+"""
+Sampled preview statistics for Excel Stats Analyzer.
+A preview keeps a fixed-size uniform sample of each sheet's rows (reservoir
+sampling, Algorithm L) and estimates availability, with a confidence
+interval, and unique counts from it, instead of counting every cell.
+"""
+
+import math
+import random
+from collections import Counter
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Rows sampled per sheet by default
+SAMPLE_SIZE = 10_000
+
+# Two-sided 95% normal quantile for the availability interval
+CONFIDENCE_LEVEL = 95
+CONFIDENCE_Z = 1.959964
+
+SAMPLED_ROWS_COLUMN = 'Sampled Rows'
+EST_AVAILABILITY_COLUMN = 'Est. % Availability'
+AVAILABILITY_LOW_COLUMN = f'% Availability {CONFIDENCE_LEVEL}% CI Low'
+AVAILABILITY_HIGH_COLUMN = f'% Availability {CONFIDENCE_LEVEL}% CI High'
+EST_UNIQUE_COLUMN = 'Est. No of Unique Values'
+
+
+class Reservoir:
+    """Uniform sample of up to size items from a stream of positions 1, 2, ...
+
+    Uses Algorithm L: after the reservoir fills, the next position to keep
+    is drawn directly, so callers only need to materialize the items at
+    next_position and can skip everything in between. Positions must be
+    offered in increasing order, and only when equal to next_position.
+    """
+
+    def __init__(self, size: int, seed: int = 0):
+        if size < 1:
+            raise ValueError("Sample size must be at least 1")
+        self.size = size
+        self.items: List[Tuple[int, Any]] = []
+        self.next_position = 1
+        self._random = random.Random(seed)
+        self._weight = math.exp(math.log(self._uniform()) / size)
+
+    def _uniform(self) -> float:
+        """A uniform draw from the open interval (0, 1)."""
+        value = 0.0
+        while not 0.0 < value < 1.0:
+            value = self._random.random()
+        return value
+
+    def _skip(self):
+        self.next_position += int(math.log(self._uniform()) / math.log(1 - self._weight)) + 1
+
+    def add(self, item: Any):
+        """Keep item as the one at next_position."""
+        if len(self.items) < self.size:
+            self.items.append((self.next_position, item))
+            if len(self.items) < self.size:
+                self.next_position += 1
+            else:
+                self._skip()
+            return
+        self.items[self._random.randrange(self.size)] = (self.next_position, item)
+        self._weight *= math.exp(math.log(self._uniform()) / self.size)
+        self._skip()
+
+    def sample(self, population: int) -> List[Any]:
+        """Items kept from positions 1..population, in stream order."""
+        return [item for position, item in sorted(self.items, key=lambda entry: entry[0])
+                if position <= population]
+
+
+def sample_positions(population: int, size: int, seed: int = 0) -> np.ndarray:
+    """Sorted 0-based positions of a uniform sample of up to size rows."""
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(population, min(size, population), replace=False))
+
+
+def availability_interval(non_blank: int, sampled: int, population: int,
+                          z: float = CONFIDENCE_Z) -> Tuple[float, float, float]:
+    """(estimate, low, high) % availability from a sample of rows.
+
+    The interval is a Wilson score interval with a finite population
+    correction, so it shrinks to the estimate when every row was sampled.
+    """
+    if sampled == 0:
+        return 0.0, 0.0, (100.0 if population else 0.0)
+    share = non_blank / sampled
+    correction = (population - sampled) / (population - 1) if population > 1 else 0.0
+    z2 = z * z * correction
+    denominator = 1 + z2 / sampled
+    centre = (share + z2 / (2 * sampled)) / denominator
+    half_width = math.sqrt(correction) * z * math.sqrt(
+        share * (1 - share) / sampled + z2 / (4 * sampled * sampled)
+    ) / denominator
+    return (
+        round(share * 100, 2),
+        round(max(0.0, centre - half_width) * 100, 2),
+        round(min(1.0, centre + half_width) * 100, 2),
+    )
+
+
+def estimate_distinct(frequencies: Counter, sampled: int, population: int) -> int:
+    """Estimated distinct values in the population from sampled value counts.
+
+    Uses the GEE estimator (Charikar et al.): values seen once in the sample
+    are scaled by sqrt(population / sampled), values seen more often count
+    once. Exact when every row was sampled.
+    """
+    distinct = len(frequencies)
+    if sampled == 0 or sampled >= population:
+        return distinct
+    singletons = sum(1 for count in frequencies.values() if count == 1)
+    estimate = math.sqrt(population / sampled) * singletons + (distinct - singletons)
+    # At most one distinct value per estimated non-blank cell
+    upper = round(sum(frequencies.values()) / sampled * population)
+    return int(round(min(max(estimate, distinct), max(upper, distinct))))
+
+
+def sampled_stats(headers: List[Any], n_rows: int, columns: List[List[Optional[str]]]) -> pd.DataFrame:
+    """Statistics table estimated from sampled rows.
+
+    columns holds, per column, the text of each sampled row's cell, or None
+    when it is blank. Total Number of Transactions is the sheet's full row
+    count; the other columns are labelled as estimates.
+    """
+    sampled = len(columns[0]) if columns else 0
+    estimates, lows, highs, uniques = [], [], [], []
+    for texts in columns:
+        frequencies = Counter(text for text in texts if text is not None)
+        estimate, low, high = availability_interval(sum(frequencies.values()), sampled, n_rows)
+        estimates.append(estimate)
+        lows.append(low)
+        highs.append(high)
+        uniques.append(estimate_distinct(frequencies, sampled, n_rows))
+
+    n_cols = len(headers)
+    return pd.DataFrame({
+        'Header Name': headers,
+        'Total Number of Transactions': np.full(n_cols, n_rows, dtype=np.int64),
+        SAMPLED_ROWS_COLUMN: np.full(n_cols, sampled, dtype=np.int64),
+        EST_AVAILABILITY_COLUMN: np.array(estimates, dtype=np.float64),
+        AVAILABILITY_LOW_COLUMN: np.array(lows, dtype=np.float64),
+        AVAILABILITY_HIGH_COLUMN: np.array(highs, dtype=np.float64),
+        EST_UNIQUE_COLUMN: np.array(uniques, dtype=np.int64),
+    })
@@ -0,0 +1,90 @@
+"""
+Sheet selection state for Excel Stats Analyzer.
+Selection is a plain set of sheet names plus a filtered view of the sheet
+list, so selecting, filtering and Select All never touch per-sheet widgets
+and stay fast for workbooks with thousands of sheets.
+"""
+
+import fnmatch
+import re
+from typing import Iterable, List, Set
+
+# A filter containing any of these is a glob pattern; otherwise a substring
+GLOB_CHARS = "*?["
+
+
+def name_matcher(pattern: str):
+    """Case-insensitive predicate for sheet names matching pattern.
+
+    Patterns with *, ? or [...] are globs over the whole name ("Sales_*");
+    anything else matches as a substring. An empty pattern matches every name.
+    """
+    pattern = pattern.strip().casefold()
+    if not pattern:
+        return lambda name: True
+    if any(char in pattern for char in GLOB_CHARS):
+        regex = re.compile(fnmatch.translate(pattern))
+        return lambda name: regex.match(name.casefold()) is not None
+    return lambda name: pattern in name.casefold()
+
+
+class SheetSelection:
+    """Selected sheets and the sheets shown under the current filter."""
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.reset(names)
+
+    def reset(self, names: Iterable[str] = ()):
+        """Replace the sheet list, clearing the selection and the filter."""
+        self.names: List[str] = list(names)
+        self.selected: Set[str] = set()
+        self.pattern = ""
+        self.visible: List[str] = self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self.pattern.strip())
+
+    def set_filter(self, pattern: str):
+        """Show only the sheets matching pattern; the selection is unchanged."""
+        self.pattern = pattern
+        if self.filtered:
+            matches = name_matcher(pattern)
+            self.visible = [name for name in self.names if matches(name)]
+        else:
+            self.visible = self.names
+
+    def is_selected(self, name: str) -> bool:
+        return name in self.selected
+
+    def toggle(self, name: str):
+        if name in self.selected:
+            self.selected.discard(name)
+        else:
+            self.selected.add(name)
+
+    def select_visible(self, selected: bool = True):
+        """Select or deselect every sheet shown under the current filter."""
+        if not self.filtered:
+            self.selected = set(self.names) if selected else set()
+        elif selected:
+            self.selected.update(self.visible)
+        else:
+            self.selected.difference_update(self.visible)
+
+    def all_visible_selected(self) -> bool:
+        """True if at least one sheet is shown and all shown sheets are selected."""
+        if not self.visible:
+            return False
+        if not self.filtered:
+            return len(self.selected) == len(self.names)
+        return all(name in self.selected for name in self.visible)
+
+    def selected_names(self) -> List[str]:
+        """Selected sheets in workbook order."""
+        if len(self.selected) == len(self.names):
+            return list(self.names)
+        return [name for name in self.names if name in self.selected]
@@ -0,0 +1,691 @@
+"""
+Direct sheet-XML statistics engine for .xlsx/.xlsm workbooks.
+Stream-parses each worksheet part straight out of the zip and updates
+per-column counters as it goes, without building cell objects or a DataFrame.
+Shared-string cells are counted by their shared-string index, so strings are
+only looked at once per distinct table entry, not once per cell.
+"""
+
+import math
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from openpyxl.reader.strings import read_string_table
+from openpyxl.styles.stylesheet import Stylesheet
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, WINDOWS_EPOCH, from_excel, from_ISO8601
+from openpyxl.xml.constants import ARC_CONTENT_TYPES, ARC_STYLE, SHARED_STRINGS, SHEET_MAIN_NS
+from pandas._libs.parsers import STR_NA_VALUES
+
+from excel_stats.discovery import (
+    _column_number,
+    _local_name,
+    _read_relationships,
+    _read_workbook,
+    _rels_part,
+    _resolve_target,
+    _sheet_elements,
+    _sheet_rel_id,
+)
+from excel_stats.profiling import ColumnProfile
+from excel_stats.progress import PROGRESS_ROWS, RowCallback
+from excel_stats.sampling import Reservoir
+from excel_stats.sketch import HyperLogLog, hash_values
+
+
+_ROW_TAG = f"{{{SHEET_MAIN_NS}}}row"
+_VALUE_TAG = f"{{{SHEET_MAIN_NS}}}v"
+_INLINE_STRING_TAG = f"{{{SHEET_MAIN_NS}}}is"
+_TEXT_TAG = f"{{{SHEET_MAIN_NS}}}t"
+_RUN_TAG = f"{{{SHEET_MAIN_NS}}}r"
+
+_DIGITS = "0123456789"
+
+# Raw-byte patterns used to skim worksheet XML when sampling rows
+_WORKSHEET_TAG = re.compile(rb"<worksheet\b[^>]*>")
+_ROW_REF = re.compile(rb'\sr="(\d+)"')
+_CELL_REF = re.compile(rb'\sr="([A-Z]+)')
+_SCAN_CHUNK_BYTES = 1 << 20
+
+# Stands in for error cells, which pandas reads as NaN
+_ERROR = float("nan")
+
+
+class SheetCounts(NamedTuple):
+    """Raw per-column counters for one sheet.
+
+    header holds the first row's cell values as pd.read_excel would see them
+    (trailing empty cells trimmed); the counters cover every column that has
+    data in any row. profiles is set when column profiles were requested.
+    """
+    header: List[Any]
+    n_rows: int
+    non_blank: List[int]
+    unique_counts: List[int]
+    profiles: Optional[List[ColumnProfile]] = None
+
+
+class SheetSample(NamedTuple):
+    """A uniform sample of one sheet's data rows.
+
+    n_rows and width are the sheet's full row count and column count; rows
+    are the sampled rows in sheet order, each a dict of 0-based column to
+    cell value (shared strings as their text), with empty rows as {}.
+    """
+    header: List[Any]
+    n_rows: int
+    width: int
+    rows: List[Dict[int, Any]]
+
+
+class _SharedStrings:
+    """The workbook's shared-string table, reduced to what counting needs.
+
+    Entries with the same text share a code, blank entries get code -1, and
+    entries that are the empty string are flagged so they can be trimmed like
+    missing cells.
+    """
+
+    def __init__(self, strings: List[str]):
+        self.strings = strings
+        codes, uniques = pd.factorize(np.asarray(strings, dtype=object))
+        blank = np.fromiter(
+            (value in STR_NA_VALUES or value.strip() == '' for value in uniques),
+            dtype=bool,
+            count=len(uniques)
+        )
+        self.uniques = uniques
+        self.codes: List[int] = np.where(blank[codes], -1, codes).tolist() if len(codes) else []
+        self.empty: List[bool] = [value == "" for value in strings]
+        self._lookup: Optional[Dict[str, int]] = None
+
+    def code_of(self, text: str) -> Optional[int]:
+        """Code of a non-blank shared string equal to text, if there is one."""
+        if self._lookup is None:
+            self._lookup = {value: code for code, value in enumerate(self.uniques)}
+        return self._lookup.get(text)
+
+
+def _cell_column(ref: str, cache: Dict[str, int]) -> int:
+    """1-based column number of a cell reference such as "AB12", cached by its letters."""
+    letters = ref.rstrip(_DIGITS)
+    number = cache.get(letters)
+    if number is None:
+        number = cache[letters] = _column_number(letters)
+    return number
+
+
+def _last_value_column(row: bytes, column_cache: Dict[str, int]) -> Optional[int]:
+    """Column number of the last cell in a <row>'s bytes with a value element.
+
+    0 if no cell has one; None if the bytes do not tell (cells without a
+    reference), in which case the row has to be parsed.
+    """
+    if b"<c>" in row:
+        return None
+    end = len(row)
+    while True:
+        start = row.rfind(b"<c ", 0, end)
+        if start < 0:
+            return 0
+        cell = row[start:end]
+        if b"<v>" in cell or b"<is>" in cell:
+            ref = _CELL_REF.search(cell, 0, cell.find(b">"))
+            if ref is None:
+                return None
+            return _cell_column(ref.group(1).decode(), column_cache)
+        end = start
+
+
+def _load_row(root_tag: bytes, row_bytes: bytes) -> ET.Element:
+    """Parse one <row>'s bytes in the namespace of the worksheet's root tag."""
+    return ET.fromstring(root_tag + row_bytes + b"</worksheet>")[0]
+
+
+def _inline_text(element: ET.Element) -> str:
+    """Plain text of an <is> element, as openpyxl's Text.from_tree(...).content gives it."""
+    plain = None
+    runs = []
+    for child in element:
+        if child.tag == _TEXT_TAG:
+            plain = child.text
+        elif child.tag == _RUN_TAG:
+            text = None
+            for part in child:
+                if part.tag == _TEXT_TAG:
+                    text = part.text
+            if text is not None:
+                runs.append(text)
+    return (plain or "") + "".join(runs)
+
+
+def _cell_text(value: Any, aliases: Dict[Any, str]) -> Optional[str]:
+    """Text pandas would hold for a non-shared-string cell value, or None if blank."""
+    if isinstance(value, str):
+        if value in STR_NA_VALUES or value.strip() == '':
+            return None
+        return value
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value == 0 or value == 1:
+        # pandas gives equal values (True and 1, False and 0) the text of the first one seen
+        text = aliases.get(value)
+        if text is None:
+            text = aliases[value] = str(value)
+        return text
+    return str(value)
+
+
+class SheetXmlReader:
+    """An .xlsx/.xlsm package opened for direct statistics on its sheet XML.
+
+    Cell values are interpreted exactly as pandas' openpyxl reader does (cached
+    formula results, date-formatted numbers, booleans, errors as NaN), so the
+    counters match pd.read_excel(header=0, dtype=str) followed by
+    calculate_column_stats. The shared-string table and styles are parsed once
+    and reused for every sheet. Raises ValueError for anything that is not an
+    XML spreadsheet package (.xls, .xlsb, .ods, ...).
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        try:
+            self._archive = zipfile.ZipFile(file_path)
+        except (OSError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Not an .xlsx/.xlsm workbook: {file_path}") from e
+
+        try:
+            workbook_part, workbook = _read_workbook(self._archive)
+            if not workbook_part.endswith(".xml"):
+                raise ValueError(f"Not an .xlsx/.xlsm workbook: {file_path}")
+            relationships = _read_relationships(self._archive, _rels_part(workbook_part))
+
+            self._sheet_parts: Dict[str, str] = {}
+            for element in _sheet_elements(workbook):
+                rel_id = _sheet_rel_id(element)
+                if rel_id in relationships:
+                    self._sheet_parts[element.get("name")] = _resolve_target(workbook_part, relationships[rel_id][1])
+
+            self._epoch = WINDOWS_EPOCH
+            for element in workbook:
+                if _local_name(element.tag) == "workbookPr" and element.get("date1904") in ("1", "true"):
+                    self._epoch = CALENDAR_MAC_1904
+
+            self._date_styles, self._timedelta_styles = self._read_number_formats()
+        except (KeyError, ET.ParseError) as e:
+            self._archive.close()
+            raise ValueError(f"Not an .xlsx/.xlsm workbook: {file_path}") from e
+        except BaseException:
+            self._archive.close()
+            raise
+
+        self._shared_strings: Optional[_SharedStrings] = None
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """Names of the workbook's worksheets, in workbook order."""
+        return list(self._sheet_parts)
+
+    def _read_number_formats(self):
+        """Style indices whose number format makes numbers dates or durations."""
+        try:
+            stylesheet = Stylesheet.from_tree(ET.fromstring(self._archive.read(ARC_STYLE)))
+        except KeyError:
+            return set(), set()
+        if not stylesheet.cell_styles:
+            return set(), set()
+        return stylesheet.date_formats, stylesheet.timedelta_formats
+
+    def _get_shared_strings(self) -> _SharedStrings:
+        if self._shared_strings is None:
+            strings: List[str] = []
+            content_types = ET.fromstring(self._archive.read(ARC_CONTENT_TYPES))
+            for element in content_types:
+                if _local_name(element.tag) == "Override" and element.get("ContentType") == SHARED_STRINGS:
+                    with self._archive.open(element.get("PartName")[1:]) as source:
+                        strings = read_string_table(source)
+                    break
+            self._shared_strings = _SharedStrings(strings)
+        return self._shared_strings
+
+    def _cell_value(self, cell: ET.Element, data_type: str, text: Optional[str]) -> Any:
+        """Python value of a non-shared-string cell, as openpyxl and pandas read it."""
+        if data_type == "n":
+            if "." in text or "e" in text or "E" in text:
+                value = float(text)
+            else:
+                value = int(text)
+            style = cell.get("s")
+            style_id = int(style) if style else 0
+            if style_id in self._date_styles:
+                try:
+                    return from_excel(value, self._epoch, timedelta=style_id in self._timedelta_styles)
+                except (OverflowError, ValueError):
+                    return _ERROR
+            as_int = int(value)
+            return as_int if as_int == value else float(value)
+        if data_type == "b":
+            return bool(int(text))
+        if data_type == "d":
+            return from_ISO8601(text)
+        if data_type == "e":
+            return _ERROR
+        return text  # "str" formula results and unknown types are kept as text
+
+    def _parse_cell(self, cell: ET.Element, shared_empty: List[bool]) -> Optional[tuple]:
+        """(shared-string index, None) or (None, value) for a cell, or None if it is empty."""
+        data_type = cell.get("t", "n")
+        if data_type == "inlineStr":
+            child = cell.find(_INLINE_STRING_TAG)
+            if child is None:
+                return None
+            value = _inline_text(child)
+            return (None, value) if value != "" else None
+        text = cell.findtext(_VALUE_TAG)
+        if not text:
+            return None
+        if data_type == "s":
+            index = int(text)
+            return None if shared_empty[index] else (index, None)
+        return None, self._cell_value(cell, data_type, text)
+
+    def sheet_counts(self, sheet_name: str, approx_precision: Optional[int] = None,
+                     on_rows: Optional[RowCallback] = None,
+                     column_profile: bool = False) -> SheetCounts:
+        """Count non-blank and distinct values per column of one sheet.
+
+        With approx_precision, distinct values that are not shared strings go
+        into a HyperLogLog sketch per column; shared-string indices are kept
+        exactly either way, as the table is already held in memory. on_rows
+        is called with the sheet row reached every PROGRESS_ROWS rows.
+
+        With column_profile, each column is also profiled. Shared strings are
+        tallied by index, and other values by text unless approx_precision
+        keeps memory bounded, so each distinct value is profiled only once.
+        """
+        part = self._sheet_parts.get(sheet_name)
+        if part is None:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        shared = self._get_shared_strings()
+        shared_codes = shared.codes
+        shared_empty = shared.empty
+
+        header: Optional[List[Any]] = None
+        n_rows = 0
+        pending_empty_rows = 0
+        non_blank: List[int] = []
+        shared_seen: List[Set[int]] = []
+        other_seen: List[Any] = []  # set or HyperLogLog per column
+        aliases: List[Dict[Any, str]] = []
+        profiles: Optional[List[ColumnProfile]] = [] if column_profile else None
+        shared_tallies: List[Dict[int, int]] = []
+        other_tallies: List[Dict[str, int]] = []
+        column_cache: Dict[str, int] = {}
+
+        def ensure_width(width: int):
+            while len(non_blank) < width:
+                non_blank.append(0)
+                shared_seen.append(set())
+                other_seen.append(set() if approx_precision is None else HyperLogLog(approx_precision))
+                aliases.append({})
+                if profiles is not None:
+                    profiles.append(ColumnProfile())
+                    shared_tallies.append({})
+                    other_tallies.append({})
+
+        row_counter = 0
+        next_row = 1
+        next_report = PROGRESS_ROWS
+        with self._archive.open(part) as source:
+            for _event, row in ET.iterparse(source):
+                if row.tag != _ROW_TAG:
+                    continue
+
+                # Row numbering, gaps and out-of-order rows as openpyxl's read-only sheets
+                ref = row.get("r")
+                row_counter = int(float(ref)) if ref else row_counter + 1
+                if row_counter < next_row:
+                    row.clear()
+                    continue
+                gap = row_counter - next_row
+                next_row = row_counter + 1
+                if on_rows is not None and row_counter >= next_report:
+                    on_rows(row_counter)
+                    next_report = row_counter + PROGRESS_ROWS
+
+                # (column, shared-string index or None, value) of each non-empty cell
+                entries = []
+                column = 0
+                in_order = True
+                for cell in row:
+                    cell_ref = cell.get("r")
+                    previous = column
+                    if cell_ref:
+                        column = column_cache.get(cell_ref.rstrip(_DIGITS)) or _cell_column(cell_ref, column_cache)
+                    else:
+                        column += 1
+                    if column <= previous:
+                        in_order = False
+                    if cell.get("t") == "s":
+                        # Shared strings, by far the most common cells, are only looked up by index
+                        text = cell.findtext(_VALUE_TAG)
+                        if text and not shared_empty[int(text)]:
+                            entries.append((column, int(text), None))
+                        continue
+                    parsed = self._parse_cell(cell, shared_empty)
+                    if parsed is not None:
+                        entries.append((column, parsed[0], parsed[1]))
+
+                if not in_order:
+                    # Later cells win, even empty ones; cells past the row's last cell are dropped
+                    by_column = {}
+                    column = 0
+                    for cell in row:
+                        cell_ref = cell.get("r")
+                        column = _cell_column(cell_ref, column_cache) if cell_ref else column + 1
+                        by_column[column] = self._parse_cell(cell, shared_empty)
+                    entries = [
+                        (key, by_column[key][0], by_column[key][1])
+                        for key in sorted(by_column)
+                        if key <= column and by_column[key] is not None
+                    ]
+                row.clear()
+
+                if header is None:
+                    if gap:
+                        header = []
+                        pending_empty_rows += gap - 1
+                    else:
+                        width = entries[-1][0] if entries else 0
+                        header = [""] * width
+                        for column, index, value in entries:
+                            header[column - 1] = shared.strings[index] if index is not None else value
+                        ensure_width(width)
+                        continue
+                else:
+                    pending_empty_rows += gap
+
+                if not entries:
+                    # Only counted if a later row has data (trailing empty rows are dropped)
+                    pending_empty_rows += 1
+                    continue
+
+                n_rows += pending_empty_rows + 1
+                pending_empty_rows = 0
+                ensure_width(entries[-1][0])
+
+                for column, index, value in entries:
+                    idx = column - 1
+                    if index is not None:
+                        code = shared_codes[index]
+                        if code < 0:
+                            continue
+                        shared_seen[idx].add(code)
+                        if profiles is not None:
+                            tally = shared_tallies[idx]
+                            tally[code] = tally.get(code, 0) + 1
+                    else:
+                        if type(value) is str:
+                            if value in STR_NA_VALUES or value.strip() == '':
+                                continue
+                            text = value
+                        else:
+                            text = _cell_text(value, aliases[idx])
+                            if text is None:
+                                continue
+                        other_seen[idx].add(text)
+                        if profiles is not None:
+                            if approx_precision is None:
+                                tally = other_tallies[idx]
+                                tally[text] = tally.get(text, 0) + 1
+                            else:
+                                profiles[idx].add(text)
+                    non_blank[idx] += 1
+
+        if header is None:
+            header = []
+        if profiles is not None:
+            for profile, tally, other_tally in zip(profiles, shared_tallies, other_tallies):
+                codes = np.fromiter(tally, dtype=np.intp, count=len(tally))
+                profile.add_counts(shared.uniques[codes], tally.values())
+                profile.add_counts(other_tally, other_tally.values())
+
+        unique_counts = []
+        if approx_precision is not None:
+            unique_hashes = hash_values(shared.uniques)
+            for codes, sketch in zip(shared_seen, other_seen):
+                sketch.add_hashes(unique_hashes[np.fromiter(codes, dtype=np.intp, count=len(codes))])
+                unique_counts.append(sketch.estimate())
+        else:
+            for codes, texts in zip(shared_seen, other_seen):
+                # Texts that also occur as shared strings are counted once
+                extra = 0
+                for text in texts:
+                    code = shared.code_of(text)
+                    if code is None:
+                        extra += 1
+                    else:
+                        codes.add(code)
+                unique_counts.append(len(codes) + extra)
+
+        return SheetCounts(header, n_rows, non_blank, unique_counts, profiles)
+
+    def _has_value(self, cell: ET.Element, shared_empty: List[bool]) -> bool:
+        """Whether a cell is non-empty, without converting its value."""
+        data_type = cell.get("t")
+        if data_type == "inlineStr":
+            child = cell.find(_INLINE_STRING_TAG)
+            return child is not None and _inline_text(child) != ""
+        text = cell.findtext(_VALUE_TAG)
+        if not text:
+            return False
+        return data_type != "s" or not shared_empty[int(text)]
+
+    def _row_width(self, row: ET.Element, shared_empty: List[bool], column_cache: Dict[str, int]) -> int:
+        """Column number of a row's last non-empty cell; 0 for an empty row."""
+        width = 0
+        column = 0
+        for cell in row:
+            cell_ref = cell.get("r")
+            column = _cell_column(cell_ref, column_cache) if cell_ref else column + 1
+            if column > width and self._has_value(cell, shared_empty):
+                width = column
+        return width
+
+    def _row_values(self, row: ET.Element, shared: _SharedStrings, column_cache: Dict[str, int]) -> Dict[int, Any]:
+        """0-based column -> value of a row's non-empty cells (shared strings as text)."""
+        values: Dict[int, Any] = {}
+        column = 0
+        for cell in row:
+            cell_ref = cell.get("r")
+            column = _cell_column(cell_ref, column_cache) if cell_ref else column + 1
+            parsed = self._parse_cell(cell, shared.empty)
+            if parsed is None:
+                values.pop(column - 1, None)  # Later cells win, even empty ones
+            else:
+                index, value = parsed
+                values[column - 1] = shared.strings[index] if index is not None else value
+        if values and max(values) >= column:
+            # Out-of-order cells past the row's last cell are dropped, as openpyxl does
+            values = {key: value for key, value in values.items() if key < column}
+        return values
+
+    def _parsed_elements(self, source) -> Iterator[Tuple[Optional[int], ET.Element]]:
+        """(row number or None, element) for each <row>, via iterparse."""
+        for _event, row in ET.iterparse(source):
+            if row.tag != _ROW_TAG:
+                continue
+            ref = row.get("r")
+            yield int(float(ref)) if ref else None, row
+            row.clear()
+
+    def _parsed_rows(self, source, shared_empty: List[bool],
+                     column_cache: Dict[str, int]) -> Iterator[Tuple[Optional[int], int, Callable[[], ET.Element]]]:
+        """(row number or None, width, row loader) for each <row>, via iterparse."""
+        for number, row in self._parsed_elements(source):
+            yield number, self._row_width(row, shared_empty, column_cache), lambda row=row: row
+
+    def _row_chunks(self, source, head: bytes) -> Iterator[Tuple[Optional[int], bytes]]:
+        """(row number or None, raw bytes) for each <row>, located without parsing."""
+        buffer = b""
+        chunk = head
+        while True:
+            buffer += chunk
+            start = buffer.find(b"<row")
+            while start >= 0 and start + 4 < len(buffer):
+                if buffer[start + 4:start + 5] not in (b" ", b">", b"/"):
+                    start = buffer.find(b"<row", start + 4)  # e.g. <rowBreaks>
+                    continue
+                tag_end = buffer.find(b">", start)
+                if tag_end < 0:
+                    break
+                if buffer[tag_end - 1:tag_end] == b"/":
+                    end = tag_end + 1
+                else:
+                    end = buffer.find(b"</row>", tag_end)
+                    if end < 0:
+                        break
+                    end += 6
+                ref = _ROW_REF.search(buffer, start, tag_end)
+                yield int(ref.group(1)) if ref else None, buffer[start:end]
+                start = buffer.find(b"<row", end)
+            if not chunk:
+                return
+            buffer = buffer[start:] if start >= 0 else buffer[-4:]
+            chunk = source.read(_SCAN_CHUNK_BYTES)
+
+    def _scanned_rows(self, source, head: bytes, root_tag: bytes, shared_empty: List[bool],
+                      column_cache: Dict[str, int]) -> Iterator[Tuple[Optional[int], int, Callable[[], ET.Element]]]:
+        """(row number or None, width, row loader) for each <row>, from the raw bytes.
+
+        Rows are only located and checked for value elements; a row is parsed
+        when its loader is called, or when its width cannot be told from the
+        bytes. Empty shared strings and empty <v> elements in rows that are
+        not parsed count as values.
+        """
+        for number, row_bytes in self._row_chunks(source, head):
+            width = _last_value_column(row_bytes, column_cache)
+            if width is None:
+                width = self._row_width(_load_row(root_tag, row_bytes), shared_empty, column_cache)
+            yield number, width, lambda row_bytes=row_bytes: _load_row(root_tag, row_bytes)
+
+    def iter_rows(self, sheet_name: str, min_row: int = 1) -> Iterator[List[Any]]:
+        """Yield a sheet's rows from sheet row min_row on, as pandas-compatible cell values.
+
+        Rows are numbered, and cell values converted, as openpyxl's read-only
+        iter_rows(min_row=min_row) and pandas give them; missing rows are
+        yielded as empty lists. Rows before min_row are skipped without being
+        converted, and, in worksheets written with the default namespace,
+        without being parsed either.
+        """
+        part = self._sheet_parts.get(sheet_name)
+        if part is None:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        shared = self._get_shared_strings()
+        column_cache: Dict[str, int] = {}
+        row_counter = 0
+        next_row = min_row
+        source = self._archive.open(part)
+        try:
+            head = source.read(_SCAN_CHUNK_BYTES)
+            root = _WORKSHEET_TAG.search(head)
+            if root is not None:
+                rows = self._row_chunks(source, head)
+            else:
+                source.close()
+                source = self._archive.open(part)
+                rows = self._parsed_elements(source)
+
+            for number, row in rows:
+                row_counter = number if number is not None else row_counter + 1
+                if row_counter < next_row:
+                    continue
+                for _ in range(next_row, row_counter):
+                    yield []  # A missing row in a gap
+                next_row = row_counter + 1
+                if root is not None:
+                    row = _load_row(root.group(), row)
+                values = self._row_values(row, shared, column_cache)
+                yield [values.get(idx, "") for idx in range(max(values) + 1)] if values else []
+        finally:
+            source.close()
+
+    def sample_rows(self, sheet_name: str, size: int, seed: int = 0,
+                    on_rows: Optional[RowCallback] = None) -> SheetSample:
+        """Draw a uniform sample of up to size data rows from one sheet.
+
+        Every row is scanned for the row count and width, but only the header
+        and the sampled rows are parsed. Rows are numbered, and the header
+        found, as in sheet_counts; rows missing from the XML are empty rows.
+        Worksheets written with the default namespace, as Excel and openpyxl
+        write them, are scanned as raw bytes; others are parsed in full.
+        """
+        part = self._sheet_parts.get(sheet_name)
+        if part is None:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        shared = self._get_shared_strings()
+        reservoir = Reservoir(size, seed)
+
+        header: List[Any] = []
+        last_data_row = 0
+        width = 0
+        column_cache: Dict[str, int] = {}
+        row_counter = 0
+        next_row = 1
+        next_report = PROGRESS_ROWS
+        source = self._archive.open(part)
+        try:
+            head = source.read(_SCAN_CHUNK_BYTES)
+            root = _WORKSHEET_TAG.search(head)
+            if root is not None:
+                rows = self._scanned_rows(source, head, root.group(), shared.empty, column_cache)
+            else:
+                source.close()
+                source = self._archive.open(part)
+                rows = self._parsed_rows(source, shared.empty, column_cache)
+
+            for number, row_width, load_row in rows:
+                row_counter = number if number is not None else row_counter + 1
+                if row_counter < next_row:
+                    continue
+                next_row = row_counter + 1
+                if on_rows is not None and row_counter >= next_report:
+                    on_rows(row_counter)
+                    next_report = row_counter + PROGRESS_ROWS
+
+                position = row_counter - 1  # The header is sheet row 1
+                if position == 0:
+                    values = self._row_values(load_row(), shared, column_cache) if row_width else {}
+                    row_width = max(values) + 1 if values else 0
+                    header = [values.get(idx, "") for idx in range(row_width)]
+                elif row_width:
+                    # Empty rows (missing, or formatted cells only) are only offered once a
+                    # later data row shows they are not trailing, so they never displace it
+                    while reservoir.next_position < position:
+                        reservoir.add({})
+                    if reservoir.next_position == position:
+                        values = self._row_values(load_row(), shared, column_cache)
+                        row_width = max(values) + 1 if values else 0
+                        reservoir.add(values)
+
+                if row_width:
+                    width = max(width, row_width)
+                    if position:
+                        last_data_row = position
+        finally:
+            source.close()
+
+        return SheetSample(header, last_data_row, width, reservoir.sample(last_data_row))
+
+    def close(self):
+        """Release the zip handle."""
+        self._archive.close()
+
+    def __enter__(self) -> "SheetXmlReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,218 @@
+"""
+Exact distinct counting under a memory ceiling.
+Distinct values are kept in memory until a shared budget is exceeded, then
+hash-partitioned into temporary files on local disk. Equal values always land
+in the same partition, so each partition is counted on its own and the counts
+are summed.
+"""
+
+import shutil
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_PARTITIONS = 64
+
+# Approximate per-entry cost of a set slot on top of the string object itself
+_SET_ENTRY_OVERHEAD = 40
+
+# Partitions that still do not fit are split again, up to this many levels
+_MAX_PARTITION_DEPTH = 4
+
+_LENGTH = struct.Struct("<I")
+
+
+def _partition_of(values: List[str], level: int, partitions: int) -> np.ndarray:
+    """Partition number for each value; a different hash key is used at each level."""
+    hashes = pd.util.hash_array(np.asarray(values, dtype=object), hash_key=f"{level:016d}", categorize=False)
+    return (hashes % np.uint64(partitions)).astype(np.intp)
+
+
+def _append_records(path: Path, values: Iterable[str]):
+    """Append length-prefixed UTF-8 records to a partition file."""
+    chunks = []
+    for value in values:
+        data = value.encode("utf-8", "surrogatepass")
+        chunks.append(_LENGTH.pack(len(data)))
+        chunks.append(data)
+    with open(path, "ab") as f:
+        f.write(b"".join(chunks))
+
+
+def _read_records(path: Path) -> Iterable[str]:
+    """Yield the records of a partition file."""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(_LENGTH.size)
+            if not header:
+                return
+            (length,) = _LENGTH.unpack(header)
+            yield f.read(length).decode("utf-8", "surrogatepass")
+
+
+def _entry_cost(value: str) -> int:
+    return sys.getsizeof(value) + _SET_ENTRY_OVERHEAD
+
+
+class DistinctSpillPool:
+    """Shared memory budget and spill directory for a group of distinct counters.
+
+    When the counters together hold more than memory_limit bytes of distinct
+    values, the largest ones write their values to partition files until the
+    pool is back under half the limit. Spill files live in a private temporary
+    directory under spill_dir (the system temp directory by default) that is
+    removed by close().
+    """
+
+    def __init__(self, memory_limit: int, spill_dir: Optional[str] = None,
+                 partitions: int = DEFAULT_PARTITIONS):
+        if memory_limit <= 0:
+            raise ValueError("memory_limit must be positive")
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.partitions = partitions
+        self.used = 0
+        self._counters: List["SpillingDistinctCounter"] = []
+        self._tmpdir: Optional[Path] = None
+
+    def new_counter(self) -> "SpillingDistinctCounter":
+        """Create a counter that shares this pool's budget."""
+        counter = SpillingDistinctCounter(self, len(self._counters))
+        self._counters.append(counter)
+        return counter
+
+    def _directory(self) -> Path:
+        if self._tmpdir is None:
+            self._tmpdir = Path(tempfile.mkdtemp(prefix="excel_stats_spill_", dir=self.spill_dir))
+        return self._tmpdir
+
+    def _charge(self, nbytes: int):
+        self.used += nbytes
+        if self.used > self.memory_limit:
+            target = self.memory_limit // 2
+            for counter in sorted(self._counters, key=lambda c: c.memory_bytes, reverse=True):
+                if self.used <= target:
+                    break
+                counter.spill()
+
+    def close(self):
+        """Delete all spill files."""
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def __enter__(self) -> "DistinctSpillPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SpillingDistinctCounter:
+    """Exact count of distinct strings that spills to disk under memory pressure.
+
+    count() matches len(set(values)) for any input; it only differs in where
+    the values are held while counting.
+    """
+
+    def __init__(self, pool: DistinctSpillPool, index: int):
+        self._pool = pool
+        self._index = index
+        self._values: Set[str] = set()
+        self.memory_bytes = 0
+        self._spilled = False
+
+    def add(self, value: str):
+        """Record one value."""
+        if value not in self._values:
+            self._values.add(value)
+            cost = _entry_cost(value)
+            self.memory_bytes += cost
+            self._pool._charge(cost)
+
+    def update(self, values: Iterable[str]):
+        """Record many values."""
+        for value in values:
+            self.add(value)
+
+    def _partition_path(self, partition: int) -> Path:
+        return self._pool._directory() / f"c{self._index}_p{partition}.bin"
+
+    def spill(self):
+        """Move the in-memory values out to this counter's partition files."""
+        if not self._values:
+            return
+        values = list(self._values)
+        self._write_partitions(values, level=0, path_for=self._partition_path)
+        self._values = set()
+        self._pool.used -= self.memory_bytes
+        self.memory_bytes = 0
+        self._spilled = True
+
+    def _write_partitions(self, values: List[str], level: int, path_for):
+        partition_ids = _partition_of(values, level, self._pool.partitions)
+        order = np.argsort(partition_ids, kind="stable")
+        sorted_ids = partition_ids[order]
+        boundaries = np.flatnonzero(np.diff(sorted_ids)) + 1
+        for group in np.split(order, boundaries):
+            if len(group):
+                _append_records(path_for(int(partition_ids[group[0]])), (values[i] for i in group))
+
+    def _count_file(self, path: Path, level: int) -> int:
+        """Count distinct records in a partition file, splitting it further if it is too big."""
+        seen: Set[str] = set()
+        cost = 0
+        for value in _read_records(path):
+            if value not in seen:
+                seen.add(value)
+                cost += _entry_cost(value)
+                if cost > self._pool.memory_limit and level < _MAX_PARTITION_DEPTH:
+                    break
+        else:
+            path.unlink()
+            return len(seen)
+
+        # Too large for the budget: re-partition with the next level's hash
+        seen = set()
+        sub_paths = {}
+
+        def sub_path(partition: int) -> Path:
+            sub_paths[partition] = path.with_name(f"{path.stem}_{partition}.bin")
+            return sub_paths[partition]
+
+        # The batch is held with its hashes and write buffers, so it gets half the budget
+        batch: List[str] = []
+        batch_bytes = 0
+        batch_limit = self._pool.memory_limit // 2
+        for value in _read_records(path):
+            batch.append(value)
+            batch_bytes += _entry_cost(value)
+            if batch_bytes >= batch_limit:
+                self._write_partitions(batch, level + 1, sub_path)
+                batch = []
+                batch_bytes = 0
+        if batch:
+            self._write_partitions(batch, level + 1, sub_path)
+        path.unlink()
+        return sum(self._count_file(p, level + 1) for p in set(sub_paths.values()))
+
+    def count(self) -> int:
+        """Exact number of distinct values added.
+
+        Once the counter has spilled, its partition files are consumed by this
+        call, so count() should be called once, after all values are added.
+        """
+        if not self._spilled:
+            return len(self._values)
+        self.spill()
+        return sum(
+            self._count_file(self._partition_path(partition), level=1)
+            for partition in range(self._pool.partitions)
+            if self._partition_path(partition).exists()
+        )
@@ -0,0 +1,49 @@
+"""
+Persisted column summaries for incremental re-analysis.
+Keeps the running per-sheet counters from the last run so that rows appended
+to a workbook since then can be folded in without re-reading the whole sheet.
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from excel_stats.cache import default_cache_dir
+
+
+class SummaryStore:
+    """Directory of pickled per-sheet summary states, keyed by workbook path and sheet.
+
+    Unlike StatsCache, entries are keyed by location rather than content:
+    the point is to find last run's state for a file that has since grown.
+    """
+
+    def __init__(self, store_dir: Optional[Union[str, Path]] = None):
+        self.store_dir = Path(store_dir) if store_dir is not None else default_cache_dir() / "summaries"
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def _state_path(self, file_path: str, sheet_name: str) -> Path:
+        location = f"{Path(file_path).resolve()}\0{sheet_name}"
+        return self.store_dir / f"{hashlib.sha256(location.encode('utf-8')).hexdigest()}.pkl"
+
+    def load(self, file_path: str, sheet_name: str) -> Optional[Dict[str, Any]]:
+        """Return the saved state for a sheet, or None if there is none or it is unreadable."""
+        try:
+            with open(self._state_path(file_path, sheet_name), "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def save(self, file_path: str, sheet_name: str, state: Dict[str, Any]):
+        """Persist a sheet's state, replacing any earlier one atomically."""
+        state_path = self._state_path(file_path, sheet_name)
+        tmp_path = state_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, state_path)
+
+    def discard(self, file_path: str, sheet_name: str):
+        """Forget a sheet's state so the next run recomputes it from scratch."""
+        self._state_path(file_path, sheet_name).unlink(missing_ok=True)
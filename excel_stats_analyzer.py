@@ -5,12 +5,32 @@ A desktop GUI application to analyze Excel files and calculate statistics for ea
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import tkinter.font as tkfont
 import pandas as pd
-from pathlib import Path
 import threading
-from typing import Dict, List, Optional
+import cProfile
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import os
 
+from excel_stats.backends import available_backends
+from excel_stats.cache import StatsCache
+from excel_stats.catalog import StatsCatalog
+from excel_stats.core import WorkbookSession, analyze_sheets, generate_output, report_metadata
+from excel_stats.discovery import DiscoveryCancelled, SheetInfo, discover_sheets
+from excel_stats.metrics import RunMetrics, profile_path
+from excel_stats.progress import AnalysisCancelled
+from excel_stats.report import REPORT_FORMATS
+from excel_stats.sampling import SAMPLE_SIZE
+from excel_stats.selection import SheetSelection
+from excel_stats.sketch import DEFAULT_PRECISION, MAX_PRECISION, MIN_PRECISION
+from excel_stats.summaries import SummaryStore
+
+
+# Reported progress is applied to the window at most this often while analyzing
+UI_REFRESH_MS = 100
+
 
 class ExcelStatsAnalyzer:
     """Main application class for Excel Stats Analyzer."""
@@ -18,8 +38,8 @@ class ExcelStatsAnalyzer:
     def __init__(self, root: tk.Tk):
         self.root = root
         self.root.title("Excel Stats Analyzer")
-        self.root.geometry("700x650")
-        self.root.minsize(600, 550)
+        self.root.geometry("700x800")
+        self.root.minsize(600, 700)
         
         # Configure style
         self.style = ttk.Style()
@@ -28,10 +48,33 @@ class ExcelStatsAnalyzer:
         
         # Application state
         self.input_file_path: Optional[str] = None
+        self.workbook_session: Optional[WorkbookSession] = None
         self.sheet_names: List[str] = []
-        self.sheet_checkboxes: Dict[str, tk.BooleanVar] = {}
+        self.sheet_info: Dict[str, SheetInfo] = {}
+        self.sheet_selection = SheetSelection()
+        self.sheet_top = 0  # Index of the first sheet row in view
         self.is_processing = False
+        self._discovery_cancel: Optional[threading.Event] = None
+        self._analysis_cancel: Optional[threading.Event] = None
+        # Latest (progress, status) from the analysis thread, and the one shown
+        self._latest_ui: Optional[Tuple[float, str]] = None
+        self._shown_ui: Optional[Tuple[float, str]] = None
+        self._refresh_job: Optional[str] = None
         self.output_mode_var: Optional[tk.StringVar] = None  # 'separate' or 'consolidated'
+        self.report_format_var: Optional[tk.StringVar] = None
+        self.streaming_var: Optional[tk.BooleanVar] = None
+        self.xml_engine_var: Optional[tk.BooleanVar] = None
+        self.backend_var: Optional[tk.StringVar] = None
+        self.workers_var: Optional[tk.IntVar] = None
+        self.use_cache_var: Optional[tk.BooleanVar] = None
+        self.catalog_var: Optional[tk.BooleanVar] = None
+        self.incremental_var: Optional[tk.BooleanVar] = None
+        self.approximate_var: Optional[tk.BooleanVar] = None
+        self.precision_var: Optional[tk.IntVar] = None
+        self.column_profile_var: Optional[tk.BooleanVar] = None
+        self.preview_var: Optional[tk.BooleanVar] = None
+        self.metrics_var: Optional[tk.BooleanVar] = None
+        self.profile_var: Optional[tk.BooleanVar] = None
         
         # Build UI
         self._create_widgets()
@@ -116,6 +159,9 @@ class ExcelStatsAnalyzer:
         self.browse_button = ttk.Button(file_input_frame, text="Browse...", command=self._browse_file)
         self.browse_button.pack(side=tk.RIGHT)
         
+        # Shown only while sheets are being discovered
+        self.cancel_load_button = ttk.Button(file_input_frame, text="Cancel", command=self._cancel_loading)
+        
         # Sheet Selection Section
         sheet_frame = ttk.Frame(main_frame)
         sheet_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
@@ -134,34 +180,42 @@ class ExcelStatsAnalyzer:
         )
         self.select_all_checkbox.pack(side=tk.RIGHT)
         
-        # Sheets list container with scrollbar
+        # Filter box: a substring, or a glob such as "Sales_*"
+        filter_frame = ttk.Frame(sheet_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.sheet_filter_var = tk.StringVar()
+        self.sheet_filter_var.trace_add("write", self._on_filter_changed)
+        self.sheet_filter_entry = ttk.Entry(filter_frame, textvariable=self.sheet_filter_var, font=("Helvetica", 10))
+        self.sheet_filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.sheet_count_var = tk.StringVar()
+        ttk.Label(filter_frame, textvariable=self.sheet_count_var, style="Subtitle.TLabel").pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # Sheets list: only the rows in view are drawn, so it scales to any number of sheets
         sheets_container = ttk.Frame(sheet_frame)
         sheets_container.pack(fill=tk.BOTH, expand=True)
         
-        # Create canvas for scrolling
-        self.sheets_canvas = tk.Canvas(sheets_container, bg="#1e1e2e", highlightthickness=0)
-        scrollbar = ttk.Scrollbar(sheets_container, orient=tk.VERTICAL, command=self.sheets_canvas.yview)
-        
-        self.sheets_inner_frame = ttk.Frame(self.sheets_canvas)
+        self.sheet_font = tkfont.Font(family="Helvetica", size=11)
+        self.sheet_row_height = self.sheet_font.metrics("linespace") + 8
         
-        self.sheets_canvas.configure(yscrollcommand=scrollbar.set)
+        self.sheets_canvas = tk.Canvas(sheets_container, bg="#1e1e2e", highlightthickness=0)
+        self.sheets_scrollbar = ttk.Scrollbar(sheets_container, orient=tk.VERTICAL, command=self._scroll_sheets)
         
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.sheets_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.sheets_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        self.sheets_window = self.sheets_canvas.create_window((0, 0), window=self.sheets_inner_frame, anchor=tk.NW)
-        
-        # Configure canvas scrolling
-        self.sheets_inner_frame.bind("<Configure>", self._on_frame_configure)
-        self.sheets_canvas.bind("<Configure>", self._on_canvas_configure)
+        self.sheets_canvas.bind("<Configure>", lambda event: self._render_sheet_rows())
+        self.sheets_canvas.bind("<Button-1>", self._on_sheet_click)
+        self.sheets_canvas.bind("<MouseWheel>", self._on_sheet_wheel)
+        self.sheets_canvas.bind("<Button-4>", self._on_sheet_wheel)
+        self.sheets_canvas.bind("<Button-5>", self._on_sheet_wheel)
         
-        # Placeholder label
-        self.placeholder_label = ttk.Label(
-            self.sheets_inner_frame, 
-            text="No file selected. Please browse and select an Excel file.",
-            style="Subtitle.TLabel"
-        )
-        self.placeholder_label.pack(pady=20)
+        # Shown in place of the list when it is empty
+        self.sheets_placeholder = "No file selected. Please browse and select an Excel file."
+        self._update_select_all_state()
         
         # Output Format Section
         output_format_frame = ttk.Frame(main_frame)
@@ -188,6 +242,143 @@ class ExcelStatsAnalyzer:
             value="consolidated"
         ).pack(anchor=tk.W, padx=10, pady=2)
         
+        report_format_frame = ttk.Frame(output_format_frame)
+        report_format_frame.pack(fill=tk.X, padx=10, pady=2)
+        
+        self.report_format_var = tk.StringVar(value="xlsx")
+        
+        ttk.Label(report_format_frame, text="Report file type (csv/parquet: one flat table):").pack(side=tk.LEFT)
+        ttk.Combobox(
+            report_format_frame,
+            values=REPORT_FORMATS,
+            textvariable=self.report_format_var,
+            width=10,
+            state="readonly"
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        # On by default: whole-sheet loads cannot report progress or stop
+        # partway, while streamed rows give the same stats
+        self.streaming_var = tk.BooleanVar(value=True)
+        
+        ttk.Checkbutton(
+            output_format_frame,
+            text="Streaming (read rows incrementally with live progress and Cancel, low memory; .xlsx/.xlsm only)",
+            variable=self.streaming_var
+        ).pack(anchor=tk.W, padx=10, pady=(8, 2))
+        
+        self.xml_engine_var = tk.BooleanVar(value=False)
+        
+        ttk.Checkbutton(
+            output_format_frame,
+            text="Fast engine (count directly from the sheet XML, .xlsx/.xlsm only)",
+            variable=self.xml_engine_var
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        self.use_cache_var = tk.BooleanVar(value=True)
+        
+        ttk.Checkbutton(
+            output_format_frame,
+            text="Reuse cached results for unchanged sheets",
+            variable=self.use_cache_var
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        self.catalog_var = tk.BooleanVar(value=True)
+        
+        ttk.Checkbutton(
+            output_format_frame,
+            text="Record stats in the catalog (for trends and cross-file comparisons)",
+            variable=self.catalog_var
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        self.incremental_var = tk.BooleanVar(value=False)
+        
+        ttk.Checkbutton(
+            output_format_frame,
+            text="Incremental (only read rows appended since the last run, .xlsx/.xlsm only)",
+            variable=self.incremental_var
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        workers_frame = ttk.Frame(output_format_frame)
+        workers_frame.pack(fill=tk.X, padx=10, pady=2)
+        
+        self.workers_var = tk.IntVar(value=1)
+        
+        ttk.Label(workers_frame, text="Parallel worker processes:").pack(side=tk.LEFT)
+        ttk.Spinbox(
+            workers_frame,
+            from_=1,
+            to=os.cpu_count() or 1,
+            textvariable=self.workers_var,
+            width=5,
+            state="readonly"
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        backend_frame = ttk.Frame(output_format_frame)
+        backend_frame.pack(fill=tk.X, padx=10, pady=2)
+        
+        self.backend_var = tk.StringVar(value="auto")
+        
+        ttk.Label(backend_frame, text="Reader backend:").pack(side=tk.LEFT)
+        ttk.Combobox(
+            backend_frame,
+            values=available_backends(),
+            textvariable=self.backend_var,
+            width=10,
+            state="readonly"
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        approx_frame = ttk.Frame(output_format_frame)
+        approx_frame.pack(fill=tk.X, padx=10, pady=2)
+        
+        self.approximate_var = tk.BooleanVar(value=False)
+        self.precision_var = tk.IntVar(value=DEFAULT_PRECISION)
+        
+        ttk.Checkbutton(
+            approx_frame,
+            text="Approximate unique counts (HyperLogLog), precision:",
+            variable=self.approximate_var
+        ).pack(side=tk.LEFT)
+        ttk.Spinbox(
+            approx_frame,
+            from_=MIN_PRECISION,
+            to=MAX_PRECISION,
+            textvariable=self.precision_var,
+            width=5,
+            state="readonly"
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.preview_var = tk.BooleanVar(value=False)
+        
+        ttk.Checkbutton(
+            output_format_frame,
+            text=f"Quick preview (estimate from {SAMPLE_SIZE:,} sampled rows per sheet, with confidence intervals)",
+            variable=self.preview_var
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        self.column_profile_var = tk.BooleanVar(value=False)
+        
+        ttk.Checkbutton(
+            output_format_frame,
+            text="Column profile (type, min/max, mean, std. dev., text lengths, top values)",
+            variable=self.column_profile_var
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        self.metrics_var = tk.BooleanVar(value=False)
+        
+        ttk.Checkbutton(
+            output_format_frame,
+            text="Record run metrics (time and memory per sheet and stage, in a Run Metrics tab and a .metrics.json file)",
+            variable=self.metrics_var
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        self.profile_var = tk.BooleanVar(value=False)
+        
+        ttk.Checkbutton(
+            output_format_frame,
+            text="Profile the run with cProfile (saves a .prof file next to the report)",
+            variable=self.profile_var
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
         # Progress Section
         progress_frame = ttk.Frame(main_frame)
         progress_frame.pack(fill=tk.X, pady=(0, 20))
@@ -225,13 +416,12 @@ class ExcelStatsAnalyzer:
         )
         self.clear_button.pack(side=tk.RIGHT, padx=(0, 10))
         
-    def _on_frame_configure(self, event):
-        """Update scroll region when frame size changes."""
-        self.sheets_canvas.configure(scrollregion=self.sheets_canvas.bbox("all"))
-        
-    def _on_canvas_configure(self, event):
-        """Update inner frame width when canvas size changes."""
-        self.sheets_canvas.itemconfig(self.sheets_window, width=event.width)
+        # Packed only while an analysis is running
+        self.cancel_analysis_button = ttk.Button(
+            button_frame,
+            text="Cancel",
+            command=self._cancel_analysis
+        )
         
     def _browse_file(self):
         """Open file dialog to select Excel file."""
@@ -239,6 +429,7 @@ class ExcelStatsAnalyzer:
             title="Select Excel File",
             filetypes=[
                 ("Excel Files", "*.xlsx *.xls *.xlsm"),
+                ("CSV Files", "*.csv"),
                 ("All Files", "*.*")
             ]
         )
@@ -247,98 +438,221 @@ class ExcelStatsAnalyzer:
             self._load_excel_file(file_path)
             
     def _load_excel_file(self, file_path: str):
-        """Load Excel file and extract sheet names."""
+        """Start discovering the file's sheets in the background."""
+        self._cancel_loading()
+        cancel_event = threading.Event()
+        self._discovery_cancel = cancel_event
+        
+        self.status_var.set("Loading file...")
+        self.analyze_button.configure(state=tk.DISABLED)
+        self.cancel_load_button.pack(side=tk.RIGHT, padx=(0, 10))
+        
+        # Read only the workbook manifest, off the UI thread
+        thread = threading.Thread(target=self._discover_sheets, args=(file_path, cancel_event))
+        thread.daemon = True
+        thread.start()
+        
+    def _discover_sheets(self, file_path: str, cancel_event: threading.Event):
+        """List sheets and their dimensions (runs on a background thread)."""
         try:
-            self.status_var.set("Loading file...")
-            self.root.update()
-            
-            # Read Excel file to get sheet names
-            excel_file = pd.ExcelFile(file_path)
-            self.sheet_names = excel_file.sheet_names
-            excel_file.close()
-            
-            self.input_file_path = file_path
-            self.file_path_var.set(file_path)
-            
-            # Update sheet selection UI
-            self._populate_sheets()
-            
-            self.status_var.set(f"Loaded: {len(self.sheet_names)} sheet(s) found")
-            
+            sheets = discover_sheets(file_path, cancel_event=cancel_event)
+        except DiscoveryCancelled:
+            return
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load Excel file:\n{str(e)}")
-            self.status_var.set("Error loading file")
+            error = str(e)
+            self.root.after(0, lambda: self._on_discovery_failed(cancel_event, error))
+            return
+        self.root.after(0, lambda: self._on_sheets_discovered(cancel_event, file_path, sheets))
+        
+    def _on_sheets_discovered(self, cancel_event: threading.Event, file_path: str, sheets: List[SheetInfo]):
+        """Show the discovered sheets unless loading was cancelled or superseded."""
+        if cancel_event is not self._discovery_cancel:
+            return
+        self._finish_loading()
+        
+        # The workbook itself is only opened when an analysis starts
+        self._close_session()
+        self.sheet_info = {info.name: info for info in sheets}
+        self.sheet_names = [info.name for info in sheets]
+        
+        self.input_file_path = file_path
+        self.file_path_var.set(file_path)
+        
+        # Update sheet selection UI
+        self._populate_sheets()
+        
+        status = f"Loaded: {len(self.sheet_names)} sheet(s) found"
+        total_rows = sum(info.rows or 0 for info in sheets)
+        if total_rows:
+            status += f", {total_rows:,} rows in total"
+        self.status_var.set(status)
+        
+    def _on_discovery_failed(self, cancel_event: threading.Event, error: str):
+        """Report a discovery error unless loading was cancelled or superseded."""
+        if cancel_event is not self._discovery_cancel:
+            return
+        self._finish_loading()
+        messagebox.showerror("Error", f"Failed to load Excel file:\n{error}")
+        self.status_var.set("Error loading file")
+        
+    def _cancel_loading(self):
+        """Abandon an in-progress sheet discovery."""
+        if self._discovery_cancel is not None:
+            self._discovery_cancel.set()
+            self._finish_loading()
+            self.status_var.set("Loading cancelled")
             
-    def _populate_sheets(self):
-        """Populate the sheets selection area with checkboxes."""
-        # Clear existing checkboxes
-        for widget in self.sheets_inner_frame.winfo_children():
-            widget.destroy()
+    def _finish_loading(self):
+        """Leave the loading state."""
+        self._discovery_cancel = None
+        self.cancel_load_button.pack_forget()
+        if not self.is_processing:
+            self.analyze_button.configure(state=tk.NORMAL)
             
-        self.sheet_checkboxes.clear()
-        self.select_all_var.set(False)
-        
-        if not self.sheet_names:
-            self.placeholder_label = ttk.Label(
-                self.sheets_inner_frame,
-                text="No sheets found in the file.",
-                style="Subtitle.TLabel"
+    def _populate_sheets(self):
+        """Show the loaded sheets in the sheet list, none selected."""
+        self.sheet_selection.reset(self.sheet_names)
+        self.sheet_filter_var.set("")
+        self.sheet_top = 0
+        self.sheets_placeholder = "No sheets found in the file."
+        self._render_sheet_rows()
+        self._update_select_all_state()
+        
+    def _sheet_label(self, sheet_name: str) -> str:
+        """Text of a sheet's row, with its dimensions when known."""
+        label = f"📄 {sheet_name}"
+        info = self.sheet_info.get(sheet_name)
+        if info is not None and info.rows is not None:
+            label += f"   ({info.rows:,} rows × {info.columns:,} columns)"
+        return label
+        
+    def _rows_in_view(self) -> int:
+        """Number of sheet rows that fit in the canvas."""
+        return max(1, self.sheets_canvas.winfo_height() // self.sheet_row_height)
+        
+    def _render_sheet_rows(self):
+        """Redraw the sheet rows currently in view and update the scrollbar."""
+        canvas = self.sheets_canvas
+        canvas.delete("all")
+        shown = self.sheet_selection.visible
+        
+        if not shown:
+            text = self.sheets_placeholder
+            if self.sheet_selection.names:
+                text = f"No sheets match '{self.sheet_selection.pattern.strip()}'."
+            canvas.create_text(
+                canvas.winfo_width() // 2, 20,
+                text=text, anchor=tk.N, fill="#a6adc8", font=("Helvetica", 10)
             )
-            self.placeholder_label.pack(pady=20)
+            self.sheets_scrollbar.set(0, 1)
             return
             
-        # Create checkbox for each sheet
-        for i, sheet_name in enumerate(self.sheet_names):
-            var = tk.BooleanVar()
-            self.sheet_checkboxes[sheet_name] = var
-            
-            checkbox = ttk.Checkbutton(
-                self.sheets_inner_frame,
-                text=f"📄 {sheet_name}",
-                variable=var,
-                command=self._update_select_all_state
+        page = self._rows_in_view()
+        self.sheet_top = max(0, min(self.sheet_top, len(shown) - page))
+        for row, sheet_name in enumerate(shown[self.sheet_top:self.sheet_top + page + 1]):
+            mark = "☑" if self.sheet_selection.is_selected(sheet_name) else "☐"
+            canvas.create_text(
+                10, row * self.sheet_row_height + self.sheet_row_height // 2,
+                text=f"{mark}  {self._sheet_label(sheet_name)}",
+                anchor=tk.W, fill="#cdd6f4", font=self.sheet_font
             )
-            checkbox.pack(anchor=tk.W, pady=3, padx=10)
+        self.sheets_scrollbar.set(self.sheet_top / len(shown), min(1.0, (self.sheet_top + page) / len(shown)))
+        
+    def _scroll_sheets(self, *args):
+        """Scrollbar command: "moveto FRACTION" or "scroll N units|pages"."""
+        shown = len(self.sheet_selection.visible)
+        if args[0] == "moveto":
+            self.sheet_top = round(float(args[1]) * shown)
+        elif args[0] == "scroll":
+            step = self._rows_in_view() if args[2] == "pages" else 1
+            self.sheet_top += int(args[1]) * step
+        self._render_sheet_rows()
+        
+    def _on_sheet_wheel(self, event):
+        """Scroll the sheet list with the mouse wheel (Button-4/5 on X11)."""
+        up = event.num == 4 or event.delta > 0
+        self._scroll_sheets("scroll", -3 if up else 3, "units")
+        
+    def _on_sheet_click(self, event):
+        """Toggle the sheet under the pointer."""
+        row = self.sheet_top + event.y // self.sheet_row_height
+        shown = self.sheet_selection.visible
+        if 0 <= row < len(shown):
+            self.sheet_selection.toggle(shown[row])
+            self._render_sheet_rows()
+            self._update_select_all_state()
             
+    def _on_filter_changed(self, *args):
+        """Show only the sheets matching the filter box."""
+        self.sheet_selection.set_filter(self.sheet_filter_var.get())
+        self.sheet_top = 0
+        self._render_sheet_rows()
+        self._update_select_all_state()
+        
     def _toggle_select_all(self):
-        """Toggle all sheet checkboxes based on Select All state."""
-        select_all = self.select_all_var.get()
-        for var in self.sheet_checkboxes.values():
-            var.set(select_all)
-            
+        """Select or deselect every sheet shown under the current filter."""
+        self.sheet_selection.select_visible(self.select_all_var.get())
+        self._render_sheet_rows()
+        self._update_select_all_state()
+        
     def _update_select_all_state(self):
-        """Update Select All checkbox based on individual selections."""
-        if not self.sheet_checkboxes:
-            return
-            
-        all_selected = all(var.get() for var in self.sheet_checkboxes.values())
-        self.select_all_var.set(all_selected)
+        """Update Select All and the selection count from the current selection."""
+        selection = self.sheet_selection
+        self.select_all_var.set(selection.all_visible_selected())
+        count = f"{len(selection.selected):,} of {len(selection):,} selected"
+        if selection.filtered:
+            count += f", {len(selection.visible):,} shown"
+        self.sheet_count_var.set(count)
         
     def _get_selected_sheets(self) -> List[str]:
-        """Get list of selected sheet names."""
-        return [name for name, var in self.sheet_checkboxes.items() if var.get()]
+        """Get list of selected sheet names, in workbook order."""
+        return self.sheet_selection.selected_names()
+        
+    def _close_session(self):
+        """Close the open workbook session, if any."""
+        if self.workbook_session is not None:
+            self.workbook_session.close()
+            self.workbook_session = None
+            
+    def _get_session(self, backend: str = "auto") -> WorkbookSession:
+        """Return the open workbook session, reopening the input file if needed."""
+        if self.workbook_session is None or self.workbook_session.closed:
+            self.workbook_session = WorkbookSession(self.input_file_path, backend)
+        return self.workbook_session
         
     def _clear_selection(self):
         """Clear file and sheet selection."""
+        self._cancel_loading()
+        self._close_session()
         self.input_file_path = None
         self.file_path_var.set("")
         self.sheet_names = []
-        self.sheet_checkboxes.clear()
-        self.select_all_var.set(False)
+        self.sheet_info = {}
+        self.sheet_selection.reset()
+        self.sheet_filter_var.set("")
+        self.sheet_top = 0
         self.output_mode_var.set("separate")
+        self.report_format_var.set("xlsx")
+        self.streaming_var.set(True)
+        self.xml_engine_var.set(False)
+        self.backend_var.set("auto")
+        self.workers_var.set(1)
+        self.use_cache_var.set(True)
+        self.catalog_var.set(True)
+        self.incremental_var.set(False)
+        self.approximate_var.set(False)
+        self.precision_var.set(DEFAULT_PRECISION)
+        self.preview_var.set(False)
+        self.column_profile_var.set(False)
+        self.metrics_var.set(False)
+        self.profile_var.set(False)
         self.progress_var.set(0)
         self.status_var.set("Ready")
         
         # Clear sheets area
-        for widget in self.sheets_inner_frame.winfo_children():
-            widget.destroy()
-            
-        self.placeholder_label = ttk.Label(
-            self.sheets_inner_frame,
-            text="No file selected. Please browse and select an Excel file.",
-            style="Subtitle.TLabel"
-        )
-        self.placeholder_label.pack(pady=20)
+        self.sheets_placeholder = "No file selected. Please browse and select an Excel file."
+        self._render_sheet_rows()
+        self._update_select_all_state()
         
     def _start_analysis(self):
         """Start the analysis process in a separate thread."""
@@ -359,41 +673,86 @@ class ExcelStatsAnalyzer:
         self.analyze_button.configure(state=tk.DISABLED)
         self.browse_button.configure(state=tk.DISABLED)
         self.clear_button.configure(state=tk.DISABLED)
+        self._analysis_cancel = threading.Event()
+        self.cancel_analysis_button.configure(state=tk.NORMAL)
+        self.cancel_analysis_button.pack(side=tk.RIGHT, padx=(0, 10))
+        self._refresh_ui()
         
         # Run analysis in separate thread
-        thread = threading.Thread(target=self._run_analysis, args=(selected_sheets,))
+        thread = threading.Thread(target=self._run_analysis, args=(selected_sheets, self._analysis_cancel))
         thread.daemon = True
         thread.start()
         
-    def _run_analysis(self, selected_sheets: List[str]):
+    def _cancel_analysis(self):
+        """Ask the running analysis to stop; it removes any partly written report."""
+        if self._analysis_cancel is not None:
+            self._analysis_cancel.set()
+            self.cancel_analysis_button.configure(state=tk.DISABLED)
+            self.status_var.set("Cancelling...")
+            
+    def _run_analysis(self, selected_sheets: List[str], cancel_event: threading.Event):
         """Run the analysis on selected sheets."""
+        # Profiles this thread only, which is where sheets are read unless workers are used
+        profiler = cProfile.Profile() if self.profile_var.get() else None
+        if profiler is not None:
+            profiler.enable()
         try:
-            total_sheets = len(selected_sheets)
-            results: Dict[str, pd.DataFrame] = {}
+            streaming = self.streaming_var.get()
+            engine = "xml" if self.xml_engine_var.get() else "pandas"
+            backend = self.backend_var.get()
+            workers = self.workers_var.get()
+            cache = StatsCache() if self.use_cache_var.get() else None
+            summaries = SummaryStore() if self.incremental_var.get() else None
+            approx_precision = self.precision_var.get() if self.approximate_var.get() else None
+            metrics = RunMetrics() if self.metrics_var.get() else None
+            sample_rows = SAMPLE_SIZE if self.preview_var.get() else None
+            
+            results = analyze_sheets(
+                self.input_file_path,
+                selected_sheets,
+                streaming=streaming,
+                workers=workers,
+                session=self._get_session(backend),
+                progress=self._update_ui,
+                cache=cache,
+                summaries=summaries,
+                approx_precision=approx_precision,
+                engine=engine,
+                backend=backend,
+                metrics=metrics,
+                cancel_event=cancel_event,
+                sheet_rows={
+                    sheet_name: info.rows for sheet_name, info in self.sheet_info.items()
+                },
+                column_profile=self.column_profile_var.get(),
+                sample_rows=sample_rows
+            )
             
-            for i, sheet_name in enumerate(selected_sheets):
-                # Update progress
-                progress = (i / total_sheets) * 100
-                self._update_ui(progress, f"Processing: {sheet_name}...")
-                
-                # Read sheet data
-                df = pd.read_excel(
-                    self.input_file_path,
-                    sheet_name=sheet_name,
-                    header=0,  # First row is header
-                    dtype=str  # Read all as strings to preserve data
-                )
-                
-                # Calculate statistics for this sheet
-                stats_df = self._calculate_stats(df, sheet_name)
-                results[sheet_name] = stats_df
-                
             # Generate output file
             self._update_ui(90, "Generating output file...")
             output_mode = self.output_mode_var.get()
-            output_path = self._generate_output(results, output_mode)
+            metadata = report_metadata(
+                self.input_file_path, backend, engine, sample_rows, streaming=streaming,
+                incremental=summaries is not None, approx_precision=approx_precision
+            )
+            output_path = self._generate_output(results, output_mode, metadata, metrics, cancel_event)
+            catalog_error = None
+            if self.catalog_var.get():
+                try:
+                    StatsCatalog().record_run(self.input_file_path, results, output_path, metadata)
+                except (sqlite3.Error, OSError) as e:
+                    # The report is already written; only the catalog entry is lost
+                    catalog_error = str(e)
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(profile_path(Path(output_path)))
             
-            self._update_ui(100, f"Complete! Output saved to: {os.path.basename(output_path)}")
+            status = f"Complete! Output saved to: {os.path.basename(output_path)}"
+            if cache is not None:
+                status += f" ({cache.summary()})"
+            if catalog_error is not None:
+                status += f" (not recorded in the stats catalog: {catalog_error})"
+            self._update_ui(100, status)
             
             # Show success message
             self.root.after(0, lambda: messagebox.showinfo(
@@ -401,113 +760,56 @@ class ExcelStatsAnalyzer:
                 f"Analysis complete!\n\nOutput file saved to:\n{output_path}"
             ))
             
+        except AnalysisCancelled:
+            self._update_ui(0, "Analysis cancelled")
+            
         except Exception as e:
-            self._update_ui(0, f"Error: {str(e)}")
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Analysis failed:\n{str(e)}"))
+            message = str(e)
+            self._update_ui(0, f"Error: {message}")
+            self.root.after(0, lambda: messagebox.showerror("Error", f"Analysis failed:\n{message}"))
             
         finally:
+            if profiler is not None:
+                profiler.disable()
+            # The report is written; release the workbook until the next run
+            self._close_session()
             # Re-enable buttons
             self.root.after(0, self._enable_buttons)
             
-    def _calculate_stats(self, df: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
-        """Calculate statistics for each column in the dataframe."""
-        stats_data = []
-        
-        for column in df.columns:
-            col_data = df[column]
-            
-            # Total transactions (all rows, including blanks)
-            total_transactions = len(col_data)
-            
-            # Count of availability (non-blank values)
-            # Consider NaN, None, empty string, whitespace-only as blank
-            non_blank_mask = col_data.notna() & (col_data.astype(str).str.strip() != '')
-            count_availability = non_blank_mask.sum()
-            
-            # Percentage availability
-            if total_transactions > 0:
-                pct_availability = (count_availability / total_transactions) * 100
-            else:
-                pct_availability = 0.0
-                
-            # Unique values (excluding blanks)
-            non_blank_values = col_data[non_blank_mask]
-            unique_values = non_blank_values.nunique()
-            
-            stats_data.append({
-                'Header Name': column,
-                'Total Number of Transactions': total_transactions,
-                'Count of Availability': count_availability,
-                '% Availability': round(pct_availability, 2),
-                'No of Unique Values': unique_values
-            })
-            
-        return pd.DataFrame(stats_data)
-        
-    def _generate_output(self, results: Dict[str, pd.DataFrame], output_mode: str) -> str:
-        """Generate output Excel file with results."""
-        # Create output filename
-        input_path = Path(self.input_file_path)
-        base_filename = f"{input_path.stem}_stats"
-        output_path = input_path.parent / f"{base_filename}.xlsx"
-        
-        # Handle existing file - append number if file exists
-        counter = 1
-        while output_path.exists():
-            output_path = input_path.parent / f"{base_filename}_{counter}.xlsx"
-            counter += 1
-        
-        # Write results to Excel
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            if output_mode == "consolidated":
-                # Combine all results into a single sheet with Sheet Name column
-                consolidated_data = []
-                for sheet_name, stats_df in results.items():
-                    # Add Sheet Name column at the front
-                    stats_with_sheet = stats_df.copy()
-                    stats_with_sheet.insert(0, 'Sheet Name', sheet_name)
-                    consolidated_data.append(stats_with_sheet)
-                
-                # Concatenate all dataframes
-                consolidated_df = pd.concat(consolidated_data, ignore_index=True)
-                consolidated_df.to_excel(writer, sheet_name="Consolidated Stats", index=False)
-                
-                # Auto-adjust column widths
-                worksheet = writer.sheets["Consolidated Stats"]
-                for idx, column in enumerate(consolidated_df.columns):
-                    max_length = max(
-                        consolidated_df[column].astype(str).apply(len).max(),
-                        len(column)
-                    )
-                    # Add a little extra space
-                    worksheet.column_dimensions[chr(65 + idx)].width = min(max_length + 2, 50)
-            else:
-                # Separate sheets mode (original behavior)
-                for sheet_name, stats_df in results.items():
-                    # Truncate sheet name if too long (Excel limit is 31 chars)
-                    safe_sheet_name = sheet_name[:28] + "..." if len(sheet_name) > 31 else sheet_name
-                    stats_df.to_excel(writer, sheet_name=safe_sheet_name, index=False)
-                    
-                    # Auto-adjust column widths
-                    worksheet = writer.sheets[safe_sheet_name]
-                    for idx, column in enumerate(stats_df.columns):
-                        max_length = max(
-                            stats_df[column].astype(str).apply(len).max(),
-                            len(column)
-                        )
-                        # Add a little extra space
-                        worksheet.column_dimensions[chr(65 + idx)].width = min(max_length + 2, 50)
-                    
-        return str(output_path)
+    def _generate_output(self, results: Dict[str, pd.DataFrame], output_mode: str,
+                         metadata: Optional[Dict[str, str]] = None,
+                         metrics: Optional[RunMetrics] = None,
+                         cancel_event: Optional[threading.Event] = None) -> str:
+        """Generate the report file with results."""
+        return generate_output(
+            results, self.input_file_path, output_mode, metadata, self.report_format_var.get(), metrics,
+            cancel_event
+        )
         
     def _update_ui(self, progress: float, status: str):
-        """Update UI elements from background thread."""
-        self.root.after(0, lambda: self.progress_var.set(progress))
-        self.root.after(0, lambda: self.status_var.set(status))
-        
+        """Record progress from the background thread; _refresh_ui shows it."""
+        # A single assignment, so no lock is needed and no Tk call is queued per update
+        self._latest_ui = (progress, status)
+        
+    def _refresh_ui(self):
+        """Show the latest reported progress, then re-run every UI_REFRESH_MS while processing."""
+        self._refresh_job = None
+        latest = self._latest_ui
+        if latest is not None and latest is not self._shown_ui:
+            self._shown_ui = latest
+            progress, status = latest
+            self.progress_var.set(progress)
+            self.status_var.set(status)
+        if self.is_processing and self._refresh_job is None:
+            self._refresh_job = self.root.after(UI_REFRESH_MS, self._refresh_ui)
+            
     def _enable_buttons(self):
         """Re-enable buttons after processing."""
         self.is_processing = False
+        if self._refresh_job is not None:
+            self.root.after_cancel(self._refresh_job)
+        self._refresh_ui()
+        self.cancel_analysis_button.pack_forget()
         self.analyze_button.configure(state=tk.NORMAL)
         self.browse_button.configure(state=tk.NORMAL)
         self.clear_button.configure(state=tk.NORMAL)